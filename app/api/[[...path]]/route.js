@@ -1,7 +1,25 @@
+import { createHash } from 'crypto'
 import { NextResponse } from 'next/server'
+import GasIngestService from '@/lib/ingest'
+import { DEFAULT_CANDLE_INTERVALS, toBinaryCandles, toColumnarCandles } from '@/lib/candles'
+import { CHAIN_IDS } from '@/lib/chains'
+import { FEE_TIERS } from '@/lib/feeEstimator'
+import { DEFAULT_PROFILE_IDS, cheapestChainCounts, rankScenarios, simulateScenarios } from '@/lib/simulation'
+import { metrics } from '@/lib/metrics'
+import { log } from '@/lib/log'
+
+// The stream endpoint holds long-lived connections and upstream sockets
+export const runtime = 'nodejs'
+export const dynamic = 'force-dynamic'
+
+// Keep idle SSE connections alive through proxies
+const HEARTBEAT_INTERVAL_MS = 15000
+
+const SUPPORTED_CHAINS = CHAIN_IDS
+const DEFAULT_HISTORY_RANGE_MS = 24 * 60 * 60 * 1000
 
 export async function GET(request) {
-  const { pathname } = new URL(request.url)
+  const { pathname, searchParams } = new URL(request.url)
   
   // Health check endpoint
   if (pathname === '/api/' || pathname === '/api') {
@@ -12,17 +30,329 @@ export async function GET(request) {
     })
   }
   
+  // Server-sent gas snapshots fanned out from a single upstream ingestion
+  if (pathname === '/api/gas/stream') {
+    return streamGasUpdates(request)
+  }
+  
+  // Latest snapshot for one or more chains
+  if (pathname === '/api/gas/latest') {
+    return getLatestGas(request, searchParams)
+  }
+  
+  // Precomputed candles for one chain
+  const ohlcMatch = pathname.match(/^\/api\/gas\/([a-z0-9-]+)\/ohlc$/)
+  if (ohlcMatch) {
+    return getGasOHLC(request, ohlcMatch[1], searchParams)
+  }
+  
+  // Persisted gas points for one chain
+  const historyMatch = pathname.match(/^\/api\/gas\/([a-z0-9-]+)\/history$/)
+  if (historyMatch) {
+    return getGasHistory(historyMatch[1], searchParams)
+  }
+  
+  // Upstream ingestion counters per chain
+  if (pathname === '/api/gas/stats') {
+    return NextResponse.json(GasIngestService.getStats())
+  }
+  
+  // Prometheus scrape target (GAS_METRICS=1)
+  if (pathname === '/api/metrics') {
+    return getMetrics()
+  }
+  
   return NextResponse.json({ 
     error: 'Endpoint not found',
     availableEndpoints: [
-      '/api/ - Health check'
+      '/api/ - Health check',
+      '/api/gas/stream - Live gas updates (SSE)',
+      '/api/gas/stats - Ingestion counters per chain',
+      '/api/metrics - Prometheus metrics (GAS_METRICS=1)',
+      '/api/gas/{chain}/history?from=&to= - Stored gas points',
+      '/api/gas/{chain}/ohlc?from=&to=&interval=&format= - Gas candles (json, columnar or binary)',
+      '/api/gas/latest?chains= - Latest gas snapshot per chain',
+      'POST /api/simulate - Ranked cost comparison over a scenario matrix'
     ]
   }, { status: 404 })
 }
 
 export async function POST(request) {
+  const { pathname } = new URL(request.url)
+  
+  // Batch cost simulation over the latest ingested snapshot
+  if (pathname === '/api/simulate') {
+    return simulate(request)
+  }
+  
   return NextResponse.json({ 
     error: 'Method not implemented',
     message: 'POST endpoints will be added as needed'
   }, { status: 501 })
-}
\ No newline at end of file
+}
+
+// Body: { chains?, profiles?, tiers?, amounts?, usdPrice? }. profiles are
+// GAS_PROFILES ids or { id, gasLimit, calldataBytes } objects.
+async function simulate(request) {
+  let body
+  try {
+    body = await request.json()
+  } catch (error) {
+    return NextResponse.json({ error: 'Invalid JSON body' }, { status: 400 })
+  }
+  if (!body || typeof body !== 'object' || Array.isArray(body)) {
+    return NextResponse.json({ error: 'Body must be a JSON object' }, { status: 400 })
+  }
+  
+  const { chains: requested = null, profiles = DEFAULT_PROFILE_IDS, tiers = FEE_TIERS, amounts = [0] } = body
+  const notArrays = Object.entries({ chains: requested ?? [], profiles, tiers, amounts })
+    .filter(([, value]) => !Array.isArray(value))
+    .map(([name]) => name)
+  if (notArrays.length > 0) {
+    return NextResponse.json({ error: `Must be arrays: ${notArrays.join(', ')}` }, { status: 400 })
+  }
+  if (profiles.some((profile) => typeof profile !== 'string' && (!profile || typeof profile !== 'object'))) {
+    return NextResponse.json({ error: 'Profiles must be ids or { id, gasLimit, calldataBytes } objects' }, { status: 400 })
+  }
+  if (body.usdPrice !== undefined && !(typeof body.usdPrice === 'number' && body.usdPrice > 0)) {
+    return NextResponse.json({ error: 'usdPrice must be a positive number' }, { status: 400 })
+  }
+  
+  const unknown = (requested || []).filter((chainId) => !SUPPORTED_CHAINS.includes(chainId))
+  if (unknown.length > 0) {
+    return NextResponse.json({ error: `Unknown chain: ${unknown.join(', ')}` }, { status: 404 })
+  }
+  const badTiers = tiers.filter((tier) => !FEE_TIERS.includes(tier))
+  if (badTiers.length > 0 || amounts.some((amount) => !Number.isFinite(amount))) {
+    return NextResponse.json({
+      error: 'Invalid tiers or amounts',
+      supportedTiers: FEE_TIERS
+    }, { status: 400 })
+  }
+  
+  try {
+    await GasIngestService.start()
+  } catch (error) {
+    // Simulate on whatever was collected before the upstream went away
+  }
+  
+  const snapshot = GasIngestService.getSnapshot()
+  const chainIds = requested || Object.keys(snapshot.chains)
+  const chains = chainIds
+    .filter((chainId) => snapshot.chains[chainId])
+    .map((chainId) => ({ id: chainId, ...snapshot.chains[chainId] }))
+  const usdPrice = body.usdPrice ?? snapshot.ethPrice
+  
+  if (chains.length === 0 || !usdPrice) {
+    return NextResponse.json({ error: 'No gas data available yet' }, { status: 503 })
+  }
+  
+  try {
+    const result = simulateScenarios({ chains, usdPrice, profiles, tiers, amounts })
+    const table = rankScenarios(result)
+    return NextResponse.json({
+      usdPrice,
+      scenarioCount: result.scenarioCount,
+      elapsedMs: result.elapsedMs,
+      cheapest: cheapestChainCounts(table),
+      table
+    })
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 400 })
+  }
+}
+
+async function streamGasUpdates(request) {
+  try {
+    await GasIngestService.start()
+  } catch (error) {
+    return NextResponse.json({
+      error: 'Gas ingestion unavailable',
+      message: error.message
+    }, { status: 503 })
+  }
+  
+  // Chains the page shows (?chains=ethereum,base); unknown ids are ignored
+  const chainIds = (new URL(request.url).searchParams.get('chains') || '')
+    .split(',')
+    .map((chainId) => chainId.trim())
+    .filter((chainId) => SUPPORTED_CHAINS.includes(chainId))
+  
+  let unsubscribe = () => {}
+  let heartbeat = null
+  
+  const stream = new ReadableStream({
+    start(controller) {
+      unsubscribe = GasIngestService.subscribe((frame) => controller.enqueue(frame), chainIds)
+      
+      const ping = new TextEncoder().encode(': ping\n\n')
+      heartbeat = setInterval(() => controller.enqueue(ping), HEARTBEAT_INTERVAL_MS)
+      
+      request.signal.addEventListener('abort', () => {
+        clearInterval(heartbeat)
+        unsubscribe()
+        try {
+          controller.close()
+        } catch (error) {
+          // Already closed
+        }
+      })
+    },
+    cancel() {
+      clearInterval(heartbeat)
+      unsubscribe()
+    }
+  })
+  
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive',
+      'X-Accel-Buffering': 'no'
+    }
+  })
+}
+
+// Accepts epoch milliseconds or an ISO date
+function parseTime(value, fallback) {
+  if (!value) return fallback
+  const time = /^\d+$/.test(value) ? Number(value) : Date.parse(value)
+  return Number.isNaN(time) ? null : time
+}
+
+async function getGasHistory(chainId, searchParams) {
+  if (!SUPPORTED_CHAINS.includes(chainId)) {
+    return NextResponse.json({ error: `Unknown chain: ${chainId}` }, { status: 404 })
+  }
+  if (!GasIngestService.history) {
+    return NextResponse.json({ error: 'History storage is not configured' }, { status: 503 })
+  }
+  
+  const to = parseTime(searchParams.get('to'), Date.now())
+  const from = parseTime(searchParams.get('from'), to - DEFAULT_HISTORY_RANGE_MS)
+  if (from === null || to === null || from > to) {
+    return NextResponse.json({ error: 'Invalid from/to range' }, { status: 400 })
+  }
+  
+  try {
+    const points = await GasIngestService.history.getGasHistory(chainId, from, to)
+    return NextResponse.json({ chain: chainId, from, to, points })
+  } catch (error) {
+    log.error('Error reading gas history:', error)
+    return NextResponse.json({ error: 'Failed to read gas history' }, { status: 500 })
+  }
+}
+
+// Body with a content-hash ETag; answers 304 when the client already has it
+function cachedResponse(request, body, { contentType = 'application/json', cacheControl, headers = {} }) {
+  const etag = `W/"${createHash('sha1').update(body).digest('base64url')}"`
+  const cacheHeaders = { 'ETag': etag, 'Cache-Control': cacheControl, ...headers }
+  
+  if (request.headers.get('if-none-match') === etag) {
+    return new Response(null, { status: 304, headers: cacheHeaders })
+  }
+  return new Response(body, {
+    headers: { 'Content-Type': contentType, ...cacheHeaders }
+  })
+}
+
+async function getLatestGas(request, searchParams) {
+  const requested = searchParams.get('chains')
+  const chainIds = requested ? requested.split(',').map((chainId) => chainId.trim()) : SUPPORTED_CHAINS
+  
+  const unknown = chainIds.filter((chainId) => !SUPPORTED_CHAINS.includes(chainId))
+  if (unknown.length > 0) {
+    return NextResponse.json({ error: `Unknown chain: ${unknown.join(', ')}` }, { status: 404 })
+  }
+  
+  try {
+    await GasIngestService.start()
+  } catch (error) {
+    // Serve whatever was collected before the upstream went away
+  }
+  
+  const { chains, ethPrice, isConnected } = GasIngestService.getSnapshot()
+  const body = JSON.stringify({
+    chains: Object.fromEntries(chainIds.map((chainId) => [chainId, chains[chainId] || null])),
+    ethPrice,
+    isConnected
+  })
+  
+  return cachedResponse(request, body, {
+    cacheControl: 'public, max-age=1, stale-while-revalidate=5'
+  })
+}
+
+async function getGasOHLC(request, chainId, searchParams) {
+  if (!SUPPORTED_CHAINS.includes(chainId)) {
+    return NextResponse.json({ error: `Unknown chain: ${chainId}` }, { status: 404 })
+  }
+  
+  const interval = Number(searchParams.get('interval') || 15)
+  if (!DEFAULT_CANDLE_INTERVALS.includes(interval)) {
+    return NextResponse.json({
+      error: `Unsupported interval: ${searchParams.get('interval')}`,
+      supportedIntervals: DEFAULT_CANDLE_INTERVALS
+    }, { status: 400 })
+  }
+  
+  const now = Date.now()
+  const to = parseTime(searchParams.get('to'), now)
+  const from = parseTime(searchParams.get('from'), to - DEFAULT_HISTORY_RANGE_MS)
+  if (from === null || to === null || from > to) {
+    return NextResponse.json({ error: 'Invalid from/to range' }, { status: 400 })
+  }
+  
+  const format = searchParams.get('format') || 'json'
+  if (!['json', 'columnar', 'binary'].includes(format)) {
+    return NextResponse.json({ error: `Unsupported format: ${format}` }, { status: 400 })
+  }
+  
+  let candles
+  try {
+    candles = await GasIngestService.getCandles(chainId, interval, from, to)
+  } catch (error) {
+    log.error('Error reading gas candles:', error)
+    return NextResponse.json({ error: 'Failed to read gas candles' }, { status: 500 })
+  }
+  
+  // Ranges that ended before the current bucket opened no longer change often
+  const isClosedRange = to < now - interval * 60 * 1000
+  const cacheControl = isClosedRange
+    ? 'public, max-age=300'
+    : 'public, max-age=5, stale-while-revalidate=30'
+  
+  if (format === 'binary') {
+    return cachedResponse(request, toBinaryCandles(candles), {
+      contentType: 'application/octet-stream',
+      cacheControl,
+      headers: {
+        'X-Candle-Count': String(candles.length),
+        'X-Candle-Layout': 'float64le column-major: time,open,high,low,close,volume'
+      }
+    })
+  }
+  
+  const body = JSON.stringify({
+    chain: chainId,
+    interval,
+    from,
+    to,
+    unit: 'gwei',
+    candles: format === 'columnar' ? toColumnarCandles(candles) : candles
+  })
+  return cachedResponse(request, body, { cacheControl })
+}
+
+function getMetrics() {
+  if (!metrics) {
+    return NextResponse.json({ error: 'Metrics are disabled; set GAS_METRICS=1' }, { status: 404 })
+  }
+  return new Response(metrics.render(), {
+    headers: {
+      'Content-Type': 'text/plain; version=0.0.4; charset=utf-8',
+      'Cache-Control': 'no-store'
+    }
+  })
+}
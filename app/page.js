@@ -1,9 +1,28 @@
 'use client'
 
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { motion, AnimatePresence } from 'framer-motion'
-import { useGasStore } from '@/lib/store'
+import { useShallow } from 'zustand/react/shallow'
+import {
+  useGasStore,
+  useChain,
+  useChainIds,
+  useCheapestChainId,
+  useGasActions,
+  useGasFields,
+  tierPriorityFee,
+  transferCostUSD
+} from '@/lib/store'
+import { countRender } from '@/lib/renderStats'
+import { latencyTraceEnabled } from '@/lib/latencyTrace'
+import { UpdateScheduler } from '@/lib/updateScheduler'
+import { gasWorkerEnabled, startGasWorker } from '@/lib/workerClient'
 import Web3Service from '@/lib/web3'
+import { CHAINS, getChain } from '@/lib/chains'
+import { FEE_TIERS } from '@/lib/feeEstimator'
+import { rankScenarios } from '@/lib/simulation'
+import { loadSnapshot, persistSnapshots } from '@/lib/snapshotCache'
+import { log } from '@/lib/log'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
 import { Badge } from '@/components/ui/badge'
@@ -11,6 +30,7 @@ import { Input } from '@/components/ui/input'
 import { Label } from '@/components/ui/label'
 import { ThemeToggle } from '@/components/ui/theme-toggle'
 import GasChart from '@/components/GasChart'
+import LatencyOverlay from '@/components/LatencyOverlay'
 import { 
   Activity, 
   TrendingUp, 
@@ -85,254 +105,640 @@ const pulseVariants = {
   }
 }
 
+const gasSource = process.env.NEXT_PUBLIC_GAS_SOURCE === 'direct' ? 'direct' : 'stream'
+
+// The chain on screen connects first; the others follow in display order
+function priorityOrder(chainIds, first) {
+  return chainIds.includes(first) ? [first, ...chainIds.filter((chainId) => chainId !== first)] : chainIds
+}
+
+function formatGasPrice(gasPrice) {
+  return (gasPrice / 1e9).toFixed(2)
+}
+
+function formatTime(timestamp) {
+  if (!timestamp) return new Date().toLocaleTimeString()
+  return new Date(timestamp).toLocaleTimeString()
+}
+
+// null when there is no USD price for the amount
+function formatUSD(amount) {
+  if (amount === null) return '—'
+  return new Intl.NumberFormat('en-US', {
+    style: 'currency',
+    currency: 'USD',
+    minimumFractionDigits: 2,
+    maximumFractionDigits: 6
+  }).format(amount)
+}
+
+function LastUpdateButton() {
+  const lastUpdateTime = useGasStore((state) => state.lastUpdateTime)
+  countRender('LastUpdateButton')
+  
+  return (
+    <Button variant="outline" size="sm" className="gap-2 hidden sm:flex">
+      <RefreshCw className="w-4 h-4" />
+      <span className="hidden md:inline">Last: {formatTime(lastUpdateTime)}</span>
+      <span className="md:hidden">
+        <Clock className="w-4 h-4" />
+      </span>
+    </Button>
+  )
+}
+
+function PriceStat() {
+  const { usdPrice, priceStats } = useGasFields('usdPrice', 'priceStats')
+  countRender('PriceStat')
+  
+  return (
+    <>
+      <p className="text-lg sm:text-xl lg:text-2xl font-bold text-green-500">
+        ${usdPrice.toFixed(2)}
+      </p>
+      {priceStats && (
+        <p className="text-xs text-muted-foreground mt-1">
+          {Math.round(priceStats.windowMs / 60000)}m TWAP ${priceStats.twap.toFixed(2)}
+        </p>
+      )}
+    </>
+  )
+}
+
+// Short-horizon forecast from the chain's streaming statistics
+function ForecastRow({ forecast }) {
+  const next = forecast?.horizons.find((horizon) => horizon.blocks === 5)
+  if (!next) return null
+  
+  const label = forecast.target === 'baseFee' ? 'Base fee in 5 blocks' : 'Gas price in 5 blocks'
+  const p50 = forecast.percentiles.p50
+  
+  return (
+    <div className="space-y-1 text-sm">
+      <div className="flex items-center justify-between">
+        <span className="text-muted-foreground flex items-center gap-1">
+          <TrendingUp className="w-3 h-3" />
+          {label}
+        </span>
+        <span className="font-medium">{formatGasPrice(next.expected)} gwei</span>
+      </div>
+      <div className="flex items-center justify-between text-xs text-muted-foreground">
+        <span>90% band {formatGasPrice(next.lower)}–{formatGasPrice(next.upper)}</span>
+        {p50 !== undefined && <span>median {p50.toFixed(2)} · vol {(forecast.volatility * 100).toFixed(1)}%</span>}
+      </div>
+    </div>
+  )
+}
+
+// One live card per chain; subscribes to its own slice only
+function ChainCard({ chainId, index }) {
+  const chain = useChain(chainId)
+  countRender(`ChainCard:${chainId}`)
+  
+  return (
+    <motion.div
+      variants={cardVariants}
+      initial="hidden"
+      animate="visible"
+      whileHover="hover"
+      transition={{ delay: index * 0.1 }}
+      className="group"
+    >
+      <Card className="relative overflow-hidden h-full hover:shadow-xl transition-all duration-300 border-2 hover:border-primary/20">
+        <div className="absolute inset-0 bg-gradient-to-br from-transparent via-transparent to-primary/5 opacity-0 group-hover:opacity-100 transition-opacity duration-300" />
+        
+        <CardHeader className="pb-3">
+          <div className="flex items-center justify-between">
+            <div className="flex items-center gap-2">
+              <motion.div 
+                className="w-4 h-4 rounded-full relative"
+                style={{ backgroundColor: chain.color }}
+                animate={{ boxShadow: [`0 0 0 0 ${chain.color}40`, `0 0 0 8px ${chain.color}00`] }}
+                transition={{ duration: 2, repeat: Infinity }}
+              />
+              <CardTitle className="text-lg">{chain.name}</CardTitle>
+            </div>
+            <motion.div
+              initial={{ scale: 0 }}
+              animate={{ scale: 1 }}
+              transition={{ delay: 0.3 + index * 0.1 }}
+            >
+              <Badge variant="default" className="gap-1">
+                <motion.div
+                  animate={{ scale: [1, 1.2, 1] }}
+                  transition={{ duration: 1, repeat: Infinity }}
+                >
+                  <Sparkles className="w-3 h-3" />
+                </motion.div>
+                Live
+              </Badge>
+            </motion.div>
+          </div>
+        </CardHeader>
+        
+        <CardContent className="space-y-4">
+          <div className="flex items-center justify-between">
+            <div className="flex items-center gap-2">
+              <Zap className="w-4 h-4 text-yellow-500" />
+              <span className="text-sm text-muted-foreground">Gas Price</span>
+            </div>
+            <div className="flex items-center gap-2">
+              <motion.span 
+                className="text-xl sm:text-2xl font-bold"
+                key={chain.gasPrice}
+                initial={{ scale: 1.2, color: "#10b981" }}
+                animate={{ scale: 1, color: "inherit" }}
+                transition={{ duration: 0.3 }}
+              >
+                {formatGasPrice(chain.gasPrice)}
+              </motion.span>
+              <span className="text-sm text-muted-foreground">gwei</span>
+            </div>
+          </div>
+          
+          <div className="grid grid-cols-2 gap-4 text-sm">
+            <div className="space-y-1">
+              <p className="text-muted-foreground">Base Fee</p>
+              <p className="font-medium">{formatGasPrice(chain.baseFee)} gwei</p>
+            </div>
+            <div className="space-y-1">
+              <p className="text-muted-foreground">Priority Fee</p>
+              <p className="font-medium">{formatGasPrice(chain.priorityFee)} gwei</p>
+            </div>
+          </div>
+          
+          <ForecastRow forecast={chain.forecast} />
+          
+          <div className="pt-2 border-t">
+            <div className="flex items-center justify-between text-sm">
+              <span className="text-muted-foreground flex items-center gap-1">
+                <BarChart3 className="w-3 h-3" />
+                Block #{chain.lastBlock}
+              </span>
+              <span className="text-muted-foreground">
+                {formatTime(Date.now())}
+              </span>
+            </div>
+          </div>
+        </CardContent>
+      </Card>
+    </motion.div>
+  )
+}
+
+function ChainButton({ chainId, isSelected, onSelect }) {
+  const { name, color } = useGasStore(useShallow((state) => ({
+    name: state.chains[chainId].name,
+    color: state.chains[chainId].color
+  })))
+  
+  return (
+    <Button
+      variant={isSelected ? "default" : "outline"}
+      size="sm"
+      onClick={() => onSelect(chainId)}
+      className="gap-2"
+    >
+      <div 
+        className="w-3 h-3 rounded-full"
+        style={{ backgroundColor: color }}
+      />
+      {name}
+    </Button>
+  )
+}
+
+// Registry chains as toggles; only shown chains get sockets and store slices
+function NetworkPicker() {
+  const chainIds = useChainIds()
+  const { showChain, hideChain } = useGasActions()
+  
+  return (
+    <div className="flex flex-wrap gap-2">
+      {CHAINS.map(({ id, name, color }) => {
+        const isVisible = chainIds.includes(id)
+        return (
+          <Button
+            key={id}
+            variant={isVisible ? "default" : "outline"}
+            size="sm"
+            onClick={() => isVisible ? hideChain(id) : showChain(id)}
+            disabled={isVisible && chainIds.length === 1}
+            className="gap-2"
+          >
+            <div 
+              className="w-3 h-3 rounded-full"
+              style={{ backgroundColor: color }}
+            />
+            {name}
+          </Button>
+        )
+      })}
+    </div>
+  )
+}
+
+// Simulation rows re-render for their own chain, the ETH price and the
+// transfer amount; the card itself only when the cheapest chain changes
+function CostComparisonRow({ chainId, isCheapest }) {
+  const chain = useChain(chainId)
+  const { usdPrice, simulationAmount, feeTier } = useGasFields('usdPrice', 'simulationAmount', 'feeTier')
+  countRender(`CostComparisonRow:${chainId}`)
+  
+  const priorityFee = tierPriorityFee(chain, feeTier)
+  // Same cost as the scenario table's transfer row, L1 data fee included
+  const gasCost = transferCostUSD(chainId, chain, feeTier, usdPrice)
+  const totalCost = gasCost === null ? null : gasCost + simulationAmount * usdPrice
+  
+  return (
+    <motion.div
+      variants={itemVariants}
+      whileHover={{ scale: 1.02 }}
+      className={`p-4 rounded-lg border-2 transition-all duration-300 ${
+        isCheapest 
+          ? 'border-green-500 bg-green-50 dark:bg-green-900/20 shadow-lg' 
+          : 'border-border bg-card hover:border-primary/20'
+      }`}
+    >
+      <div className="flex items-center justify-between mb-2">
+        <div className="flex items-center gap-2">
+          <motion.div 
+            className="w-3 h-3 rounded-full"
+            style={{ backgroundColor: chain.color }}
+            animate={isCheapest ? { 
+              boxShadow: [`0 0 0 0 ${chain.color}40`, `0 0 0 6px ${chain.color}00`] 
+            } : {}}
+            transition={{ duration: 1.5, repeat: Infinity }}
+          />
+          <span className="font-medium">{chain.name}</span>
+          <AnimatePresence>
+            {isCheapest && (
+              <motion.span
+                initial={{ scale: 0, opacity: 0 }}
+                animate={{ scale: 1, opacity: 1 }}
+                exit={{ scale: 0, opacity: 0 }}
+                className="px-2 py-1 text-xs bg-green-100 text-green-800 dark:bg-green-900 dark:text-green-200 rounded-full font-medium"
+              >
+                Cheapest
+              </motion.span>
+            )}
+          </AnimatePresence>
+        </div>
+        <motion.span 
+          className="text-lg font-bold"
+          key={totalCost}
+          initial={{ scale: 1.1 }}
+          animate={{ scale: 1 }}
+          transition={{ duration: 0.2 }}
+        >
+          {formatUSD(totalCost)}
+        </motion.span>
+      </div>
+      
+      <div className="grid grid-cols-2 gap-4 text-sm">
+        <div>
+          <div className="flex items-center gap-1 mb-1">
+            <Zap className="w-3 h-3 text-yellow-500" />
+            <span className="text-muted-foreground">Gas Cost</span>
+          </div>
+          <p className="font-medium">{formatUSD(gasCost)}</p>
+          <p className="text-xs text-muted-foreground">
+            {gasCost === null ? `No USD price for ${chain.symbol}` : `Tip ${formatGasPrice(priorityFee)} gwei`}
+          </p>
+        </div>
+        <div>
+          <div className="flex items-center gap-1 mb-1">
+            <DollarSign className="w-3 h-3 text-green-500" />
+            <span className="text-muted-foreground">Transfer Value</span>
+          </div>
+          <p className="font-medium">{formatUSD(simulationAmount * usdPrice)}</p>
+        </div>
+      </div>
+    </motion.div>
+  )
+}
+
+// Every gas profile x tier for the visible chains, computed in one batch on
+// demand rather than per render
+function ScenarioTable() {
+  const { feeTier } = useGasFields('feeTier')
+  const { simulate } = useGasActions()
+  const [result, setResult] = useState(null)
+  
+  const run = () => {
+    const simulation = simulate()
+    setResult({
+      table: rankScenarios(simulation),
+      scenarioCount: simulation.scenarioCount,
+      elapsedMs: simulation.elapsedMs
+    })
+  }
+  
+  const chains = useGasStore.getState().chains
+  const rows = result ? result.table.filter((row) => row.tier === feeTier) : []
+  
+  return (
+    <div className="space-y-3">
+      <div className="flex items-center justify-between gap-2">
+        <h4 className="font-semibold flex items-center gap-2">
+          <BarChart3 className="w-4 h-4" />
+          Scenario Comparison
+        </h4>
+        <Button variant="outline" size="sm" onClick={run}>
+          {result ? 'Recompute' : 'Compare all'}
+        </Button>
+      </div>
+      
+      {result && (
+        <>
+          <div className="overflow-x-auto">
+            <table className="w-full text-sm">
+              <thead>
+                <tr className="text-left text-muted-foreground">
+                  <th className="py-1 pr-2 font-medium">Transaction</th>
+                  <th className="py-1 pr-2 font-medium">Cheapest</th>
+                  <th className="py-1 pr-2 font-medium text-right">Gas</th>
+                  <th className="py-1 font-medium">Next best</th>
+                </tr>
+              </thead>
+              <tbody>
+                {rows.map(({ profile, label, ranking }) => (
+                  <tr key={profile} className="border-t">
+                    <td className="py-1 pr-2">{label}</td>
+                    <td className="py-1 pr-2 font-medium">{chains[ranking[0]?.chainId]?.name ?? '—'}</td>
+                    <td className="py-1 pr-2 text-right font-mono">{ranking[0] ? formatUSD(ranking[0].gasCostUSD) : '—'}</td>
+                    <td className="py-1 text-muted-foreground">
+                      {ranking[1] ? `${chains[ranking[1].chainId]?.name} ${formatUSD(ranking[1].gasCostUSD)}` : '—'}
+                    </td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+          <p className="text-xs text-muted-foreground">
+            {result.scenarioCount} scenarios in {result.elapsedMs.toFixed(2)} ms
+          </p>
+        </>
+      )}
+    </div>
+  )
+}
+
+function SimulationCard() {
+  const chainIds = useChainIds()
+  const cheapestChainId = useCheapestChainId()
+  const { usdPrice, simulationAmount, feeTier } = useGasFields('usdPrice', 'simulationAmount', 'feeTier')
+  const { setSimulationAmount, setFeeTier } = useGasActions()
+  countRender('SimulationCard')
+  
+  return (
+    <Card className="w-full hover:shadow-lg transition-all duration-300">
+      <CardHeader>
+        <div className="flex items-center gap-2">
+          <motion.div
+            animate={{ rotate: [0, 360] }}
+            transition={{ duration: 4, repeat: Infinity, ease: "linear" }}
+          >
+            <Calculator className="w-5 h-5 text-blue-500" />
+          </motion.div>
+          <CardTitle className="text-lg sm:text-xl">Transaction Cost Simulator</CardTitle>
+        </div>
+      </CardHeader>
+      
+      <CardContent className="space-y-6">
+        <div className="space-y-2">
+          <Label htmlFor="amount" className="text-sm font-medium">
+            Transfer Amount (ETH)
+          </Label>
+          <Input
+            id="amount"
+            type="number"
+            placeholder="0.1"
+            value={simulationAmount}
+            onChange={(e) => setSimulationAmount(parseFloat(e.target.value) || 0)}
+            step="0.01"
+            min="0"
+            className="text-lg font-mono"
+          />
+          <p className="text-sm text-muted-foreground">
+            ≈ {formatUSD(simulationAmount * usdPrice)} USD
+          </p>
+        </div>
+        
+        <div className="space-y-2">
+          <Label className="text-sm font-medium">Priority Fee</Label>
+          <div className="flex gap-2">
+            {FEE_TIERS.map((tier) => (
+              <Button
+                key={tier}
+                variant={feeTier === tier ? "default" : "outline"}
+                size="sm"
+                onClick={() => setFeeTier(tier)}
+                className="capitalize"
+              >
+                {tier}
+              </Button>
+            ))}
+          </div>
+          <p className="text-xs text-muted-foreground">
+            10th / 50th / 90th percentile tips over the last 20 blocks
+          </p>
+        </div>
+        
+        <div className="space-y-4">
+          <h4 className="font-semibold flex items-center gap-2">
+            <DollarSign className="w-4 h-4" />
+            Cost Comparison
+          </h4>
+          
+          <motion.div 
+            variants={containerVariants}
+            initial="hidden"
+            animate="visible"
+            className="grid gap-3"
+          >
+            {chainIds.map((chainId) => (
+              <CostComparisonRow
+                key={chainId}
+                chainId={chainId}
+                isCheapest={chainId === cheapestChainId}
+              />
+            ))}
+          </motion.div>
+        </div>
+        
+        <ScenarioTable />
+      </CardContent>
+    </Card>
+  )
+}
+
 export default function GasTrackerApp() {
+  countRender('GasTrackerApp')
+  
+  // Only page-level fields here; per-chain and price data are selected by
+  // the components that display them so a block re-renders just its card
+  const { mode, isConnected } = useGasFields('mode', 'isConnected')
   const {
-    mode,
     setMode,
-    usdPrice,
-    setUsdPrice,
-    updateChainDataWithHistory,
-    setConnectionStatus,
-    isConnected,
-    lastUpdateTime,
-    chains,
-    simulationAmount,
-    setSimulationAmount,
-    getOHLCData
-  } = useGasStore()
+    applyBatch,
+    hydrateHistory,
+    restoreSnapshot
+  } = useGasActions()
+  const chainIds = useChainIds()
   
-  const [isInitializing, setIsInitializing] = useState(true)
+  // Last-known state from this browser, painted before any connection is up
+  const [cachedSnapshot] = useState(loadSnapshot)
+  const [isConnecting, setIsConnecting] = useState(true)
   const [mounted, setMounted] = useState(false)
-  const [selectedChartChain, setSelectedChartChain] = useState('ethereum')
+  const [selectedChartChain, setSelectedChartChain] = useState(cachedSnapshot?.selectedChartChain || 'ethereum')
+  const chartChainId = chainIds.includes(selectedChartChain) ? selectedChartChain : chainIds[0]
+  
+  // Live source that can follow the visible chains (direct sockets only)
+  const sourceRef = useRef(null)
+  const hydratedRef = useRef(new Set())
+  const chartChainRef = useRef(chartChainId)
+  chartChainRef.current = chartChainId
   
   useEffect(() => {
+    if (cachedSnapshot) restoreSnapshot(cachedSnapshot)
     setMounted(true)
-  }, [])
+  }, [cachedSnapshot, restoreSnapshot])
+  
+  // The server's latest snapshot is usually fresher than ours; it arrives
+  // without waiting for the live stream or any socket
+  useEffect(() => {
+    if (gasSource === 'direct') return
+    
+    const { visibleChainIds } = useGasStore.getState()
+    fetch(`/api/gas/latest?chains=${visibleChainIds.join(',')}`)
+      .then((response) => response.ok ? response.json() : null)
+      .then((snapshot) => {
+        if (snapshot) restoreSnapshot({ chains: snapshot.chains, usdPrice: snapshot.ethPrice })
+      })
+      .catch((error) => log.warn('Could not load server snapshot:', error))
+  }, [restoreSnapshot])
+  
+  // Open sockets for newly shown chains and close hidden ones
+  useEffect(() => {
+    sourceRef.current?.setChains(chainIds)
+  }, [chainIds])
+  
+  // Load persisted history so charts start from real data
+  useEffect(() => {
+    const to = Date.now()
+    const from = to - 24 * 60 * 60 * 1000
+    
+    chainIds.forEach(async (chainId) => {
+      if (hydratedRef.current.has(chainId)) return
+      hydratedRef.current.add(chainId)
+      try {
+        const response = await fetch(`/api/gas/${chainId}/history?from=${from}&to=${to}`)
+        if (!response.ok) return
+        const { points } = await response.json()
+        hydrateHistory(chainId, points)
+      } catch (error) {
+        log.warn(`Could not load stored history for ${chainId}:`, error)
+      }
+    })
+  }, [chainIds, hydrateHistory])
+  
+  // Coalesces block and price callbacks into one store update per flush
+  const [updateScheduler] = useState(() => new UpdateScheduler(applyBatch, {
+    intervalMs: Number(process.env.NEXT_PUBLIC_UPDATE_FLUSH_MS || 0)
+  }))
+  
+  useEffect(() => () => updateScheduler.dispose(), [updateScheduler])
   
   // Initialize with real Web3 service
   useEffect(() => {
     const initializeApp = async () => {
-      console.log("Starting app initialization...")
-      setIsInitializing(true)
+      log.debug("Starting app initialization...")
+      setIsConnecting(true)
+      
+      const { visibleChainIds } = useGasStore.getState()
+      const orderedChainIds = priorityOrder(visibleChainIds, chartChainRef.current)
       
       try {
         // Try to connect to Web3 first
-        console.log('Attempting Web3 connections...')
-        
-        Web3Service.setCallbacks({
-          onGasUpdate: (chainId, gasData) => {
-            console.log(`Gas update for ${chainId}:`, gasData)
-            updateChainDataWithHistory(chainId, gasData)
-          },
-          onPriceUpdate: (price) => {
-            console.log('Price update:', price)
-            setUsdPrice(price)
-          },
-          onConnectionChange: (isConnected) => {
-            console.log('Connection status changed:', isConnected)
-            setConnectionStatus(isConnected)
-          }
-        })
+        log.debug('Attempting Web3 connections...')
         
-        // Try to initialize providers with timeout
-        await Promise.race([
-          Web3Service.initializeProviders(),
-          new Promise((_, reject) => 
-            setTimeout(() => reject(new Error('Web3 initialization timeout')), 8000)
-          )
-        ])
+        // Buffer callbacks and apply them once per frame
+        Web3Service.setCallbacks(updateScheduler.callbacks())
         
-        console.log('Web3 initialization successful')
-        setIsInitializing(false)
-        
-      } catch (error) {
-        console.warn('Web3 initialization failed, falling back to mock data:', error)
-        
-        // Setup mock data as fallback
-        const mockPrice = 3200 + Math.random() * 400
-        setUsdPrice(mockPrice)
-        
-        const mockGasData = {
-          ethereum: { 
-            baseFee: 15000000000 + Math.random() * 5000000000, 
-            priorityFee: 2000000000, 
-            gasPrice: 17000000000 + Math.random() * 5000000000, 
-            lastBlock: 18500000 + Math.floor(Math.random() * 100), 
-            timestamp: Date.now() 
-          },
-          polygon: { 
-            baseFee: 30000000000 + Math.random() * 10000000000, 
-            priorityFee: 2000000000, 
-            gasPrice: 32000000000 + Math.random() * 10000000000, 
-            lastBlock: 48900000 + Math.floor(Math.random() * 100), 
-            timestamp: Date.now() 
-          },
-          arbitrum: { 
-            baseFee: 100000000 + Math.random() * 50000000, 
-            priorityFee: 2000000000, 
-            gasPrice: 2100000000 + Math.random() * 50000000, 
-            lastBlock: 15600000 + Math.floor(Math.random() * 100), 
-            timestamp: Date.now() 
+        if (gasWorkerEnabled) {
+          // RPC decoding and candle aggregation run off the main thread
+          const worker = await startGasWorker(applyBatch, {
+            source: gasSource,
+            chainIds: orderedChainIds
+          })
+          // Unmounted while the worker was starting
+          if (cancelled) {
+            worker.stop()
+            return
+          }
+          sourceRef.current = worker
+          log.debug('Gas worker connected')
+        } else {
+          // Prefer the shared server-side feed; fall back to direct providers
+          try {
+            if (gasSource === 'direct') {
+              throw new Error('Server gas stream disabled')
+            }
+            // Either way, picking chains goes through setActiveChains
+            sourceRef.current = {
+              setChains: (nextChainIds) => Web3Service.setActiveChains(nextChainIds)
+            }
+            await Web3Service.connectToStream('/api/gas/stream', orderedChainIds)
+            log.debug('Subscribed to server gas stream')
+          } catch (streamError) {
+            log.warn('Server gas stream unavailable, connecting directly:', streamError)
+            
+            // Viewed chain first; resolves once any chain is live
+            await Promise.race([
+              Web3Service.initializeProviders(orderedChainIds),
+              new Promise((_, reject) => 
+                setTimeout(() => reject(new Error('Web3 initialization timeout')), 8000)
+              )
+            ])
           }
         }
         
-        Object.entries(mockGasData).forEach(([chainId, data]) => {
-          updateChainDataWithHistory(chainId, data)
-        })
+        if (cancelled) return
+        log.debug('Web3 initialization successful')
+        setIsConnecting(false)
         
-        setConnectionStatus(true) // Show as connected for demo purposes
-        setIsInitializing(false)
-        
-        console.log('Fallback to mock data complete')
+        // Only live data is worth painting on the next visit
+        stopPersisting = persistSnapshots(useGasStore, {
+          getExtra: () => ({ selectedChartChain: chartChainRef.current })
+        })
+      
+      } catch (error) {
+        // Keep whatever is on screen (cached or partial live data) and show
+        // the page as offline; providers keep reconnecting in the background.
+        // For repeatable data without RPC, run the server in replay mode.
+        log.warn('Web3 initialization failed:', error)
+        setIsConnecting(false)
       }
     }
     
+    // Cleanup can run before initializeApp's awaits settle
+    let cancelled = false
+    let stopPersisting = () => {}
     initializeApp()
-  }, [updateChainDataWithHistory, setUsdPrice, setConnectionStatus])
-  
-  // Fallback periodic updates if Web3 is not working
-  useEffect(() => {
-    const interval = setInterval(() => {
-      const mockPrice = 3200 + Math.random() * 400
-      setUsdPrice(mockPrice)
-      
-      const mockGasData = {
-        ethereum: { 
-          baseFee: 15000000000 + Math.random() * 5000000000, 
-          priorityFee: 2000000000, 
-          gasPrice: 17000000000 + Math.random() * 5000000000,
-          lastBlock: 18500000 + Math.floor(Math.random() * 100),
-          timestamp: Date.now()
-        },
-        polygon: { 
-          baseFee: 30000000000 + Math.random() * 10000000000, 
-          priorityFee: 2000000000, 
-          gasPrice: 32000000000 + Math.random() * 10000000000,
-          lastBlock: 48900000 + Math.floor(Math.random() * 100),
-          timestamp: Date.now()
-        },
-        arbitrum: { 
-          baseFee: 100000000 + Math.random() * 50000000, 
-          priorityFee: 2000000000, 
-          gasPrice: 2100000000 + Math.random() * 50000000,
-          lastBlock: 15600000 + Math.floor(Math.random() * 100),
-          timestamp: Date.now()
-        }
-      }
-      
-      Object.entries(mockGasData).forEach(([chainId, data]) => {
-        updateChainDataWithHistory(chainId, data)
-      })
-    }, 6000)
-    
-    return () => clearInterval(interval)
-  }, [setUsdPrice, updateChainDataWithHistory])
-  
-  const formatGasPrice = (gasPrice) => {
-    return (gasPrice / 1e9).toFixed(2)
-  }
-  
-  const formatTime = (timestamp) => {
-    if (!timestamp) return new Date().toLocaleTimeString()
-    return new Date(timestamp).toLocaleTimeString()
-  }
-  
-  const formatUSD = (amount) => {
-    return new Intl.NumberFormat('en-US', {
-      style: 'currency',
-      currency: 'USD',
-      minimumFractionDigits: 2,
-      maximumFractionDigits: 6
-    }).format(amount)
-  }
-  
-  const getGasCostUSD = (chainId) => {
-    const chain = chains[chainId]
-    if (!chain) return 0
-    const gasLimit = 21000
-    const gasCostWei = (chain.baseFee + chain.priorityFee) * gasLimit
-    const gasCostEth = gasCostWei / Math.pow(10, 18)
-    return gasCostEth * usdPrice
-  }
-  
-  const getTransactionCostUSD = (chainId) => {
-    const gasCost = getGasCostUSD(chainId)
-    const transactionValue = simulationAmount * usdPrice
-    return gasCost + transactionValue
-  }
+    return () => {
+      cancelled = true
+      stopPersisting()
+      // Only the gas worker has anything to stop
+      sourceRef.current?.stop?.()
+      sourceRef.current = null
+    }
+  }, [updateScheduler, applyBatch])
   
-  const getCheapestChain = () => {
-    let cheapest = null
-    let lowestCost = Infinity
-    
-    Object.entries(chains).forEach(([chainId, chain]) => {
-      const cost = getGasCostUSD(chainId)
-      if (cost < lowestCost) {
-        lowestCost = cost
-        cheapest = chainId
-      }
-    })
-    
-    return cheapest
-  }
-
   if (!mounted) {
     return null
   }
   
-  if (isInitializing) {
-    return (
-      <div className="min-h-screen bg-gradient-to-br from-background via-background to-secondary/20 flex items-center justify-center p-4">
-        <motion.div 
-          initial={{ opacity: 0, scale: 0.8 }}
-          animate={{ opacity: 1, scale: 1 }}
-          transition={{ duration: 0.6 }}
-          className="text-center space-y-6"
-        >
-          <motion.div
-            animate={{ rotate: 360 }}
-            transition={{ duration: 2, repeat: Infinity, ease: "linear" }}
-            className="w-16 h-16 border-4 border-primary/30 border-t-primary rounded-full mx-auto"
-          />
-          <motion.div
-            initial={{ opacity: 0, y: 20 }}
-            animate={{ opacity: 1, y: 0 }}
-            transition={{ delay: 0.3 }}
-          >
-            <h2 className="text-2xl md:text-3xl font-bold bg-gradient-to-r from-primary to-blue-600 bg-clip-text text-transparent">
-              Initializing Gas Tracker
-            </h2>
-            <p className="text-muted-foreground mt-2 text-sm md:text-base">
-              Connecting to blockchain networks...
-            </p>
-          </motion.div>
-          <motion.div
-            initial={{ opacity: 0 }}
-            animate={{ opacity: 1 }}
-            transition={{ delay: 0.6 }}
-            className="flex justify-center space-x-2"
-          >
-            {[0, 1, 2].map((i) => (
-              <motion.div
-                key={i}
-                animate={{
-                  y: [0, -10, 0],
-                  opacity: [0.5, 1, 0.5]
-                }}
-                transition={{
-                  duration: 1.5,
-                  repeat: Infinity,
-                  delay: i * 0.2
-                }}
-                className="w-2 h-2 bg-primary rounded-full"
-              />
-            ))}
-          </motion.div>
-        </motion.div>
-      </div>
-    )
-  }
-  
   return (
     <div className="min-h-screen bg-gradient-to-br from-background via-background to-secondary/20">
       <div className="container mx-auto px-4 sm:px-6 lg:px-8 py-4 sm:py-6 lg:py-8">
@@ -363,23 +769,17 @@ export default function GasTrackerApp() {
               transition={{ delay: 0.3 }}
               className="flex items-center gap-2 sm:gap-4 flex-wrap"
             >
-              <Badge variant={isConnected ? "default" : "destructive"} className="gap-2 px-3 py-1">
+              <Badge variant={isConnected ? "default" : isConnecting ? "secondary" : "destructive"} className="gap-2 px-3 py-1">
                 <motion.div
                   variants={pulseVariants}
                   animate={isConnected ? "animate" : ""}
                 >
                   {isConnected ? <Wifi className="w-4 h-4" /> : <WifiOff className="w-4 h-4" />}
                 </motion.div>
-                {isConnected ? 'Connected' : 'Disconnected'}
+                {isConnected ? 'Connected' : isConnecting ? 'Connecting' : 'Disconnected'}
               </Badge>
               
-              <Button variant="outline" size="sm" className="gap-2 hidden sm:flex">
-                <RefreshCw className="w-4 h-4" />
-                <span className="hidden md:inline">Last: {formatTime(lastUpdateTime)}</span>
-                <span className="md:hidden">
-                  <Clock className="w-4 h-4" />
-                </span>
-              </Button>
+              <LastUpdateButton />
               
               <ThemeToggle />
             </motion.div>
@@ -434,9 +834,7 @@ export default function GasTrackerApp() {
                   </motion.div>
                   <span className="text-xs sm:text-sm text-muted-foreground">ETH/USD</span>
                 </div>
-                <p className="text-lg sm:text-xl lg:text-2xl font-bold text-green-500">
-                  ${usdPrice.toFixed(2)}
-                </p>
+                <PriceStat />
               </CardContent>
             </Card>
           </motion.div>
@@ -453,7 +851,7 @@ export default function GasTrackerApp() {
                   </motion.div>
                   <span className="text-xs sm:text-sm text-muted-foreground">Networks</span>
                 </div>
-                <p className="text-lg sm:text-xl lg:text-2xl font-bold text-yellow-500">3</p>
+                <p className="text-lg sm:text-xl lg:text-2xl font-bold text-yellow-500">{chainIds.length}</p>
               </CardContent>
             </Card>
           </motion.div>
@@ -471,7 +869,7 @@ export default function GasTrackerApp() {
                   <span className="text-xs sm:text-sm text-muted-foreground">Status</span>
                 </div>
                 <p className="text-lg sm:text-xl lg:text-2xl font-bold text-blue-500">
-                  {isConnected ? 'Live' : 'Offline'}
+                  {isConnected ? 'Live' : isConnecting ? 'Connecting' : 'Offline'}
                 </p>
               </CardContent>
             </Card>
@@ -506,6 +904,9 @@ export default function GasTrackerApp() {
             transition={{ delay: 0.5 }}
             className="xl:col-span-2 space-y-6"
           >
+            {/* Network Picker */}
+            <NetworkPicker />
+            
             {/* Gas Cards */}
             <motion.div 
               variants={containerVariants}
@@ -514,93 +915,8 @@ export default function GasTrackerApp() {
               className="grid grid-cols-1 md:grid-cols-2 xl:grid-cols-3 gap-4 sm:gap-6"
             >
               <AnimatePresence>
-                {Object.entries(chains).map(([chainId, chain], index) => (
-                  <motion.div
-                    key={chainId}
-                    variants={cardVariants}
-                    initial="hidden"
-                    animate="visible"
-                    whileHover="hover"
-                    transition={{ delay: index * 0.1 }}
-                    className="group"
-                  >
-                    <Card className="relative overflow-hidden h-full hover:shadow-xl transition-all duration-300 border-2 hover:border-primary/20">
-                      <div className="absolute inset-0 bg-gradient-to-br from-transparent via-transparent to-primary/5 opacity-0 group-hover:opacity-100 transition-opacity duration-300" />
-                      
-                      <CardHeader className="pb-3">
-                        <div className="flex items-center justify-between">
-                          <div className="flex items-center gap-2">
-                            <motion.div 
-                              className="w-4 h-4 rounded-full relative"
-                              style={{ backgroundColor: chain.color }}
-                              animate={{ boxShadow: [`0 0 0 0 ${chain.color}40`, `0 0 0 8px ${chain.color}00`] }}
-                              transition={{ duration: 2, repeat: Infinity }}
-                            />
-                            <CardTitle className="text-lg">{chain.name}</CardTitle>
-                          </div>
-                          <motion.div
-                            initial={{ scale: 0 }}
-                            animate={{ scale: 1 }}
-                            transition={{ delay: 0.3 + index * 0.1 }}
-                          >
-                            <Badge variant="default" className="gap-1">
-                              <motion.div
-                                animate={{ scale: [1, 1.2, 1] }}
-                                transition={{ duration: 1, repeat: Infinity }}
-                              >
-                                <Sparkles className="w-3 h-3" />
-                              </motion.div>
-                              Live
-                            </Badge>
-                          </motion.div>
-                        </div>
-                      </CardHeader>
-                      
-                      <CardContent className="space-y-4">
-                        <div className="flex items-center justify-between">
-                          <div className="flex items-center gap-2">
-                            <Zap className="w-4 h-4 text-yellow-500" />
-                            <span className="text-sm text-muted-foreground">Gas Price</span>
-                          </div>
-                          <div className="flex items-center gap-2">
-                            <motion.span 
-                              className="text-xl sm:text-2xl font-bold"
-                              key={chain.gasPrice}
-                              initial={{ scale: 1.2, color: "#10b981" }}
-                              animate={{ scale: 1, color: "inherit" }}
-                              transition={{ duration: 0.3 }}
-                            >
-                              {formatGasPrice(chain.gasPrice)}
-                            </motion.span>
-                            <span className="text-sm text-muted-foreground">gwei</span>
-                          </div>
-                        </div>
-                        
-                        <div className="grid grid-cols-2 gap-4 text-sm">
-                          <div className="space-y-1">
-                            <p className="text-muted-foreground">Base Fee</p>
-                            <p className="font-medium">{formatGasPrice(chain.baseFee)} gwei</p>
-                          </div>
-                          <div className="space-y-1">
-                            <p className="text-muted-foreground">Priority Fee</p>
-                            <p className="font-medium">{formatGasPrice(chain.priorityFee)} gwei</p>
-                          </div>
-                        </div>
-                        
-                        <div className="pt-2 border-t">
-                          <div className="flex items-center justify-between text-sm">
-                            <span className="text-muted-foreground flex items-center gap-1">
-                              <BarChart3 className="w-3 h-3" />
-                              Block #{chain.lastBlock}
-                            </span>
-                            <span className="text-muted-foreground">
-                              {formatTime(Date.now())}
-                            </span>
-                          </div>
-                        </div>
-                      </CardContent>
-                    </Card>
-                  </motion.div>
+                {chainIds.map((chainId, index) => (
+                  <ChainCard key={chainId} chainId={chainId} index={index} />
                 ))}
               </AnimatePresence>
             </motion.div>
@@ -618,27 +934,20 @@ export default function GasTrackerApp() {
                       <LineChart className="w-5 h-5 text-primary" />
                       <CardTitle>Gas Price History</CardTitle>
                     </div>
-                    <div className="flex items-center gap-2">
-                      {Object.entries(chains).map(([chainId, chain]) => (
-                        <Button
+                    <div className="flex items-center gap-2 flex-wrap">
+                      {chainIds.map((chainId) => (
+                        <ChainButton
                           key={chainId}
-                          variant={selectedChartChain === chainId ? "default" : "outline"}
-                          size="sm"
-                          onClick={() => setSelectedChartChain(chainId)}
-                          className="gap-2"
-                        >
-                          <div 
-                            className="w-3 h-3 rounded-full"
-                            style={{ backgroundColor: chain.color }}
-                          />
-                          {chain.name}
-                        </Button>
+                          chainId={chainId}
+                          isSelected={chartChainId === chainId}
+                          onSelect={setSelectedChartChain}
+                        />
                       ))}
                     </div>
                   </div>
                 </CardHeader>
                 <CardContent>
-                  <GasChart chainId={selectedChartChain} />
+                  <GasChart chainId={chartChainId} />
                 </CardContent>
               </Card>
             </motion.div>
@@ -660,125 +969,7 @@ export default function GasTrackerApp() {
                   exit={{ opacity: 0, y: -20 }}
                   transition={{ duration: 0.3 }}
                 >
-                  <Card className="w-full hover:shadow-lg transition-all duration-300">
-                    <CardHeader>
-                      <div className="flex items-center gap-2">
-                        <motion.div
-                          animate={{ rotate: [0, 360] }}
-                          transition={{ duration: 4, repeat: Infinity, ease: "linear" }}
-                        >
-                          <Calculator className="w-5 h-5 text-blue-500" />
-                        </motion.div>
-                        <CardTitle className="text-lg sm:text-xl">Transaction Cost Simulator</CardTitle>
-                      </div>
-                    </CardHeader>
-                    
-                    <CardContent className="space-y-6">
-                      <div className="space-y-2">
-                        <Label htmlFor="amount" className="text-sm font-medium">
-                          Transfer Amount (ETH)
-                        </Label>
-                        <Input
-                          id="amount"
-                          type="number"
-                          placeholder="0.1"
-                          value={simulationAmount}
-                          onChange={(e) => setSimulationAmount(parseFloat(e.target.value) || 0)}
-                          step="0.01"
-                          min="0"
-                          className="text-lg font-mono"
-                        />
-                        <p className="text-sm text-muted-foreground">
-                          ≈ {formatUSD(simulationAmount * usdPrice)} USD
-                        </p>
-                      </div>
-                      
-                      <div className="space-y-4">
-                        <h4 className="font-semibold flex items-center gap-2">
-                          <DollarSign className="w-4 h-4" />
-                          Cost Comparison
-                        </h4>
-                        
-                        <motion.div 
-                          variants={containerVariants}
-                          initial="hidden"
-                          animate="visible"
-                          className="grid gap-3"
-                        >
-                          {Object.entries(chains).map(([chainId, chain], index) => {
-                            const gasCost = getGasCostUSD(chainId)
-                            const totalCost = getTransactionCostUSD(chainId)
-                            const isCheapest = chainId === getCheapestChain()
-                            
-                            return (
-                              <motion.div
-                                key={chainId}
-                                variants={itemVariants}
-                                whileHover={{ scale: 1.02 }}
-                                className={`p-4 rounded-lg border-2 transition-all duration-300 ${
-                                  isCheapest 
-                                    ? 'border-green-500 bg-green-50 dark:bg-green-900/20 shadow-lg' 
-                                    : 'border-border bg-card hover:border-primary/20'
-                                }`}
-                              >
-                                <div className="flex items-center justify-between mb-2">
-                                  <div className="flex items-center gap-2">
-                                    <motion.div 
-                                      className="w-3 h-3 rounded-full"
-                                      style={{ backgroundColor: chain.color }}
-                                      animate={isCheapest ? { 
-                                        boxShadow: [`0 0 0 0 ${chain.color}40`, `0 0 0 6px ${chain.color}00`] 
-                                      } : {}}
-                                      transition={{ duration: 1.5, repeat: Infinity }}
-                                    />
-                                    <span className="font-medium">{chain.name}</span>
-                                    <AnimatePresence>
-                                      {isCheapest && (
-                                        <motion.span
-                                          initial={{ scale: 0, opacity: 0 }}
-                                          animate={{ scale: 1, opacity: 1 }}
-                                          exit={{ scale: 0, opacity: 0 }}
-                                          className="px-2 py-1 text-xs bg-green-100 text-green-800 dark:bg-green-900 dark:text-green-200 rounded-full font-medium"
-                                        >
-                                          Cheapest
-                                        </motion.span>
-                                      )}
-                                    </AnimatePresence>
-                                  </div>
-                                  <motion.span 
-                                    className="text-lg font-bold"
-                                    key={totalCost}
-                                    initial={{ scale: 1.1 }}
-                                    animate={{ scale: 1 }}
-                                    transition={{ duration: 0.2 }}
-                                  >
-                                    {formatUSD(totalCost)}
-                                  </motion.span>
-                                </div>
-                                
-                                <div className="grid grid-cols-2 gap-4 text-sm">
-                                  <div>
-                                    <div className="flex items-center gap-1 mb-1">
-                                      <Zap className="w-3 h-3 text-yellow-500" />
-                                      <span className="text-muted-foreground">Gas Cost</span>
-                                    </div>
-                                    <p className="font-medium">{formatUSD(gasCost)}</p>
-                                  </div>
-                                  <div>
-                                    <div className="flex items-center gap-1 mb-1">
-                                      <DollarSign className="w-3 h-3 text-green-500" />
-                                      <span className="text-muted-foreground">Transfer Value</span>
-                                    </div>
-                                    <p className="font-medium">{formatUSD(simulationAmount * usdPrice)}</p>
-                                  </div>
-                                </div>
-                              </motion.div>
-                            )
-                          })}
-                        </motion.div>
-                      </div>
-                    </CardContent>
-                  </Card>
+                  <SimulationCard />
                 </motion.div>
               )}
               
@@ -813,7 +1004,7 @@ export default function GasTrackerApp() {
                             transition={{ duration: 2, repeat: Infinity }}
                             className="w-2 h-2 bg-green-500 rounded-full"
                           />
-                          <span className="text-sm">Updates every 6 seconds</span>
+                          <span className="text-sm">Updates on every new block</span>
                         </div>
                       </div>
                       
@@ -826,10 +1017,8 @@ export default function GasTrackerApp() {
                           className="text-sm space-y-1 text-muted-foreground"
                         >
                           {[
-                            "• Ethereum: WebSocket RPC",
-                            "• Polygon: WebSocket RPC", 
-                            "• Arbitrum: WebSocket RPC",
-                            "• ETH/USD: Uniswap V3 Pool"
+                            ...chainIds.map((visibleChainId) => `• ${getChain(visibleChainId)?.name ?? visibleChainId}: WebSocket RPC`),
+                            "• ETH/USD: Uniswap V3 Swap stream"
                           ].map((item, i) => (
                             <motion.li
                               key={i}
@@ -863,6 +1052,8 @@ export default function GasTrackerApp() {
           </motion.div>
         </div>
       </div>
+      
+      {latencyTraceEnabled && <LatencyOverlay />}
     </div>
   )
 }
\ No newline at end of file
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Load Test and Latency Benchmark for Real-Time Cross-Chain Gas Tracker
+Drives a fixed request rate against the Next.js API routes with a pooled
+thread-pool client and reports latency percentiles, throughput and errors.
+
+Requests are scheduled open-loop: each one has an intended start time, and
+latency is measured from that time rather than from when a worker picked it
+up, so a saturated server shows up as latency instead of a lower send rate.
+
+Usage:
+    python backend_bench.py --rps 200 --duration 30
+    python backend_bench.py --endpoint /api/gas/latest --output bench.json
+    python backend_bench.py --baseline bench_prev.json --threshold 10
+"""
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+LOCAL_URL = "http://localhost:3000"
+
+DEFAULT_ENDPOINTS = [
+    "/api",
+    "/api/gas/latest",
+    "/api/gas/stats",
+    "/api/gas/ethereum/ohlc?interval=15",
+]
+
+# One pooled session per worker thread; sessions are not thread-safe
+_thread_state = threading.local()
+
+def get_session(pool_size):
+    """Return this thread's keep-alive session"""
+    session = getattr(_thread_state, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _thread_state.session = session
+    return session
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def timed_request(url, scheduled_at, timeout, pool_size):
+    """Send one GET once its slot arrives; returns (latency_ms, status, error)"""
+    delay = scheduled_at - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+    try:
+        response = get_session(pool_size).get(url, timeout=timeout)
+        response.content  # read the full body before stopping the clock
+        latency_ms = (time.perf_counter() - scheduled_at) * 1000
+        return latency_ms, response.status_code, None
+    except Exception as e:
+        latency_ms = (time.perf_counter() - scheduled_at) * 1000
+        return latency_ms, None, type(e).__name__
+
+def run_endpoint(base_url, endpoint, rps, duration, concurrency, timeout):
+    """Drive one endpoint at a fixed rate and summarize the results"""
+    url = f"{base_url}{endpoint}"
+    total = int(rps * duration)
+
+    print(f"\n🔍 {endpoint}: {rps} req/s for {duration}s ({total} requests, {concurrency} workers)")
+
+    start = time.perf_counter() + 0.1
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(timed_request, url, start + i / rps, timeout, concurrency)
+            for i in range(total)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    # Only successful responses count toward latency; fast 4xx/5xx replies would skew it down
+    latencies = sorted(
+        latency for latency, status, error in results if error is None and status < 400
+    )
+    errors = {}
+    for latency, status, error in results:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+        elif status >= 400:
+            errors[f"HTTP {status}"] = errors.get(f"HTTP {status}", 0) + 1
+
+    error_count = sum(errors.values())
+    summary = {
+        "endpoint": endpoint,
+        "target_rps": rps,
+        "duration_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round((total - error_count) / elapsed, 2) if elapsed > 0 else 0,
+        "error_rate": round(error_count / total, 4) if total else 0,
+        "errors": errors,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+            "mean": sum(latencies) / len(latencies) if latencies else None,
+        },
+    }
+
+    print_summary(summary)
+    return summary
+
+def print_summary(summary):
+    latency = summary["latency_ms"]
+
+    def fmt(value):
+        return f"{value:.1f}ms" if value is not None else "n/a"
+
+    print(f"   p50 {fmt(latency['p50'])}  p95 {fmt(latency['p95'])}  p99 {fmt(latency['p99'])}  max {fmt(latency['max'])}")
+    print(f"   throughput {summary['throughput_rps']} req/s  error rate {summary['error_rate'] * 100:.2f}%")
+    if summary["errors"]:
+        print(f"   errors: {summary['errors']}")
+
+def compare_to_baseline(report, baseline_path, threshold_pct):
+    """Flag endpoints whose p95/p99 or error rate regressed beyond the threshold"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    previous = {result["endpoint"]: result for result in baseline.get("results", [])}
+    regressions = []
+
+    for result in report["results"]:
+        before = previous.get(result["endpoint"])
+        if not before:
+            continue
+
+        for pct in ("p95", "p99"):
+            old = before["latency_ms"].get(pct)
+            new = result["latency_ms"].get(pct)
+            if old and new and new > old * (1 + threshold_pct / 100):
+                regressions.append(f"{result['endpoint']} {pct}: {old:.1f}ms -> {new:.1f}ms")
+
+        if result["error_rate"] > before["error_rate"] + 0.001:
+            regressions.append(
+                f"{result['endpoint']} error rate: {before['error_rate'] * 100:.2f}% -> {result['error_rate'] * 100:.2f}%"
+            )
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas Tracker API load test")
+    parser.add_argument("--base-url", default=LOCAL_URL, help="Server base URL")
+    parser.add_argument("--endpoint", action="append", help="Endpoint path (repeatable)")
+    parser.add_argument("--rps", type=float, default=50, help="Target requests per second per endpoint")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32, help="Worker threads")
+    parser.add_argument("--timeout", type=float, default=10, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10, help="Allowed p95/p99 regression in percent")
+    args = parser.parse_args()
+
+    endpoints = args.endpoint or DEFAULT_ENDPOINTS
+
+    print("🚀 Starting Gas Tracker API Benchmark")
+    print(f"Target: {args.base_url}")
+    print("=" * 60)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "config": {
+            "rps": args.rps,
+            "duration_s": args.duration,
+            "concurrency": args.concurrency,
+            "timeout_s": args.timeout,
+        },
+        "results": [
+            run_endpoint(args.base_url, endpoint, args.rps, args.duration, args.concurrency, args.timeout)
+            for endpoint in endpoints
+        ],
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.threshold)
+        print("\n" + "=" * 60)
+        if regressions:
+            print("⚠️  Regressions against baseline:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return False
+        print("🎉 No regressions against baseline")
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,120 @@
+// Call-cost micro-benchmark: the JS work per tick of a full chart rebuild
+// vs. incremental series updates. Nothing is rendered, so this does not
+// measure frame time or paint; use the latency overlay for that.
+//
+// Fills a chain's history and candles, then simulates live ticks. Each tick
+// appends one block and refreshes the chart the old way (rebuild the full
+// line/candle arrays and setData) and the new way (SeriesFeed.sync pushing
+// only changed bars). The stub series copies whatever it receives into a
+// typed array, standing in for the chart's own per-point processing, so the
+// numbers are a lower bound for the rebuild path.
+//
+//   node bench/chart.bench.mjs [historyPoints] [ticks]
+
+import { GasHistoryBuffer } from '../lib/ringBuffer.js'
+import { CandleAggregator } from '../lib/candles.js'
+import { candleFeed, historyLineFeed, toLineData } from '../lib/chartFeed.js'
+
+const HISTORY_POINTS = Number(process.argv[2] || 20000)
+const TICKS = Number(process.argv[3] || 2000)
+const FRAME_BUDGET_MS = 1000 / 60
+const BLOCK_MS = 2000
+
+class StubSeries {
+  constructor() {
+    this.points = new Float64Array(0)
+    this.length = 0
+  }
+  
+  setData(bars) {
+    this.points = new Float64Array(bars.length * 2)
+    bars.forEach((bar, i) => {
+      this.points[i * 2] = bar.time
+      this.points[i * 2 + 1] = bar.close ?? bar.value
+    })
+    this.length = bars.length
+  }
+  
+  update(bar) {
+    const lastTime = this.length > 0 ? this.points[(this.length - 1) * 2] : -Infinity
+    if (bar.time < lastTime) throw new Error('update() older than the last bar')
+    if (bar.time > lastTime) {
+      if (this.points.length < (this.length + 1) * 2) {
+        const grown = new Float64Array(Math.max(64, this.points.length * 2))
+        grown.set(this.points)
+        this.points = grown
+      }
+      this.length++
+    }
+    this.points[(this.length - 1) * 2] = bar.time
+    this.points[(this.length - 1) * 2 + 1] = bar.close ?? bar.value
+  }
+}
+
+function makeChain(points) {
+  const chain = { history: new GasHistoryBuffer(), candles: new CandleAggregator() }
+  let timestamp = Date.now() - points * BLOCK_MS
+  let gasPrice = 20e9
+  for (let i = 0; i < points; i++) {
+    addBlock(chain, timestamp, gasPrice)
+    timestamp += BLOCK_MS
+    gasPrice = Math.max(1e9, gasPrice * (1 + (Math.random() - 0.5) * 0.05))
+  }
+  return { chain, timestamp, gasPrice }
+}
+
+function addBlock(chain, timestamp, gasPrice) {
+  chain.history.push(timestamp, gasPrice - 2e9, 2e9, gasPrice)
+  chain.candles.add(timestamp, gasPrice / 1e9)
+}
+
+function percentile(sorted, pct) {
+  return sorted[Math.min(sorted.length - 1, Math.ceil(pct / 100 * sorted.length) - 1)]
+}
+
+function run(name, refresh) {
+  const state = makeChain(HISTORY_POINTS)
+  const tick = refresh(state.chain)
+  const samples = new Float64Array(TICKS)
+  
+  for (let i = 0; i < TICKS; i++) {
+    state.timestamp += BLOCK_MS
+    addBlock(state.chain, state.timestamp, state.gasPrice)
+    
+    const start = process.hrtime.bigint()
+    tick()
+    samples[i] = Number(process.hrtime.bigint() - start) / 1e6
+  }
+  
+  const sorted = Array.from(samples).sort((a, b) => a - b)
+  const mean = sorted.reduce((sum, value) => sum + value, 0) / sorted.length
+  const p99 = percentile(sorted, 99)
+  console.log(
+    `${name.padEnd(22)} mean ${mean.toFixed(4).padStart(8)} ms  p99 ${p99.toFixed(4).padStart(8)} ms  ` +
+    `(call cost ${(p99 / FRAME_BUDGET_MS * 100).toFixed(2)}% of a 60fps frame budget)`
+  )
+  return mean
+}
+
+console.log(`Chart refresh call cost per tick (no rendering), ${HISTORY_POINTS} points of history, ${TICKS} ticks`)
+
+const lineRebuild = run('line: setData', (chain) => {
+  const series = new StubSeries()
+  return () => series.setData(toLineData(chain.history))
+})
+const lineIncremental = run('line: update', (chain) => {
+  const feed = historyLineFeed(new StubSeries(), () => chain)
+  feed.sync()
+  return () => feed.sync()
+})
+const candleRebuild = run('candles: setData', (chain) => {
+  const series = new StubSeries()
+  return () => series.setData(chain.candles.getCandles(15))
+})
+const candleIncremental = run('candles: update', (chain) => {
+  const feed = candleFeed(new StubSeries(), () => chain, 15)
+  feed.sync()
+  return () => feed.sync()
+})
+
+console.log(`line speedup ${(lineRebuild / lineIncremental).toFixed(1)}x, candle speedup ${(candleRebuild / candleIncremental).toFixed(1)}x`)
@@ -0,0 +1,87 @@
+// Micro-benchmark: the fee and price math as it runs now vs. the old
+// all-float path.
+//
+// Per block: the Arbitrum L1+L2 breakdown (exact, on the RPC's BigInts) and
+// a USD transfer cost for each chain (doubles, on the store's Numbers).
+// Per swap: the sqrtPriceX96 -> ETH/USD conversion, exact on BigInt, with
+// the float version's error next to it.
+//
+//   node bench/fixed.bench.mjs [iterations]
+
+import { arbitrumGasCostWei, gasCostUSD, sqrtPriceX96ToUsdE6, usdE6ToNumber } from '../lib/fixed.js'
+
+const ITERATIONS = Number(process.argv[2] || 200000)
+
+// Realistic inputs, as they arrive from the RPC (BigInt) and the store (Number)
+const sqrtPriceX96 = 1937713453757440283386327158491137n
+const usdPrice = 1671.73
+const chains = [
+  { baseFee: 12345678901, priorityFee: 2000000000 },
+  { baseFee: 30123456789, priorityFee: 2000000000 },
+  { baseFee: 10000000, priorityFee: 2000000000 }
+]
+const arbitrum = {
+  l2GasEstimate: 21000n,
+  l1GasEstimate: 1432n,
+  l2BaseFee: 10000000n,
+  l1BaseFee: 15123456789n
+}
+
+function floatSwap() {
+  const price = (Number(sqrtPriceX96) ** 2 * Math.pow(10, 12)) / Math.pow(2, 192)
+  return Math.pow(10, 24) / price
+}
+
+function exactSwap() {
+  return usdE6ToNumber(sqrtPriceX96ToUsdE6(sqrtPriceX96))
+}
+
+function floatBlock() {
+  const l2Cost = Number(arbitrum.l2GasEstimate) * Number(arbitrum.l2BaseFee)
+  const l1Cost = Number(arbitrum.l1GasEstimate) * Number(arbitrum.l1BaseFee)
+  let sum = (l2Cost + l1Cost) / 21000
+  
+  for (const chain of chains) {
+    const gasCostWei = (chain.baseFee + chain.priorityFee) * 21000
+    sum += (gasCostWei / Math.pow(10, 18)) * usdPrice
+  }
+  return sum
+}
+
+function currentBlock() {
+  const { total } = arbitrumGasCostWei(arbitrum)
+  let sum = Number(total / 21000n)
+  
+  for (const chain of chains) {
+    sum += gasCostUSD(chain.baseFee, chain.priorityFee, usdPrice)
+  }
+  return sum
+}
+
+function run(name, fn, unit) {
+  // Warm up so both paths are measured after JIT tiering
+  let sink = 0
+  for (let i = 0; i < 10000; i++) sink += fn()
+  
+  const start = process.hrtime.bigint()
+  for (let i = 0; i < ITERATIONS; i++) sink += fn()
+  const elapsedNs = Number(process.hrtime.bigint() - start)
+  
+  const perCallNs = elapsedNs / ITERATIONS
+  console.log(`${name.padEnd(8)} ${perCallNs.toFixed(1).padStart(8)} ns/${unit}  (${ITERATIONS} runs, sink ${sink > 0})`)
+  return perCallNs
+}
+
+console.log('Per-block fee math')
+const floatBlockNs = run('float', floatBlock, 'block')
+const currentBlockNs = run('current', currentBlock, 'block')
+console.log(`current/float ratio: ${(currentBlockNs / floatBlockNs).toFixed(2)}x`)
+
+console.log('\nPer-swap price conversion')
+const floatSwapNs = run('float', floatSwap, 'swap')
+const exactSwapNs = run('exact', exactSwap, 'swap')
+console.log(`exact/float ratio: ${(exactSwapNs / floatSwapNs).toFixed(2)}x`)
+console.log(`float error: ${Math.abs(floatSwap() - exactSwap()).toExponential(2)} USD at ${exactSwap().toFixed(6)}`)
+
+// A block arrives every ~250ms at the fastest (Arbitrum); report the budget share
+console.log(`\nper-block share of a 250ms Arbitrum block interval: ${(currentBlockNs / 250e6 * 100).toExponential(2)}%`)
@@ -0,0 +1,63 @@
+// Benchmark: scenario matrix as one vectorized pass vs. one cost call per
+// scenario (the old per-chain, per-render path).
+//
+// Builds chains x gas profiles x priority tiers x amounts and prices every
+// scenario both ways.
+//
+//   node bench/simulation.bench.mjs [chains] [amounts] [runs]
+
+import { gasCostUSD } from '../lib/fixed.js'
+import { FEE_TIERS } from '../lib/feeEstimator.js'
+import { DEFAULT_PROFILE_IDS, GAS_PROFILES, rankScenarios, simulateScenarios } from '../lib/simulation.js'
+
+const CHAIN_COUNT = Number(process.argv[2] || 18)
+const AMOUNT_COUNT = Number(process.argv[3] || 200)
+const RUNS = Number(process.argv[4] || 50)
+const USD_PRICE = 3456.78
+
+const chains = Array.from({ length: CHAIN_COUNT }, (_, i) => ({
+  id: `chain-${i}`,
+  baseFee: 1e7 + i * 3e9,
+  priorityFee: 1e9,
+  priorityFees: { slow: 5e8 + i, standard: 1e9 + i, fast: 3e9 + i },
+  l1GasCost: i % 3 === 0 ? 2e13 : 0
+}))
+const amounts = Array.from({ length: AMOUNT_COUNT }, (_, i) => (i + 1) * 0.05)
+
+function perScenario() {
+  let sink = 0
+  for (const chain of chains) {
+    for (const profileId of DEFAULT_PROFILE_IDS) {
+      const { gasLimit } = GAS_PROFILES[profileId]
+      for (const tier of FEE_TIERS) {
+        for (const amount of amounts) {
+          sink += gasCostUSD(chain.baseFee, chain.priorityFees[tier], USD_PRICE, { gasLimit, l1GasCost: chain.l1GasCost }) + amount * USD_PRICE
+        }
+      }
+    }
+  }
+  return sink
+}
+
+function vectorized() {
+  const result = simulateScenarios({ chains, usdPrice: USD_PRICE, amounts })
+  return result.totalCostUSD[result.totalCostUSD.length - 1] + rankScenarios(result).length
+}
+
+function run(name, fn) {
+  let sink = 0
+  for (let i = 0; i < 3; i++) sink += fn()
+  
+  const start = process.hrtime.bigint()
+  for (let i = 0; i < RUNS; i++) sink += fn()
+  const elapsedMs = Number(process.hrtime.bigint() - start) / 1e6 / RUNS
+  
+  console.log(`${name.padEnd(12)} ${elapsedMs.toFixed(3).padStart(10)} ms/matrix  (sink ${sink > 0})`)
+  return elapsedMs
+}
+
+const scenarios = CHAIN_COUNT * DEFAULT_PROFILE_IDS.length * FEE_TIERS.length * AMOUNT_COUNT
+console.log(`${scenarios} scenarios (${CHAIN_COUNT} chains x ${DEFAULT_PROFILE_IDS.length} profiles x ${FEE_TIERS.length} tiers x ${AMOUNT_COUNT} amounts)`)
+const slowMs = run('per-scenario', perScenario)
+const fastMs = run('vectorized', vectorized)
+console.log(`speedup: ${(slowMs / fastMs).toFixed(1)}x`)
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Local Deterministic Chain Simulator for Real-Time Cross-Chain Gas Tracker
+Serves Ethereum, Polygon and Arbitrum stand-ins over JSON-RPC so the
+ingestion pipeline can be profiled without network access.
+
+Each chain is served at its own path over both WebSocket and HTTP POST:
+    ws://localhost:8545/ethereum   http://localhost:8545/arbitrum  ...
+
+Supported methods: eth_chainId, net_version, eth_blockNumber,
+eth_getBlockByNumber, eth_subscribe (newHeads, logs), eth_unsubscribe,
+eth_getLogs (Uniswap V3 Swap events), eth_call (Arbitrum NodeInterface
+gasEstimateComponents), eth_feeHistory, eth_gasPrice and
+eth_maxPriorityFeePerGas. JSON-RPC batches are accepted on both transports.
+
+Blocks are synthetic (seeded, EIP-1559 base fee dynamics) or replayed from
+an NDJSON recording with one {"chain": ..., "header": {...}, "logs": [...]}
+object per line.
+
+Usage:
+    python chain_simulator.py --speed 1
+    python chain_simulator.py --bps 2000 --seed 7
+    python chain_simulator.py --replay recording.ndjson --speed 0
+
+Point the app at it with:
+    NEXT_PUBLIC_RPC_ETHEREUM=ws://localhost:8545/ethereum
+    NEXT_PUBLIC_RPC_POLYGON=ws://localhost:8545/polygon
+    NEXT_PUBLIC_RPC_ARBITRUM=ws://localhost:8545/arbitrum
+    NEXT_PUBLIC_RPC_ARBITRUM_HTTP=http://localhost:8545/arbitrum
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+import sys
+import time
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+UNISWAP_V3_POOL = "0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640"
+# keccak256("Swap(address,address,int256,int256,uint160,uint128,int24)")
+SWAP_TOPIC = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+ARBITRUM_NODE_INTERFACE = "0x00000000000000000000000000000000000000c8"
+
+GWEI = 10 ** 9
+ZERO_HASH = "0x" + "00" * 32
+ZERO_ADDRESS = "0x" + "00" * 20
+
+# Max blocks kept per chain for eth_getBlockByNumber / eth_getLogs
+BLOCK_HISTORY = 4096
+# Records replayed between yields to the event loop at --speed 0
+REPLAY_CHUNK = 500
+
+CHAINS = {
+    "ethereum": {"chain_id": 1, "block_time": 12.0, "base_fee": 15 * GWEI, "gas_limit": 30_000_000, "start_block": 19_000_000},
+    "polygon": {"chain_id": 137, "block_time": 2.0, "base_fee": 30 * GWEI, "gas_limit": 30_000_000, "start_block": 55_000_000},
+    "arbitrum": {"chain_id": 42161, "block_time": 0.25, "base_fee": GWEI // 100, "gas_limit": 32_000_000, "start_block": 200_000_000},
+}
+
+def to_hex(value):
+    return hex(int(value))
+
+def word(value):
+    """32-byte two's complement ABI word, hex without prefix"""
+    return format(value % (1 << 256), "064x")
+
+def block_hash(chain, number):
+    return "0x" + hashlib.sha256(f"{chain}:{number}".encode()).hexdigest()
+
+class SyntheticChain:
+    """Deterministic block and log source for one chain"""
+
+    def __init__(self, name, params, seed, start_time):
+        self.name = name
+        self.params = params
+        self.seed = seed
+        self.rng = random.Random(f"{seed}:{name}")
+        self.number = params["start_block"]
+        self.timestamp = start_time
+        self.base_fee = params["base_fee"]
+        self.blocks = {}
+        self.logs = {}
+        self.rewards = {}
+        # ~ETH at $3000 for the USDC/WETH pool
+        self.sqrt_price_x96 = 1_446_501_726_624_926_496_477_173_928_747_177
+        self.l1_base_fee = 15 * GWEI
+
+    def next_block(self):
+        """Produce the next header (and logs), applying EIP-1559 base fee rules"""
+        self.number += 1
+        self.timestamp += self.params["block_time"]
+
+        gas_limit = self.params["gas_limit"]
+        target = gas_limit // 2
+        gas_used = int(gas_limit * min(1.0, max(0.0, self.rng.gauss(0.5, 0.2))))
+
+        header = self.make_header(self.number, int(self.timestamp), self.base_fee, gas_used, gas_limit)
+
+        # Base fee for the next block moves by up to 1/8 toward the target
+        delta = self.base_fee * (gas_used - target) // target // 8
+        self.base_fee = max(7, self.base_fee + delta)
+
+        logs = self.make_swap_logs(header) if self.name == "ethereum" else []
+        if self.name == "arbitrum" and self.number % 48 == 0:
+            self.l1_base_fee = max(GWEI, int(self.l1_base_fee * self.rng.uniform(0.9, 1.1)))
+
+        self.rewards[self.number] = sorted(int(self.rng.uniform(0.01, 3) * GWEI) for _ in range(3))
+        self.store(header, logs)
+        return header, logs
+
+    def make_header(self, number, timestamp, base_fee, gas_used, gas_limit):
+        return {
+            "number": to_hex(number),
+            "hash": block_hash(self.name, number),
+            "parentHash": block_hash(self.name, number - 1),
+            "timestamp": to_hex(timestamp),
+            "baseFeePerGas": to_hex(base_fee),
+            "gasUsed": to_hex(gas_used),
+            "gasLimit": to_hex(gas_limit),
+            "nonce": "0x0000000000000000",
+            "difficulty": "0x0",
+            "miner": ZERO_ADDRESS,
+            "extraData": "0x",
+            "stateRoot": ZERO_HASH,
+            "receiptsRoot": ZERO_HASH,
+            "transactionsRoot": ZERO_HASH,
+            "sha3Uncles": ZERO_HASH,
+            "logsBloom": "0x" + "00" * 256,
+            "mixHash": ZERO_HASH,
+            "size": "0x220",
+            "transactions": [],
+            "uncles": [],
+        }
+
+    def make_swap_logs(self, header):
+        logs = []
+        for index in range(self.rng.randint(0, 4)):
+            # Random walk of a few basis points per swap
+            self.sqrt_price_x96 = int(self.sqrt_price_x96 * (1 + self.rng.gauss(0, 0.0002)))
+            amount0 = -self.rng.randint(100, 50_000) * 10 ** 6
+            amount1 = self.rng.randint(10 ** 16, 10 ** 19)
+            data = "0x" + word(amount0) + word(amount1) + word(self.sqrt_price_x96) + word(10 ** 18) + word(-200_000)
+            logs.append({
+                "address": UNISWAP_V3_POOL,
+                "topics": [SWAP_TOPIC, "0x" + "00" * 32, "0x" + "00" * 32],
+                "data": data,
+                "blockNumber": header["number"],
+                "blockHash": header["hash"],
+                "transactionHash": "0x" + hashlib.sha256(f"{header['hash']}:{index}".encode()).hexdigest(),
+                "transactionIndex": to_hex(index),
+                "logIndex": to_hex(index),
+                "removed": False,
+            })
+        return logs
+
+    def store(self, header, logs):
+        number = int(header["number"], 16)
+        self.blocks[number] = header
+        self.logs[number] = logs
+        self.number = max(self.number, number)
+        stale = number - BLOCK_HISTORY
+        self.blocks.pop(stale, None)
+        self.logs.pop(stale, None)
+        self.rewards.pop(stale, None)
+
+    def resolve_block(self, tag):
+        if tag in ("latest", "pending", "safe", "finalized", None):
+            return self.number
+        if tag == "earliest":
+            return min(self.blocks) if self.blocks else self.number
+        return int(tag, 16)
+
+    def gas_estimate_components(self):
+        """ABI-encoded (uint64 gasEstimate, uint64 gasEstimateForL1, uint256 baseFee, uint256 l1BaseFeeEstimate)"""
+        # Seeded from the block number, not self.rng: how often clients call
+        # this must not change the blocks that follow
+        l1_gas = random.Random(f"{self.seed}:{self.name}:{self.number}:l1").randint(900, 1600)
+        return "0x" + word(21000 + l1_gas) + word(l1_gas) + word(self.base_fee) + word(self.l1_base_fee)
+
+class Simulator:
+    """JSON-RPC dispatcher and subscription fan-out for all chains"""
+
+    def __init__(self, chains):
+        self.chains = chains
+        self.subscriptions = {}
+        self.subscribed = asyncio.Event()
+        self.next_subscription = 1
+        self.stats = {"requests": 0, "notifications": 0, "blocks": 0}
+
+    def handle(self, chain_name, message, connection=None):
+        if isinstance(message, list):
+            return [self.handle_one(chain_name, item, connection) for item in message]
+        return self.handle_one(chain_name, message, connection)
+
+    def handle_one(self, chain_name, request, connection):
+        self.stats["requests"] += 1
+        request_id = request.get("id")
+        try:
+            result = self.dispatch(self.chains[chain_name], request.get("method"), request.get("params") or [], connection)
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32000, "message": str(e)}}
+
+    def dispatch(self, chain, method, params, connection):
+        if method == "eth_chainId":
+            return to_hex(chain.params["chain_id"])
+        if method == "net_version":
+            return str(chain.params["chain_id"])
+        if method == "eth_blockNumber":
+            return to_hex(chain.number)
+        if method == "eth_getBlockByNumber":
+            return chain.blocks.get(chain.resolve_block(params[0]))
+        if method == "eth_gasPrice":
+            return to_hex(chain.base_fee + 2 * GWEI)
+        if method == "eth_maxPriorityFeePerGas":
+            return to_hex(2 * GWEI)
+        if method == "eth_getLogs":
+            return self.get_logs(chain, params[0])
+        if method == "eth_call":
+            return self.call(chain, params[0])
+        if method == "eth_feeHistory":
+            return self.fee_history(chain, params)
+        if method == "eth_subscribe":
+            if connection is None:
+                raise ValueError("subscriptions require a WebSocket connection")
+            return self.subscribe(chain, params, connection)
+        if method == "eth_unsubscribe":
+            return self.subscriptions.pop(params[0], None) is not None
+        raise ValueError(f"method not supported: {method}")
+
+    def get_logs(self, chain, log_filter):
+        start = chain.resolve_block(log_filter.get("fromBlock"))
+        end = chain.resolve_block(log_filter.get("toBlock"))
+        logs = []
+        for number in range(start, end + 1):
+            logs.extend(log for log in chain.logs.get(number, []) if matches_filter(log, log_filter))
+        return logs
+
+    def call(self, chain, transaction):
+        to = (transaction.get("to") or "").lower()
+        # Every NodeInterface call is answered as gasEstimateComponents
+        if chain.name == "arbitrum" and to == ARBITRUM_NODE_INTERFACE:
+            return chain.gas_estimate_components()
+        raise ValueError(f"eth_call target not simulated: {to}")
+
+    def fee_history(self, chain, params):
+        count = int(params[0], 16) if isinstance(params[0], str) else int(params[0])
+        newest = chain.resolve_block(params[1])
+        percentiles = params[2] if len(params) > 2 else []
+        numbers = [n for n in range(newest - count + 1, newest + 1) if n in chain.blocks]
+        rewards = []
+        for n in numbers:
+            values = chain.rewards.get(n, [2 * GWEI])
+            rewards.append([to_hex(values[min(len(values) - 1, int(p / 100 * len(values)))]) for p in percentiles])
+        base_fees = [chain.blocks[n]["baseFeePerGas"] for n in numbers] + [to_hex(chain.base_fee)]
+        ratios = [int(chain.blocks[n]["gasUsed"], 16) / int(chain.blocks[n]["gasLimit"], 16) for n in numbers]
+        return {
+            "oldestBlock": to_hex(numbers[0] if numbers else newest),
+            "baseFeePerGas": base_fees,
+            "gasUsedRatio": ratios,
+            "reward": rewards,
+        }
+
+    def subscribe(self, chain, params, connection):
+        subscription_id = to_hex(self.next_subscription)
+        self.next_subscription += 1
+        kind = params[0]
+        if kind not in ("newHeads", "logs"):
+            raise ValueError(f"subscription not supported: {kind}")
+        self.subscriptions[subscription_id] = {
+            "chain": chain.name,
+            "kind": kind,
+            "filter": params[1] if len(params) > 1 else {},
+            "connection": connection,
+        }
+        self.subscribed.set()
+        return subscription_id
+
+    def publish(self, chain_name, header, logs):
+        """Push a new block to every matching subscriber"""
+        self.stats["blocks"] += 1
+        for subscription_id, subscription in list(self.subscriptions.items()):
+            if subscription["chain"] != chain_name:
+                continue
+            connection = subscription["connection"]
+            if connection.closed:
+                self.subscriptions.pop(subscription_id, None)
+                continue
+            if subscription["kind"] == "newHeads":
+                self.notify(connection, subscription_id, header)
+            else:
+                for log in logs:
+                    if matches_filter(log, subscription["filter"]):
+                        self.notify(connection, subscription_id, log)
+
+    def notify(self, connection, subscription_id, result):
+        self.stats["notifications"] += 1
+        connection.send_json({
+            "jsonrpc": "2.0",
+            "method": "eth_subscription",
+            "params": {"subscription": subscription_id, "result": result},
+        })
+
+def matches_filter(log, log_filter):
+    address = log_filter.get("address")
+    if address:
+        addresses = address if isinstance(address, list) else [address]
+        if log["address"].lower() not in [a.lower() for a in addresses]:
+            return False
+    for position, topic in enumerate(log_filter.get("topics") or []):
+        if topic is None:
+            continue
+        options = topic if isinstance(topic, list) else [topic]
+        if position >= len(log["topics"]) or log["topics"][position].lower() not in [t.lower() for t in options]:
+            return False
+    return True
+
+class WebSocketConnection:
+    """Minimal RFC 6455 server side: text frames, ping/pong, close"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+
+    def send_json(self, payload):
+        self.send_frame(0x1, json.dumps(payload).encode())
+
+    def send_frame(self, opcode, payload):
+        if self.closed:
+            return
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([length])
+        elif length < 1 << 16:
+            header += bytes([126]) + struct.pack("!H", length)
+        else:
+            header += bytes([127]) + struct.pack("!Q", length)
+        self.writer.write(header + payload)
+
+    async def read_message(self):
+        """Return the next text message, or None once the socket closes"""
+        fragments = []
+        while True:
+            first, second = await self.reader.readexactly(2)
+            fin, opcode = first & 0x80, first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+            mask = await self.reader.readexactly(4) if second & 0x80 else None
+            payload = await self.reader.readexactly(length)
+            if mask:
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+            if opcode == 0x8:
+                self.send_frame(0x8, payload[:2])
+                self.closed = True
+                return None
+            if opcode == 0x9:
+                self.send_frame(0xA, payload)
+                continue
+            if opcode == 0xA:
+                continue
+
+            fragments.append(payload)
+            if fin:
+                return b"".join(fragments).decode()
+
+async def read_http_request(reader):
+    request_line = (await reader.readline()).decode().strip()
+    if not request_line:
+        return None
+    method, path, _ = request_line.split(" ", 2)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    return method, path, headers
+
+def write_http_response(writer, status, body, content_type="application/json"):
+    reason = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found"}.get(status, "OK")
+    writer.write(
+        f"HTTP/1.1 {status} {reason}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        "Access-Control-Allow-Headers: *\r\n"
+        "\r\n".encode() + body
+    )
+
+async def handle_client(simulator, reader, writer):
+    try:
+        while True:
+            request = await read_http_request(reader)
+            if request is None:
+                return
+            method, path, headers = request
+            chain_name = path.strip("/").split("?")[0] or "ethereum"
+
+            if chain_name not in simulator.chains:
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                write_http_response(writer, 404, json.dumps({"error": f"unknown chain {chain_name}"}).encode())
+                continue
+
+            if headers.get("upgrade", "").lower() == "websocket":
+                await serve_websocket(simulator, chain_name, headers, reader, writer)
+                return
+
+            if method == "OPTIONS":
+                write_http_response(writer, 204, b"")
+                continue
+
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            try:
+                response = simulator.handle(chain_name, json.loads(body))
+                write_http_response(writer, 200, json.dumps(response).encode())
+            except json.JSONDecodeError:
+                write_http_response(writer, 400, json.dumps({"error": "invalid JSON"}).encode())
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def serve_websocket(simulator, chain_name, headers, reader, writer):
+    accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest()).decode()
+    writer.write(
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+    )
+    connection = WebSocketConnection(reader, writer)
+    try:
+        while True:
+            text = await connection.read_message()
+            if text is None:
+                break
+            connection.send_json(simulator.handle(chain_name, json.loads(text), connection))
+            await writer.drain()
+    finally:
+        connection.closed = True
+
+async def produce_blocks(simulator, chain, rate, total):
+    """Emit blocks at `rate` per second (0 = as fast as possible), in catch-up batches"""
+    start = time.perf_counter()
+    produced = 0
+    while total is None or produced < total:
+        due = produced + 1000 if rate == 0 else int((time.perf_counter() - start) * rate) + 1
+        while produced < due and (total is None or produced < total):
+            header, logs = chain.next_block()
+            simulator.publish(chain.name, header, logs)
+            produced += 1
+        await asyncio.sleep(0 if rate == 0 else min(1 / rate, 0.01))
+
+async def replay_recording(simulator, path, speed):
+    """Feed a recorded NDJSON stream through the same publish path"""
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    # A replay nobody hears is wasted; start once a client subscribes
+    print(f"⏳ Waiting for a subscriber before replaying {len(records)} records")
+    await simulator.subscribed.wait()
+
+    first_time = None
+    start = time.perf_counter()
+    for index, record in enumerate(records):
+        chain = simulator.chains.get(record["chain"])
+        if chain is None:
+            continue
+        header, logs = record["header"], record.get("logs", [])
+        if speed > 0:
+            timestamp = int(header["timestamp"], 16)
+            first_time = first_time if first_time is not None else timestamp
+            delay = (timestamp - first_time) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif index % REPLAY_CHUNK == 0:
+            # Let sockets flush and requests get answered between chunks
+            await asyncio.sleep(0)
+        chain.store(header, logs)
+        if header.get("baseFeePerGas"):
+            chain.base_fee = int(header["baseFeePerGas"], 16)
+        simulator.publish(chain.name, header, logs)
+    print(f"✅ Replayed {len(records)} records from {path}")
+
+async def report_stats(simulator, interval):
+    while True:
+        await asyncio.sleep(interval)
+        print(f"📊 blocks={simulator.stats['blocks']} requests={simulator.stats['requests']} "
+              f"notifications={simulator.stats['notifications']} subscriptions={len(simulator.subscriptions)}")
+
+async def run(args):
+    start_time = args.start_time if args.start_time is not None else int(time.time())
+    chains = {
+        name: SyntheticChain(name, params, args.seed, start_time)
+        for name, params in CHAINS.items()
+    }
+    # Pre-fill history so eth_getLogs / eth_feeHistory have a window to read
+    for chain in chains.values():
+        for _ in range(args.warmup_blocks):
+            chain.next_block()
+
+    simulator = Simulator(chains)
+    server = await asyncio.start_server(lambda r, w: handle_client(simulator, r, w), args.host, args.port)
+
+    print("🚀 Chain simulator listening")
+    for name in chains:
+        print(f"   {name}: ws://{args.host}:{args.port}/{name}  http://{args.host}:{args.port}/{name}")
+
+    tasks = [asyncio.create_task(report_stats(simulator, args.stats_interval))]
+    if args.replay:
+        tasks.append(asyncio.create_task(replay_recording(simulator, args.replay, args.speed)))
+    else:
+        for chain in chains.values():
+            rate = args.bps if args.bps is not None else args.speed / chain.params["block_time"]
+            tasks.append(asyncio.create_task(produce_blocks(simulator, chain, rate, args.blocks)))
+
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local JSON-RPC chain simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--seed", type=int, default=1, help="Seed for synthetic blocks")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Multiple of real block time (0 = as fast as possible)")
+    parser.add_argument("--bps", type=float, help="Blocks per second per chain (overrides --speed)")
+    parser.add_argument("--blocks", type=int, help="Stop producing after this many blocks per chain")
+    parser.add_argument("--start-time", type=int, help="Unix time of the first synthetic block")
+    parser.add_argument("--warmup-blocks", type=int, default=64, help="Blocks generated before serving")
+    parser.add_argument("--replay", help="NDJSON recording to replay instead of synthetic blocks")
+    parser.add_argument("--stats-interval", type=float, default=10, help="Seconds between stats lines")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("\n👋 Simulator stopped")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -2,7 +2,11 @@
 
 import { useEffect, useRef, useState } from 'react'
 import { createChart } from 'lightweight-charts'
-import { useGasStore } from '@/lib/store'
+import { useShallow } from 'zustand/react/shallow'
+import { useGasStore, useChain } from '@/lib/store'
+import { countRender } from '@/lib/renderStats'
+import { traceChartUpdate } from '@/lib/latencyTrace'
+import { candleCloseFeed, candleFeed, historyLineFeed } from '@/lib/chartFeed'
 import { Button } from '@/components/ui/button'
 import { Badge } from '@/components/ui/badge'
 import { BarChart3, LineChart, Layers } from 'lucide-react'
@@ -10,11 +14,21 @@ import { BarChart3, LineChart, Layers } from 'lucide-react'
 export default function GasChart({ chainId }) {
   const chartContainerRef = useRef()
   const chartRef = useRef()
-  const seriesRef = useRef({})
+  const feedsRef = useRef({})
   const [chartType, setChartType] = useState('candlestick') // 'candlestick', 'line', 'comparison'
   
-  const { chains, getOHLCData, mode } = useGasStore()
-  const chain = chains[chainId]
+  const mode = useGasStore((state) => state.mode)
+  const chain = useChain(chainId)
+  const isComparisonMode = chartType === 'comparison' || mode === 'simulation'
+  
+  // Other chains matter only while comparing; otherwise select nothing so
+  // their blocks don't re-render this chart
+  const chains = useGasStore(useShallow((state) => isComparisonMode
+    ? Object.fromEntries(state.visibleChainIds.map((networkId) => [networkId, state.chains[networkId]]))
+    : {}))
+  // Compared lines follow the Network picker; a string so it compares by value
+  const comparedChainIds = useGasStore((state) => isComparisonMode ? state.visibleChainIds.join(',') : '')
+  countRender('GasChart')
   
   useEffect(() => {
     if (!chartContainerRef.current) return
@@ -57,7 +71,7 @@ export default function GasChart({ chainId }) {
     })
     
     chartRef.current = chart
-    seriesRef.current = {}
+    feedsRef.current = {}
     
     // Handle resize
     const handleResize = () => {
@@ -77,110 +91,75 @@ export default function GasChart({ chainId }) {
     }
   }, [])
   
-  // Update chart data when history changes or chart type changes
+  // Rebuild series only when what is drawn changes: chain, chart type, mode
+  // or, when comparing, the visible chains
   useEffect(() => {
-    if (!chartRef.current) return
+    const chart = chartRef.current
+    if (!chart) return
     
-    // Clear existing series
-    Object.values(seriesRef.current).forEach(series => {
+    Object.values(feedsRef.current).forEach(({ series }) => {
       try {
-        chartRef.current.removeSeries(series)
+        chart.removeSeries(series)
       } catch (e) {
         // Series might already be removed
       }
     })
-    seriesRef.current = {}
+    feedsRef.current = {}
     
-    if (chartType === 'comparison' || mode === 'simulation') {
-      // Show all networks for comparison
-      Object.entries(chains).forEach(([networkId, networkChain]) => {
-        const networkOhlcData = getOHLCData(networkId, 15)
-        
-        if (networkOhlcData.length > 0) {
-          const lineSeries = chartRef.current.addLineSeries({
-            color: networkChain.color,
-            lineWidth: 2,
-            title: networkChain.name,
-          })
-          
-          // Convert OHLC to line data (use close prices)
-          const lineData = networkOhlcData.map(ohlc => ({
-            time: ohlc.time,
-            value: ohlc.close
-          }))
-          
-          lineSeries.setData(lineData)
-          seriesRef.current[networkId] = lineSeries
-        } else if (networkChain.history.length > 0) {
-          // Fallback to history data
-          const lineSeries = chartRef.current.addLineSeries({
-            color: networkChain.color,
-            lineWidth: 2,
-            title: networkChain.name,
-          })
-          
-          const lineData = networkChain.history.map(point => ({
-            time: Math.floor((point.timestamp || Date.now()) / 1000),
-            value: point.gasPrice / 1e9 // Convert to gwei
-          }))
-          
-          lineSeries.setData(lineData)
-          seriesRef.current[networkId] = lineSeries
-        }
+    const { chains: allChains, visibleChainIds } = useGasStore.getState()
+    const chainGetter = (networkId) => () => useGasStore.getState().chains[networkId]
+    
+    if (isComparisonMode) {
+      // Show all networks for comparison (15m candle closes)
+      visibleChainIds.forEach((networkId) => {
+        const networkChain = allChains[networkId]
+        const lineSeries = chart.addLineSeries({
+          color: networkChain.color,
+          lineWidth: 2,
+          title: networkChain.name,
+        })
+        feedsRef.current[networkId] = candleCloseFeed(lineSeries, chainGetter(networkId), 15)
       })
     } else {
       // Show single network
-      if (!chain) return
+      const networkChain = allChains[chainId]
+      if (!networkChain) return
       
       if (chartType === 'candlestick') {
         // OHLC Candlestick chart
-        const ohlcData = getOHLCData(chainId, 15)
-        
-        if (ohlcData.length > 0) {
-          const candlestickSeries = chartRef.current.addCandlestickSeries({
-            upColor: '#10B981',
-            downColor: '#EF4444',
-            borderDownColor: '#EF4444',
-            borderUpColor: '#10B981',
-            wickDownColor: '#EF4444',
-            wickUpColor: '#10B981',
-            title: `${chain.name} OHLC`,
-          })
-          
-          candlestickSeries.setData(ohlcData)
-          seriesRef.current[chainId] = candlestickSeries
-        } else {
-          // Fallback to line chart if no OHLC data
-          setChartType('line')
-        }
+        const candlestickSeries = chart.addCandlestickSeries({
+          upColor: '#10B981',
+          downColor: '#EF4444',
+          borderDownColor: '#EF4444',
+          borderUpColor: '#10B981',
+          wickDownColor: '#EF4444',
+          wickUpColor: '#10B981',
+          title: `${networkChain.name} OHLC`,
+        })
+        feedsRef.current[chainId] = candleFeed(candlestickSeries, chainGetter(chainId), 15)
       } else if (chartType === 'line') {
         // Line chart
-        const lineSeries = chartRef.current.addLineSeries({
-          color: chain.color,
+        const lineSeries = chart.addLineSeries({
+          color: networkChain.color,
           lineWidth: 2,
-          title: `${chain.name} Gas Price`,
+          title: `${networkChain.name} Gas Price`,
         })
-        
-        if (chain.history.length > 0) {
-          const lineData = chain.history.map(point => ({
-            time: Math.floor((point.timestamp || Date.now()) / 1000),
-            value: point.gasPrice / 1e9 // Convert to gwei
-          }))
-          
-          lineSeries.setData(lineData)
-          seriesRef.current[chainId] = lineSeries
-        }
+        feedsRef.current[chainId] = historyLineFeed(lineSeries, chainGetter(chainId))
       }
     }
     
-    // Auto-fit content
-    if (chartRef.current) {
-      chartRef.current.timeScale().fitContent()
-    }
+    Object.values(feedsRef.current).forEach((feed) => feed.sync())
     
-  }, [chain?.history, chainId, getOHLCData, chain?.color, chartType, chains, mode])
+    // Auto-fit content
+    chart.timeScale().fitContent()
   
-  const isComparisonMode = chartType === 'comparison' || mode === 'simulation'
+  }, [chainId, chartType, isComparisonMode, comparedChainIds])
+  
+  // New blocks only push the changed or appended bars into live series
+  useEffect(() => {
+    Object.values(feedsRef.current).forEach((feed) => feed.sync())
+    traceChartUpdate(Object.keys(feedsRef.current))
+  }, [chain?.historyVersion, chains])
   
   return (
     <div className="w-full space-y-4">
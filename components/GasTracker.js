@@ -21,8 +21,8 @@ export default function GasTracker() {
   
   const getGasTrend = (history) => {
     if (history.length < 2) return 'neutral'
-    const current = history[history.length - 1]?.gasPrice || 0
-    const previous = history[history.length - 2]?.gasPrice || 0
+    const current = history.gasPriceAt(history.length - 1) || 0
+    const previous = history.gasPriceAt(history.length - 2) || 0
     
     if (current > previous) return 'up'
     if (current < previous) return 'down'
@@ -0,0 +1,93 @@
+'use client'
+
+import { useEffect, useState } from 'react'
+import { exportLatencyTrace, getLatencySummary, resetLatencyTrace } from '@/lib/latencyTrace'
+import { Button } from '@/components/ui/button'
+import { Download, RotateCcw, Timer } from 'lucide-react'
+
+const REFRESH_MS = 1000
+
+function formatMs(value) {
+  if (value === null) return '–'
+  if (Math.abs(value) >= 1000) return `${(value / 1000).toFixed(1)}s`
+  return `${Math.round(value)}ms`
+}
+
+function downloadTrace() {
+  const blob = new Blob([JSON.stringify(exportLatencyTrace())], { type: 'application/json' })
+  const url = URL.createObjectURL(blob)
+  const link = document.createElement('a')
+  link.href = url
+  link.download = `gas-latency-${new Date().toISOString().replace(/[:.]/g, '-')}.json`
+  link.click()
+  URL.revokeObjectURL(url)
+}
+
+// Development overlay with rolling block-to-pixel percentiles per stage.
+// Rendered only when latency tracing is enabled (see lib/latencyTrace.js).
+export default function LatencyOverlay() {
+  const [summary, setSummary] = useState(getLatencySummary)
+  const [collapsed, setCollapsed] = useState(false)
+  
+  useEffect(() => {
+    const interval = setInterval(() => setSummary(getLatencySummary()), REFRESH_MS)
+    return () => clearInterval(interval)
+  }, [])
+  
+  return (
+    <div className="fixed bottom-4 right-4 z-50 rounded-lg border bg-card/95 p-3 text-xs shadow-lg backdrop-blur">
+      <button
+        onClick={() => setCollapsed(!collapsed)}
+        className="flex w-full items-center gap-2 font-semibold"
+      >
+        <Timer className="w-3 h-3" />
+        Block → pixel latency
+        <span className="ml-auto font-normal text-muted-foreground">{summary.samples} samples</span>
+      </button>
+      
+      {!collapsed && (
+        <>
+          <table className="mt-2 w-full font-mono tabular-nums">
+            <thead className="text-muted-foreground">
+              <tr>
+                <th className="pr-3 text-left font-normal">Stage</th>
+                <th className="px-2 text-right font-normal">p50</th>
+                <th className="px-2 text-right font-normal">p90</th>
+                <th className="pl-2 text-right font-normal">p99</th>
+              </tr>
+            </thead>
+            <tbody>
+              {summary.stages.map((stage) => (
+                <tr key={stage.id}>
+                  <td className="pr-3">{stage.label}</td>
+                  <td className="px-2 text-right">{formatMs(stage.p50)}</td>
+                  <td className="px-2 text-right">{formatMs(stage.p90)}</td>
+                  <td className="pl-2 text-right">{formatMs(stage.p99)}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+          
+          <div className="mt-2 flex gap-2">
+            <Button variant="outline" size="sm" onClick={downloadTrace} className="h-7 gap-1 text-xs">
+              <Download className="w-3 h-3" />
+              Export trace
+            </Button>
+            <Button
+              variant="ghost"
+              size="sm"
+              onClick={() => {
+                resetLatencyTrace()
+                setSummary(getLatencySummary())
+              }}
+              className="h-7 gap-1 text-xs"
+            >
+              <RotateCcw className="w-3 h-3" />
+              Reset
+            </Button>
+          </div>
+        </>
+      )}
+    </div>
+  )
+}
@@ -24,6 +24,7 @@ export default function SimulationPanel() {
   }
   
   const formatUSD = (amount) => {
+    if (amount === null) return '—'
     return new Intl.NumberFormat('en-US', {
       style: 'currency',
       currency: 'USD',
@@ -38,7 +39,7 @@ export default function SimulationPanel() {
     
     Object.entries(chains).forEach(([chainId, chain]) => {
       const cost = getGasCostUSD(chainId)
-      if (cost < lowestCost) {
+      if (cost !== null && cost < lowestCost) {
         lowestCost = cost
         cheapest = chainId
       }
@@ -0,0 +1,232 @@
+// Streaming OHLC candles for several intervals at once.
+//
+// Each point only touches the open candle of every interval, so building
+// chart data costs O(1) per tick instead of regrouping the whole history.
+// Candles are stored column-wise in fixed-capacity rings like the gas history.
+
+export const DEFAULT_CANDLE_INTERVALS = [1, 5, 15, 60] // minutes
+export const DEFAULT_CANDLE_CAPACITY = 2000
+
+class CandleSeries {
+  constructor(intervalMinutes, capacity) {
+    this.intervalMs = intervalMinutes * 60 * 1000
+    this.capacity = capacity
+    this.time = new Float64Array(capacity) // bucket start, seconds (lightweight-charts time)
+    this.open = new Float64Array(capacity)
+    this.high = new Float64Array(capacity)
+    this.low = new Float64Array(capacity)
+    this.close = new Float64Array(capacity)
+    this.count = new Float64Array(capacity)
+    this.start = 0
+    this.length = 0
+    this.version = 0
+    // Bumped when a candle before the open one changes
+    this.rewrites = 0
+    this.cached = null
+    this.cachedVersion = -1
+  }
+  
+  slot(i) {
+    return (this.start + i) % this.capacity
+  }
+  
+  add(timestampMs, value) {
+    const bucket = Math.floor(timestampMs / this.intervalMs) * this.intervalMs / 1000
+    const lastSlot = this.length > 0 ? this.slot(this.length - 1) : -1
+    
+    if (lastSlot >= 0 && this.time[lastSlot] === bucket) {
+      // Same bucket: only the open candle changes
+      if (value > this.high[lastSlot]) this.high[lastSlot] = value
+      if (value < this.low[lastSlot]) this.low[lastSlot] = value
+      this.close[lastSlot] = value
+      this.count[lastSlot]++
+    } else if (lastSlot >= 0 && bucket < this.time[lastSlot]) {
+      // Late point for an already-closed bucket: widen it, keep open/close
+      for (let i = this.length - 2; i >= 0; i--) {
+        const slot = this.slot(i)
+        if (this.time[slot] === bucket) {
+          if (value > this.high[slot]) this.high[slot] = value
+          if (value < this.low[slot]) this.low[slot] = value
+          this.count[slot]++
+          this.rewrites++
+          break
+        }
+        if (this.time[slot] < bucket) return
+      }
+    } else {
+      let slot
+      if (this.length < this.capacity) {
+        slot = this.slot(this.length)
+        this.length++
+      } else {
+        slot = this.start
+        this.start = (this.start + 1) % this.capacity
+      }
+      this.time[slot] = bucket
+      this.open[slot] = value
+      this.high[slot] = value
+      this.low[slot] = value
+      this.close[slot] = value
+      this.count[slot] = 1
+    }
+    
+    this.version++
+  }
+  
+  candleAt(i) {
+    const slot = this.slot(i)
+    return {
+      time: this.time[slot],
+      open: this.open[slot],
+      high: this.high[slot],
+      low: this.low[slot],
+      close: this.close[slot],
+      volume: this.count[slot]
+    }
+  }
+  
+  latest() {
+    return this.length > 0 ? this.candleAt(this.length - 1) : null
+  }
+  
+  // Overwrite the candle for candle.time, or append it if it is newer than
+  // the open one. Used to mirror candles aggregated elsewhere (the worker).
+  upsert(candle) {
+    for (let i = this.length - 1; i >= 0; i--) {
+      const slot = this.slot(i)
+      if (this.time[slot] === candle.time) {
+        this.write(slot, candle)
+        this.version++
+        if (i < this.length - 1) this.rewrites++
+        return
+      }
+      if (this.time[slot] < candle.time) break
+    }
+    
+    const lastSlot = this.length > 0 ? this.slot(this.length - 1) : -1
+    if (lastSlot >= 0 && candle.time < this.time[lastSlot]) return // older than the retained window
+    
+    let slot
+    if (this.length < this.capacity) {
+      slot = this.slot(this.length)
+      this.length++
+    } else {
+      slot = this.start
+      this.start = (this.start + 1) % this.capacity
+    }
+    this.write(slot, candle)
+    this.version++
+  }
+  
+  write(slot, candle) {
+    this.time[slot] = candle.time
+    this.open[slot] = candle.open
+    this.high[slot] = candle.high
+    this.low[slot] = candle.low
+    this.close[slot] = candle.close
+    this.count[slot] = candle.volume
+  }
+  
+  // Candles whose bucket starts at or after `time` (seconds), oldest first.
+  // Walks back from the open candle, so it costs O(result)
+  since(time) {
+    let first = this.length
+    while (first > 0 && this.time[this.slot(first - 1)] >= time) first--
+    
+    const candles = new Array(this.length - first)
+    for (let i = first; i < this.length; i++) {
+      candles[i - first] = this.candleAt(i)
+    }
+    return candles
+  }
+  
+  // Candle objects oldest-first; rebuilt only when the series changed
+  toArray() {
+    if (this.cachedVersion !== this.version) {
+      const candles = new Array(this.length)
+      for (let i = 0; i < this.length; i++) {
+        candles[i] = this.candleAt(i)
+      }
+      this.cached = candles
+      this.cachedVersion = this.version
+    }
+    return this.cached
+  }
+}
+
+export class CandleAggregator {
+  constructor(intervals = DEFAULT_CANDLE_INTERVALS, capacity = DEFAULT_CANDLE_CAPACITY) {
+    this.series = {}
+    intervals.forEach((intervalMinutes) => {
+      this.series[intervalMinutes] = new CandleSeries(intervalMinutes, capacity)
+    })
+  }
+  
+  get intervals() {
+    return Object.keys(this.series).map(Number)
+  }
+  
+  // Feed one point into every interval
+  add(timestampMs, value) {
+    for (const intervalMinutes in this.series) {
+      this.series[intervalMinutes].add(timestampMs, value)
+    }
+  }
+  
+  getSeries(intervalMinutes) {
+    const series = this.series[intervalMinutes]
+    if (!series) {
+      throw new Error(`Unsupported candle interval: ${intervalMinutes}m`)
+    }
+    return series
+  }
+  
+  getCandles(intervalMinutes) {
+    return this.getSeries(intervalMinutes).toArray()
+  }
+  
+  getLatest(intervalMinutes) {
+    return this.getSeries(intervalMinutes).latest()
+  }
+  
+  upsert(intervalMinutes, candle) {
+    this.getSeries(intervalMinutes).upsert(candle)
+  }
+  
+  getCandlesSince(intervalMinutes, time) {
+    return this.getSeries(intervalMinutes).since(time)
+  }
+  
+  // Changes to closed candles so far; feeds that only push the open candle
+  // redraw when this moves
+  getRewrites(intervalMinutes) {
+    return this.getSeries(intervalMinutes).rewrites
+  }
+}
+
+export const CANDLE_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+// { time: [...], open: [...], ... } - smaller than an array of objects
+export function toColumnarCandles(candles) {
+  const columns = {}
+  CANDLE_COLUMNS.forEach((column) => {
+    columns[column] = new Array(candles.length)
+  })
+  candles.forEach((candle, i) => {
+    CANDLE_COLUMNS.forEach((column) => {
+      columns[column][i] = candle[column]
+    })
+  })
+  return columns
+}
+
+// Column-major little-endian Float64 block: all times, then all opens, ...
+export function toBinaryCandles(candles) {
+  const data = new Float64Array(candles.length * CANDLE_COLUMNS.length)
+  candles.forEach((candle, i) => {
+    CANDLE_COLUMNS.forEach((column, c) => {
+      data[c * candles.length + i] = candle[column]
+    })
+  })
+  return new Uint8Array(data.buffer)
+}
@@ -0,0 +1,292 @@
+// Declarative registry of tracked EVM chains.
+//
+// Everything chain-specific lives here: display metadata, RPC endpoints,
+// block cadence and the fee model Web3Service uses to price a transfer.
+// Adding a network is one entry; the store, API routes, mocks and
+// connection code all read from this list.
+//
+// Fee models:
+//   eip1559  - base fee from the block header plus a priority fee
+//   legacy   - single gas price from eth_gasPrice (chains without a useful base fee)
+//   arbitrum - L2 execution + L1 data cost from NodeInterface.gasEstimateComponents
+//   opStack  - L2 execution + L1 data fee from the GasPriceOracle predeploy
+//
+// eip1559 ({ denominator, elasticity }) is set where the chain follows the
+// EIP-1559 base fee update rule with known parameters; the forecaster uses
+// it to project the base fee.
+//
+// priceFeed names the USD feed for the chain's gas token. Only 'ETH/USD'
+// exists (lib/price.js); chains paying gas in another token set it to null
+// and show no USD costs until they get a feed of their own.
+
+// Env overrides, comma-separated lists. Each variable is referenced literally
+// so Next.js can inline it into the client bundle.
+const RPC_OVERRIDES = {
+  ethereum: process.env.NEXT_PUBLIC_RPC_ETHEREUM,
+  polygon: process.env.NEXT_PUBLIC_RPC_POLYGON,
+  arbitrum: process.env.NEXT_PUBLIC_RPC_ARBITRUM,
+  base: process.env.NEXT_PUBLIC_RPC_BASE,
+  optimism: process.env.NEXT_PUBLIC_RPC_OPTIMISM,
+  bsc: process.env.NEXT_PUBLIC_RPC_BSC,
+  avalanche: process.env.NEXT_PUBLIC_RPC_AVALANCHE
+}
+
+const HTTP_RPC_OVERRIDES = {
+  arbitrum: process.env.NEXT_PUBLIC_RPC_ARBITRUM_HTTP
+}
+
+export const CHAINS = [
+  {
+    id: 'ethereum',
+    name: 'Ethereum',
+    symbol: 'ETH',
+    evmChainId: 1,
+    color: '#627EEA',
+    feeModel: 'eip1559',
+    blockTimeMs: 12000,
+    eip1559: { denominator: 8, elasticity: 2 },
+    rpcUrls: ['wss://ethereum-rpc.publicnode.com', 'wss://eth.drpc.org'],
+    mockBaseFeeGwei: 15,
+    defaultVisible: true
+  },
+  {
+    id: 'polygon',
+    name: 'Polygon',
+    symbol: 'MATIC',
+    priceFeed: null,
+    evmChainId: 137,
+    color: '#8247E5',
+    feeModel: 'eip1559',
+    blockTimeMs: 2000,
+    eip1559: { denominator: 16, elasticity: 2 },
+    rpcUrls: ['wss://polygon-bor-rpc.publicnode.com', 'wss://polygon.drpc.org'],
+    mockBaseFeeGwei: 30,
+    defaultVisible: true
+  },
+  {
+    id: 'arbitrum',
+    name: 'Arbitrum',
+    symbol: 'ARB',
+    evmChainId: 42161,
+    color: '#28A0F0',
+    feeModel: 'arbitrum',
+    blockTimeMs: 250,
+    rpcUrls: ['wss://arbitrum-one-rpc.publicnode.com', 'wss://arbitrum.drpc.org'],
+    httpRpcUrl: 'https://arbitrum-one-rpc.publicnode.com',
+    mockBaseFeeGwei: 0.1,
+    defaultVisible: true
+  },
+  {
+    id: 'base',
+    name: 'Base',
+    symbol: 'ETH',
+    evmChainId: 8453,
+    color: '#0052FF',
+    feeModel: 'opStack',
+    blockTimeMs: 2000,
+    eip1559: { denominator: 250, elasticity: 6 },
+    rpcUrls: ['wss://base-rpc.publicnode.com', 'wss://base.drpc.org'],
+    httpRpcUrl: 'https://base-rpc.publicnode.com',
+    mockBaseFeeGwei: 0.01
+  },
+  {
+    id: 'optimism',
+    name: 'Optimism',
+    symbol: 'ETH',
+    evmChainId: 10,
+    color: '#FF0420',
+    feeModel: 'opStack',
+    blockTimeMs: 2000,
+    eip1559: { denominator: 250, elasticity: 6 },
+    rpcUrls: ['wss://optimism-rpc.publicnode.com', 'wss://optimism.drpc.org'],
+    httpRpcUrl: 'https://optimism-rpc.publicnode.com',
+    mockBaseFeeGwei: 0.01
+  },
+  {
+    id: 'bsc',
+    name: 'BNB Smart Chain',
+    symbol: 'BNB',
+    priceFeed: null,
+    evmChainId: 56,
+    color: '#F0B90B',
+    feeModel: 'legacy',
+    blockTimeMs: 3000,
+    rpcUrls: ['wss://bsc-rpc.publicnode.com', 'wss://bsc.drpc.org'],
+    mockBaseFeeGwei: 1
+  },
+  {
+    id: 'avalanche',
+    name: 'Avalanche C-Chain',
+    symbol: 'AVAX',
+    priceFeed: null,
+    evmChainId: 43114,
+    color: '#E84142',
+    feeModel: 'eip1559',
+    blockTimeMs: 2000,
+    rpcUrls: ['wss://avalanche-c-chain-rpc.publicnode.com', 'wss://avalanche.drpc.org'],
+    mockBaseFeeGwei: 25
+  },
+  {
+    id: 'linea',
+    name: 'Linea',
+    symbol: 'ETH',
+    evmChainId: 59144,
+    color: '#61DFFF',
+    feeModel: 'eip1559',
+    blockTimeMs: 2000,
+    rpcUrls: ['wss://linea-rpc.publicnode.com', 'wss://linea.drpc.org'],
+    mockBaseFeeGwei: 0.05
+  },
+  {
+    id: 'scroll',
+    name: 'Scroll',
+    symbol: 'ETH',
+    evmChainId: 534352,
+    color: '#FFEEDA',
+    feeModel: 'eip1559',
+    blockTimeMs: 3000,
+    rpcUrls: ['wss://scroll-rpc.publicnode.com', 'wss://scroll.drpc.org'],
+    mockBaseFeeGwei: 0.05
+  },
+  {
+    id: 'blast',
+    name: 'Blast',
+    symbol: 'ETH',
+    evmChainId: 81457,
+    color: '#FCFC03',
+    feeModel: 'opStack',
+    blockTimeMs: 2000,
+    rpcUrls: ['wss://blast-rpc.publicnode.com', 'wss://blast.drpc.org'],
+    httpRpcUrl: 'https://blast-rpc.publicnode.com',
+    mockBaseFeeGwei: 0.01
+  },
+  {
+    id: 'mantle',
+    name: 'Mantle',
+    symbol: 'MNT',
+    priceFeed: null,
+    evmChainId: 5000,
+    color: '#65B3AE',
+    feeModel: 'eip1559',
+    blockTimeMs: 2000,
+    rpcUrls: ['wss://mantle-rpc.publicnode.com', 'wss://mantle.drpc.org'],
+    mockBaseFeeGwei: 0.02
+  },
+  {
+    id: 'opbnb',
+    name: 'opBNB',
+    symbol: 'BNB',
+    priceFeed: null,
+    evmChainId: 204,
+    color: '#F3BA2F',
+    feeModel: 'opStack',
+    blockTimeMs: 1000,
+    rpcUrls: ['wss://opbnb-rpc.publicnode.com', 'wss://opbnb.drpc.org'],
+    httpRpcUrl: 'https://opbnb-rpc.publicnode.com',
+    mockBaseFeeGwei: 0.001
+  },
+  {
+    id: 'arbitrum-nova',
+    name: 'Arbitrum Nova',
+    symbol: 'ETH',
+    evmChainId: 42170,
+    color: '#EF8220',
+    feeModel: 'arbitrum',
+    blockTimeMs: 250,
+    rpcUrls: ['wss://arbitrum-nova-rpc.publicnode.com', 'wss://arbitrum-nova.drpc.org'],
+    httpRpcUrl: 'https://arbitrum-nova-rpc.publicnode.com',
+    mockBaseFeeGwei: 0.01
+  },
+  {
+    id: 'gnosis',
+    name: 'Gnosis',
+    symbol: 'xDAI',
+    priceFeed: null,
+    evmChainId: 100,
+    color: '#04795B',
+    feeModel: 'eip1559',
+    blockTimeMs: 5000,
+    eip1559: { denominator: 8, elasticity: 2 },
+    rpcUrls: ['wss://gnosis-rpc.publicnode.com', 'wss://gnosis.drpc.org'],
+    mockBaseFeeGwei: 1
+  },
+  {
+    id: 'celo',
+    name: 'Celo',
+    symbol: 'CELO',
+    priceFeed: null,
+    evmChainId: 42220,
+    color: '#FCFF52',
+    feeModel: 'eip1559',
+    blockTimeMs: 1000,
+    rpcUrls: ['wss://celo-rpc.publicnode.com', 'wss://celo.drpc.org'],
+    mockBaseFeeGwei: 5
+  },
+  {
+    id: 'moonbeam',
+    name: 'Moonbeam',
+    symbol: 'GLMR',
+    priceFeed: null,
+    evmChainId: 1284,
+    color: '#53CBC9',
+    feeModel: 'eip1559',
+    blockTimeMs: 6000,
+    rpcUrls: ['wss://moonbeam-rpc.publicnode.com', 'wss://moonbeam.drpc.org'],
+    mockBaseFeeGwei: 125
+  },
+  {
+    id: 'fantom',
+    name: 'Fantom',
+    symbol: 'FTM',
+    priceFeed: null,
+    evmChainId: 250,
+    color: '#1969FF',
+    feeModel: 'legacy',
+    blockTimeMs: 1000,
+    rpcUrls: ['wss://fantom-rpc.publicnode.com', 'wss://fantom.drpc.org'],
+    mockBaseFeeGwei: 10
+  },
+  {
+    id: 'taiko',
+    name: 'Taiko',
+    symbol: 'ETH',
+    evmChainId: 167000,
+    color: '#E81899',
+    feeModel: 'eip1559',
+    blockTimeMs: 12000,
+    rpcUrls: ['wss://taiko-rpc.publicnode.com', 'wss://taiko.drpc.org'],
+    mockBaseFeeGwei: 0.01
+  }
+].map((chain) => ({
+  decimals: 18,
+  defaultVisible: false,
+  eip1559: null,
+  priceFeed: 'ETH/USD',
+  ...chain,
+  rpcUrls: RPC_OVERRIDES[chain.id]
+    ? RPC_OVERRIDES[chain.id].split(',').map((url) => url.trim()).filter(Boolean)
+    : chain.rpcUrls,
+  httpRpcUrl: HTTP_RPC_OVERRIDES[chain.id] || chain.httpRpcUrl
+}))
+
+export const CHAINS_BY_ID = Object.fromEntries(CHAINS.map((chain) => [chain.id, chain]))
+
+export const CHAIN_IDS = CHAINS.map((chain) => chain.id)
+
+export const DEFAULT_VISIBLE_CHAIN_IDS = CHAINS.filter((chain) => chain.defaultVisible).map((chain) => chain.id)
+
+export function getChain(chainId) {
+  return CHAINS_BY_ID[chainId] || null
+}
+
+// USD price of the chain's gas token given the ETH/USD price, or null when
+// the token has no feed
+export function gasTokenUsdPrice(chainId, ethPrice) {
+  return getChain(chainId)?.priceFeed === 'ETH/USD' ? ethPrice : null
+}
+
+// A socket that delivers no block for this long is considered stalled
+export function staleHeadMs(chainId) {
+  const chain = getChain(chainId)
+  return chain ? Math.max(10000, chain.blockTimeMs * 5) : 60000
+}
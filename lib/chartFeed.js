@@ -0,0 +1,107 @@
+// Incremental feeds from the store's buffers into lightweight-charts series.
+//
+// A feed remembers the time of the last bar it drew. Each sync pushes only
+// bars at or after that time through series.update(), which either replaces
+// the last bar (same time) or appends a new one, so a tick costs O(new bars)
+// instead of a full setData() over the whole history. The feed falls back
+// to setData() on its first sync and whenever the source buffer object was
+// swapped (history hydration replaces the buffers).
+//
+// update() cannot rewrite bars before the last one, so a late point that
+// widens an already-closed candle needs a setData(). Feeds given
+// getRevision() do that whenever the revision moves.
+
+// Gas price line (gwei) from a history buffer. Chart times are whole seconds
+// and must strictly increase, so later points in the same second win.
+export function toLineData(history, fromTime = -Infinity) {
+  // Find the first point at or after fromTime by walking back from the end
+  let first = history.length
+  while (first > 0 && Math.floor(history.timestampAt(first - 1) / 1000) >= fromTime) first--
+  
+  const lineData = []
+  for (let i = first; i < history.length; i++) {
+    const time = Math.floor(history.timestampAt(i) / 1000)
+    const value = history.gasPriceAt(i) / 1e9 // Convert to gwei
+    const last = lineData[lineData.length - 1]
+    
+    if (last && last.time >= time) {
+      last.value = value
+    } else {
+      lineData.push({ time, value })
+    }
+  }
+  return lineData
+}
+
+export class SeriesFeed {
+  // getSource() returns the buffer being drawn; readAll(source) and
+  // readSince(source, time) return bars oldest-first. getRevision(source),
+  // when given, changes whenever bars before the last one were rewritten.
+  constructor(series, { getSource, readAll, readSince, getRevision = () => 0 }) {
+    this.series = series
+    this.getSource = getSource
+    this.readAll = readAll
+    this.readSince = readSince
+    this.getRevision = getRevision
+    this.source = null
+    this.revision = null
+    this.lastTime = null
+    this.stats = { resets: 0, updates: 0 }
+  }
+  
+  sync() {
+    const source = this.getSource()
+    if (!source) return
+    
+    const revision = this.getRevision(source)
+    if (source !== this.source || this.lastTime === null || revision !== this.revision) {
+      const bars = this.readAll(source)
+      this.series.setData(bars)
+      this.source = source
+      this.revision = revision
+      this.lastTime = bars.length > 0 ? bars[bars.length - 1].time : null
+      this.stats.resets++
+      return
+    }
+    
+    const bars = this.readSince(source, this.lastTime)
+    for (const bar of bars) {
+      this.series.update(bar)
+    }
+    if (bars.length > 0) {
+      this.lastTime = bars[bars.length - 1].time
+      this.stats.updates += bars.length
+    }
+  }
+}
+
+// OHLC candles of one chain
+export function candleFeed(series, getChain, intervalMinutes = 15) {
+  return new SeriesFeed(series, {
+    getSource: () => getChain()?.candles,
+    readAll: (candles) => candles.getCandles(intervalMinutes),
+    readSince: (candles, time) => candles.getCandlesSince(intervalMinutes, time),
+    getRevision: (candles) => candles.getRewrites(intervalMinutes)
+  })
+}
+
+// Close prices of one chain's candles, for comparison lines
+export function candleCloseFeed(series, getChain, intervalMinutes = 15) {
+  const toClose = (candle) => ({ time: candle.time, value: candle.close })
+  return new SeriesFeed(series, {
+    getSource: () => getChain()?.candles,
+    readAll: (candles) => candles.getCandles(intervalMinutes).map(toClose),
+    readSince: (candles, time) => candles.getCandlesSince(intervalMinutes, time).map(toClose),
+    // Widening a closed candle leaves its close alone
+    getRevision: () => 0
+  })
+}
+
+// Raw gas price line from one chain's history buffer
+export function historyLineFeed(series, getChain) {
+  return new SeriesFeed(series, {
+    getSource: () => getChain()?.history,
+    readAll: (history) => toLineData(history),
+    readSince: (history, time) => toLineData(history, time)
+  })
+}
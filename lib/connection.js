@@ -0,0 +1,337 @@
+import { ethers } from 'ethers'
+import { log } from './log.js'
+
+// Per-chain WebSocket connection manager.
+//
+// - Several endpoints per chain, ranked by measured latency (EWMA of connect
+//   and request round trips); endpoints that fail are pushed down the list.
+//   Each successful connect halves an endpoint's failure count, and a socket
+//   that stays healthy for healthyRunMs clears it, so old outages fade.
+// - Connects are hedged: if the best endpoint hasn't answered getNetwork()
+//   within hedgeDelayMs, the next one is tried in parallel and the first to
+//   answer wins. Reads can be hedged the same way against a standby socket.
+// - Reconnects are single-flight with exponential backoff and full jitter,
+//   capped at maxBackoffMs, so error and close events can't stack retries.
+// - A stale-head watchdog treats a socket that stops delivering blocks for
+//   staleHeadMs as dead.
+
+const DEFAULT_OPTIONS = {
+  connectTimeoutMs: 3000,
+  hedgeDelayMs: 750,
+  baseBackoffMs: 1000,
+  maxBackoffMs: 30000,
+  staleHeadMs: 60000,
+  healthyRunMs: 5 * 60 * 1000,
+  latencySmoothing: 0.3
+}
+
+function withTimeout(promise, ms, message) {
+  let timer
+  return Promise.race([
+    promise,
+    new Promise((_, reject) => {
+      timer = setTimeout(() => reject(new Error(message)), ms)
+    })
+  ]).finally(() => clearTimeout(timer))
+}
+
+function destroyQuietly(provider) {
+  try {
+    provider.removeAllListeners()
+    provider.destroy()
+  } catch (error) {
+    // Socket never opened or is already closed
+  }
+}
+
+export class ConnectionManager {
+  // onConnect(provider) runs for every new live socket, including reconnects
+  constructor(chainId, urls, { onConnect, onDisconnect, ...options } = {}) {
+    this.chainId = chainId
+    this.options = { ...DEFAULT_OPTIONS, ...options }
+    this.onConnect = onConnect
+    this.onDisconnect = onDisconnect
+    this.endpoints = urls.map((url) => ({ url, latencyMs: null, failures: 0 }))
+    this.provider = null
+    this.endpoint = null
+    this.standby = null
+    this.connecting = null
+    this.reconnectTimer = null
+    this.watchdog = null
+    this.attempt = 0
+    this.stopped = false
+    this.connectedAt = 0
+    this.lastHeadAt = 0
+    this.metrics = {
+      endpoint: null,
+      connects: 0,
+      reconnects: 0,
+      failures: 0,
+      staleHeads: 0,
+      hedgedConnects: 0,
+      hedgedRequests: 0,
+      lastConnectMs: null,
+      timeToFirstBlockMs: null,
+      lastError: null
+    }
+  }
+  
+  // Best endpoints first: known latency ascending, unmeasured next, failures last
+  rankedEndpoints() {
+    return [...this.endpoints].sort((a, b) => {
+      if (a.failures !== b.failures) return a.failures - b.failures
+      return (a.latencyMs ?? Infinity) - (b.latencyMs ?? Infinity)
+    })
+  }
+  
+  recordLatency(endpoint, ms) {
+    const alpha = this.options.latencySmoothing
+    endpoint.latencyMs = endpoint.latencyMs === null ? ms : endpoint.latencyMs + alpha * (ms - endpoint.latencyMs)
+  }
+  
+  // Open a socket and confirm it answers before handing it out
+  async probe(endpoint) {
+    const started = Date.now()
+    const provider = new ethers.WebSocketProvider(endpoint.url)
+    provider.on('error', () => {})
+    
+    try {
+      await withTimeout(provider.getNetwork(), this.options.connectTimeoutMs, `Timeout connecting to ${endpoint.url}`)
+      this.recordLatency(endpoint, Date.now() - started)
+      endpoint.failures = Math.floor(endpoint.failures / 2)
+      return provider
+    } catch (error) {
+      endpoint.failures++
+      destroyQuietly(provider)
+      throw error
+    }
+  }
+  
+  // Hedged connect across the ranked endpoints; resolves with the first live one
+  connectFastest() {
+    const candidates = this.rankedEndpoints()
+    
+    return new Promise((resolve, reject) => {
+      let pending = 0
+      let settled = false
+      let next = 0
+      let hedgeTimer = null
+      const errors = []
+      
+      const launch = () => {
+        clearTimeout(hedgeTimer)
+        if (settled || next >= candidates.length) return
+        const endpoint = candidates[next++]
+        pending++
+        if (next > 1) this.metrics.hedgedConnects++
+        
+        this.probe(endpoint).then((provider) => {
+          pending--
+          if (settled) {
+            destroyQuietly(provider)
+            return
+          }
+          settled = true
+          clearTimeout(hedgeTimer)
+          resolve({ provider, endpoint })
+        }, (error) => {
+          pending--
+          errors.push(error)
+          // A hard failure moves straight on to the next endpoint
+          launch()
+          if (!settled && pending === 0 && next >= candidates.length) {
+            settled = true
+            clearTimeout(hedgeTimer)
+            reject(new Error(`All ${this.chainId} endpoints failed: ${errors.map((e) => e.message).join('; ')}`))
+          }
+        })
+        
+        hedgeTimer = setTimeout(launch, this.options.hedgeDelayMs)
+      }
+      
+      launch()
+    })
+  }
+  
+  // First connection; later ones go through scheduleReconnect
+  start() {
+    this.stopped = false
+    return this.connect()
+  }
+  
+  connect() {
+    if (this.connecting) return this.connecting
+    
+    const started = Date.now()
+    this.connecting = this.connectFastest().then(({ provider, endpoint }) => {
+      this.connecting = null
+      if (this.stopped) {
+        destroyQuietly(provider)
+        return null
+      }
+      
+      this.provider = provider
+      this.endpoint = endpoint
+      this.attempt = 0
+      this.connectedAt = Date.now()
+      this.lastHeadAt = this.connectedAt
+      this.metrics.connects++
+      this.metrics.endpoint = endpoint.url
+      this.metrics.lastConnectMs = this.connectedAt - started
+      this.metrics.timeToFirstBlockMs = null
+      
+      provider.on('error', (error) => this.fail(error))
+      provider.websocket?.addEventListener?.('close', () => {
+        if (this.provider === provider) this.fail(new Error('socket closed'))
+      })
+      this.startWatchdog()
+      this.onConnect?.(provider)
+      return provider
+    }, (error) => {
+      this.connecting = null
+      this.metrics.lastError = error.message
+      throw error
+    })
+    return this.connecting
+  }
+  
+  // Mark the chain as alive; called for every head or block
+  noteHead() {
+    const now = Date.now()
+    if (this.metrics.timeToFirstBlockMs === null && this.connectedAt) {
+      this.metrics.timeToFirstBlockMs = now - this.connectedAt
+    }
+    this.lastHeadAt = now
+    
+    if (this.endpoint?.failures && now - this.connectedAt >= this.options.healthyRunMs) {
+      this.endpoint.failures = 0
+    }
+  }
+  
+  startWatchdog() {
+    clearInterval(this.watchdog)
+    const { staleHeadMs } = this.options
+    this.watchdog = setInterval(() => {
+      if (this.provider && Date.now() - this.lastHeadAt > staleHeadMs) {
+        this.metrics.staleHeads++
+        this.fail(new Error(`no new head for ${staleHeadMs}ms`))
+      }
+    }, Math.max(1000, staleHeadMs / 4))
+  }
+  
+  // Drop the current socket and schedule one reconnect
+  fail(error) {
+    if (this.stopped || this.reconnectTimer || this.connecting) return
+    
+    this.metrics.failures++
+    this.metrics.lastError = error?.message || String(error)
+    if (this.endpoint) this.endpoint.failures++
+    log.warn(`${this.chainId} connection lost (${this.metrics.lastError}), reconnecting`)
+    
+    clearInterval(this.watchdog)
+    if (this.provider) {
+      const provider = this.provider
+      this.provider = null
+      this.onDisconnect?.(provider)
+      destroyQuietly(provider)
+    }
+    this.scheduleReconnect()
+  }
+  
+  backoffDelay() {
+    const { baseBackoffMs, maxBackoffMs } = this.options
+    const ceiling = Math.min(maxBackoffMs, baseBackoffMs * 2 ** this.attempt)
+    return Math.random() * ceiling // full jitter
+  }
+  
+  scheduleReconnect() {
+    if (this.stopped || this.reconnectTimer) return
+    
+    const delay = this.backoffDelay()
+    this.attempt++
+    this.reconnectTimer = setTimeout(() => {
+      this.reconnectTimer = null
+      this.metrics.reconnects++
+      this.connect().catch((error) => {
+        log.warn(`${this.chainId} reconnect failed:`, error.message)
+        this.scheduleReconnect()
+      })
+    }, delay)
+  }
+  
+  // Second socket on the next-best endpoint for hedged reads, opened lazily
+  async getStandby() {
+    // The primary moved to another endpoint; pick a new standby
+    if (this.standby && this.standby.forEndpoint !== this.endpoint) {
+      this.standby.provider.then(destroyQuietly, () => {})
+      this.standby = null
+    }
+    if (!this.standby) {
+      const endpoint = this.rankedEndpoints().find((candidate) => candidate !== this.endpoint)
+      if (!endpoint) return null
+      
+      const standby = { forEndpoint: this.endpoint, provider: this.probe(endpoint) }
+      standby.provider.catch(() => {
+        if (this.standby === standby) this.standby = null
+      })
+      this.standby = standby
+    }
+    return this.standby.provider
+  }
+  
+  // Run fn(provider) on the active socket; if it hasn't answered within
+  // hedgeDelayMs, race the same call on the standby socket
+  async hedge(fn) {
+    const provider = this.provider
+    if (!provider) throw new Error(`${this.chainId} is not connected`)
+    if (this.endpoints.length < 2) return fn(provider)
+    
+    const started = Date.now()
+    const primary = fn(provider).then((result) => {
+      this.recordLatency(this.endpoint, Date.now() - started)
+      return result
+    })
+    
+    let timer
+    const backup = new Promise((resolve, reject) => {
+      timer = setTimeout(() => {
+        this.metrics.hedgedRequests++
+        this.getStandby()
+          .then((standby) => standby ? fn(standby) : primary)
+          .then(resolve, reject)
+      }, this.options.hedgeDelayMs)
+    })
+    
+    try {
+      return await Promise.any([primary, backup])
+    } catch (error) {
+      throw error.errors?.[0] || error
+    } finally {
+      clearTimeout(timer)
+    }
+  }
+  
+  getMetrics() {
+    return {
+      ...this.metrics,
+      endpoints: this.endpoints.map(({ url, latencyMs, failures }) => ({
+        url,
+        latencyMs: latencyMs === null ? null : Math.round(latencyMs),
+        failures
+      }))
+    }
+  }
+  
+  stop() {
+    this.stopped = true
+    clearInterval(this.watchdog)
+    clearTimeout(this.reconnectTimer)
+    this.reconnectTimer = null
+    if (this.provider) destroyQuietly(this.provider)
+    this.provider = null
+    if (this.standby) {
+      this.standby.provider.then(destroyQuietly, () => {})
+      this.standby = null
+    }
+  }
+}
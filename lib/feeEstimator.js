@@ -0,0 +1,79 @@
+// Priority-fee tiers per chain from eth_feeHistory reward percentiles.
+//
+// The estimator keeps the 10th/50th/90th percentile tips of the last
+// windowBlocks blocks in a ring with running sums, so adding a block and
+// reading the slow/standard/fast tiers are both O(1). Once the window is
+// seeded, each head only asks for the blocks since the last one seen
+// (normally just the newest) instead of re-querying the whole window.
+
+export const FEE_PERCENTILES = [10, 50, 90]
+export const FEE_TIERS = ['slow', 'standard', 'fast']
+
+const DEFAULT_WINDOW_BLOCKS = 20
+
+export class PriorityFeeEstimator {
+  constructor({ windowBlocks = DEFAULT_WINDOW_BLOCKS } = {}) {
+    this.windowBlocks = windowBlocks
+    this.rewards = FEE_TIERS.map(() => new Float64Array(windowBlocks))
+    this.sums = FEE_TIERS.map(() => 0)
+    this.count = 0
+    this.next = 0
+    this.lastBlock = -1
+    this.tiers = null
+  }
+  
+  // Blocks to request so the window ends at headBlock; 0 when up to date
+  blocksToFetch(headBlock) {
+    if (this.lastBlock < 0) return this.windowBlocks
+    return Math.max(0, Math.min(this.windowBlocks, headBlock - this.lastBlock))
+  }
+  
+  // One block's rewards, in FEE_PERCENTILES order (wei)
+  push(blockNumber, reward) {
+    if (blockNumber <= this.lastBlock) return
+    this.lastBlock = blockNumber
+    
+    const slot = this.next
+    const full = this.count === this.windowBlocks
+    FEE_TIERS.forEach((_, i) => {
+      const value = Number(reward[i] ?? 0)
+      if (full) this.sums[i] -= this.rewards[i][slot]
+      this.rewards[i][slot] = value
+      this.sums[i] += value
+    })
+    if (!full) this.count++
+    this.next = (slot + 1) % this.windowBlocks
+    this.tiers = null
+  }
+  
+  // Raw eth_feeHistory result. Empty blocks report zero tips and would drag
+  // every tier down, so they only advance the block cursor.
+  applyFeeHistory({ oldestBlock, reward = [], gasUsedRatio = [] }) {
+    const oldest = Number(oldestBlock)
+    reward.forEach((blockReward, i) => {
+      const blockNumber = oldest + i
+      if (gasUsedRatio[i] === 0) {
+        this.lastBlock = Math.max(this.lastBlock, blockNumber)
+        return
+      }
+      this.push(blockNumber, blockReward)
+    })
+  }
+  
+  // { slow, standard, fast } in wei, or null before the first block
+  getTiers() {
+    if (this.count === 0) return null
+    if (!this.tiers) {
+      const [slow, standard, fast] = this.sums.map((sum) => Math.round(sum / this.count))
+      // Percentile averages are ordered in practice; enforce it anyway
+      this.tiers = {
+        slow,
+        standard: Math.max(slow, standard),
+        fast: Math.max(slow, standard, fast),
+        blocks: this.count,
+        lastBlock: this.lastBlock
+      }
+    }
+    return this.tiers
+  }
+}
@@ -0,0 +1,70 @@
+// Fixed-point helpers for wei, Q64.96 and USD amounts.
+//
+// Values that arrive as raw integers (the pool's sqrtPriceX96, wei products
+// from RPC BigInts) are converted exactly on BigInt, once per swap or per
+// estimate. USD amounts are carried as micro-dollars (1e6 scale, same as
+// USDC) until they become display Numbers.
+//
+// Per-block and per-render costs (gasCostUSD) stay on doubles: the store
+// holds fees and prices as Numbers, so BigInt there would be exact only in
+// name and several times slower (bench/fixed.bench.mjs).
+
+export const WEI_PER_ETH = 10n ** 18n
+export const WEI_PER_GWEI = 10n ** 9n
+export const USD_DECIMALS = 6
+export const USD_SCALE = 10n ** 6n
+export const STANDARD_TRANSFER_GAS = 21000n
+
+// Raw WETH/USDC decimals difference for the Uniswap pool (18 - 6)
+const TOKEN_DECIMALS_SCALE = 10n ** 12n
+// 10^12 * 10^6 * 2^192, numerator of the ETH/USD micro-dollar price
+const SQRT_PRICE_NUMERATOR = (TOKEN_DECIMALS_SCALE * USD_SCALE) << 192n
+
+// Coerce wei-like values (bigint, integer Number, decimal or hex string) to BigInt
+export function toBigInt(value) {
+  if (typeof value === 'bigint') return value
+  if (typeof value === 'number') return BigInt(Math.round(value))
+  if (value == null || value === '') return 0n
+  return BigInt(value)
+}
+
+// ETH/USD in micro-dollars from the pool's sqrtPriceX96 (token0 USDC, token1 WETH)
+export function sqrtPriceX96ToUsdE6(sqrtPriceX96) {
+  const sqrtPrice = toBigInt(sqrtPriceX96)
+  if (sqrtPrice === 0n) return 0n
+  return SQRT_PRICE_NUMERATOR / (sqrtPrice * sqrtPrice)
+}
+
+// Total fee in wei for a transaction at the given per-gas fees
+export function gasCostWei(baseFee, priorityFee, gasLimit = STANDARD_TRANSFER_GAS) {
+  return (toBigInt(baseFee) + toBigInt(priorityFee)) * toBigInt(gasLimit)
+}
+
+// Arbitrum L2 execution plus L1 calldata cost, in wei
+export function arbitrumGasCostWei({ l2GasEstimate, l1GasEstimate, l2BaseFee, l1BaseFee }) {
+  const l2Cost = toBigInt(l2GasEstimate) * toBigInt(l2BaseFee)
+  const l1Cost = toBigInt(l1GasEstimate) * toBigInt(l1BaseFee)
+  return { l1Cost, l2Cost, total: l1Cost + l2Cost }
+}
+
+// Display conversions
+export function usdE6ToNumber(usdE6) {
+  return Number(usdE6) / 1e6
+}
+
+export function weiToGweiNumber(wei) {
+  const value = toBigInt(wei)
+  return Number(value / WEI_PER_GWEI) + Number(value % WEI_PER_GWEI) / 1e9
+}
+
+export function weiToEthNumber(wei) {
+  const value = toBigInt(wei)
+  return Number(value / WEI_PER_ETH) + Number(value % WEI_PER_ETH) / 1e18
+}
+
+// USD gas cost of a transaction from per-gas fees in wei and the ETH price
+// in dollars, all Numbers as the store holds them. l1GasCost is a rollup's
+// L1 data fee for the transaction, in wei.
+export function gasCostUSD(baseFee, priorityFee, usdPrice, { gasLimit = 21000, l1GasCost = 0 } = {}) {
+  return (((baseFee + priorityFee) * gasLimit + l1GasCost) / 1e18) * usdPrice
+}
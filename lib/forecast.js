@@ -0,0 +1,185 @@
+// Streaming gas analytics and short-horizon forecasts per chain.
+//
+// Every statistic is updated in constant time per block, independent of how
+// much history has been seen:
+// - fast/slow EWMAs of the gas price
+// - volatility: exponentially weighted std of per-block log returns
+// - rolling p10/p50/p90 over the last windowBlocks blocks, from a
+//   log-spaced histogram (bin counts in and out of a ring, O(bins) to query)
+// - EWMA and std of the block gas-used ratio
+//
+// Forecasts:
+// - chains with an EIP-1559 rule ({ denominator, elasticity } in the chain
+//   registry) project the base fee forward. The next block's base fee is
+//   exact given the last block; later blocks assume the smoothed gas-used
+//   ratio, with bands from that ratio +/- BAND_Z std, clamped to [0, 1].
+// - other chains project the gas price from the fast EWMA with a band that
+//   widens with volatility * sqrt(blocks).
+
+export const FORECAST_HORIZONS = [1, 5, 10]
+
+// ~90% two-sided band for a normal variable
+const BAND_Z = 1.645
+
+// Histogram: 32 bins per decade from 1e-4 to 1e4 gwei
+const BINS_PER_DECADE = 32
+const MIN_LOG10_GWEI = -4
+const BIN_COUNT = 8 * BINS_PER_DECADE
+
+function binOf(gwei) {
+  if (!(gwei > 0)) return 0
+  const bin = Math.floor((Math.log10(gwei) - MIN_LOG10_GWEI) * BINS_PER_DECADE)
+  return Math.min(BIN_COUNT - 1, Math.max(0, bin))
+}
+
+// Geometric centre of a bin, in gwei
+function binValue(bin) {
+  return 10 ** (MIN_LOG10_GWEI + (bin + 0.5) / BINS_PER_DECADE)
+}
+
+// Exponentially weighted mean and variance
+class EwStats {
+  constructor(alpha) {
+    this.alpha = alpha
+    this.mean = 0
+    this.variance = 0
+    this.count = 0
+  }
+  
+  push(value) {
+    if (this.count++ === 0) {
+      this.mean = value
+      return
+    }
+    const diff = value - this.mean
+    this.mean += this.alpha * diff
+    this.variance = (1 - this.alpha) * (this.variance + this.alpha * diff * diff)
+  }
+  
+  get std() {
+    return Math.sqrt(this.variance)
+  }
+}
+
+export class GasForecaster {
+  constructor({ eip1559 = null, windowBlocks = 256, fastAlpha = 0.3, slowAlpha = 0.05 } = {}) {
+    this.eip1559 = eip1559
+    this.windowBlocks = windowBlocks
+    this.fast = new EwStats(fastAlpha)
+    this.slow = new EwStats(slowAlpha)
+    this.returns = new EwStats(fastAlpha)
+    this.ratio = new EwStats(fastAlpha)
+    this.bins = new Uint32Array(BIN_COUNT)
+    this.ring = new Uint16Array(windowBlocks)
+    this.ringCount = 0
+    this.ringNext = 0
+    this.lastGasPrice = 0
+    this.last = null
+  }
+  
+  // One gas point (wei): { baseFee, gasPrice, gasUsedRatio?, lastBlock }
+  push(point) {
+    const gasPrice = Number(point.gasPrice) || 0
+    const gwei = gasPrice / 1e9
+    
+    this.fast.push(gwei)
+    this.slow.push(gwei)
+    if (this.lastGasPrice > 0 && gasPrice > 0) {
+      this.returns.push(Math.log(gasPrice / this.lastGasPrice))
+    }
+    this.lastGasPrice = gasPrice
+    
+    if (point.gasUsedRatio != null && Number.isFinite(point.gasUsedRatio)) {
+      this.ratio.push(point.gasUsedRatio)
+    }
+    
+    // Rolling window: the evicted block's bin goes out, the new one in
+    const bin = binOf(gwei)
+    if (this.ringCount === this.windowBlocks) {
+      this.bins[this.ring[this.ringNext]]--
+    } else {
+      this.ringCount++
+    }
+    this.ring[this.ringNext] = bin
+    this.bins[bin]++
+    this.ringNext = (this.ringNext + 1) % this.windowBlocks
+    
+    this.last = point
+  }
+  
+  // Gas price percentiles (gwei) over the rolling window
+  percentiles(targets = [10, 50, 90]) {
+    const result = {}
+    if (this.ringCount === 0) return result
+    
+    let seen = 0
+    let t = 0
+    const sorted = [...targets].sort((a, b) => a - b)
+    for (let bin = 0; bin < BIN_COUNT && t < sorted.length; bin++) {
+      seen += this.bins[bin]
+      while (t < sorted.length && seen >= (sorted[t] / 100) * this.ringCount) {
+        result[`p${sorted[t]}`] = binValue(bin)
+        t++
+      }
+    }
+    return result
+  }
+  
+  // Base fee after one block with the given gas-used ratio (EIP-1559)
+  stepBaseFee(baseFee, ratio) {
+    const { denominator, elasticity } = this.eip1559
+    const clamped = Math.min(1, Math.max(0, ratio))
+    return baseFee * (1 + (clamped * elasticity - 1) / denominator)
+  }
+  
+  projectBaseFee(horizons) {
+    const baseFee = Number(this.last.baseFee) || 0
+    const lastRatio = this.last.gasUsedRatio ?? this.ratio.mean
+    const mean = this.ratio.mean
+    const spread = BAND_Z * this.ratio.std
+    const maxBlocks = Math.max(...horizons)
+    
+    // The next base fee follows from the last block alone
+    let expected = this.stepBaseFee(baseFee, lastRatio)
+    let lower = expected
+    let upper = expected
+    const out = []
+    
+    for (let k = 1; k <= maxBlocks; k++) {
+      if (k > 1) {
+        expected = this.stepBaseFee(expected, mean)
+        lower = this.stepBaseFee(lower, mean - spread)
+        upper = this.stepBaseFee(upper, mean + spread)
+      }
+      if (horizons.includes(k)) out.push({ blocks: k, expected, lower, upper })
+    }
+    return out
+  }
+  
+  projectGasPrice(horizons) {
+    const expected = this.fast.mean * 1e9
+    const volatility = this.returns.std
+    return horizons.map((blocks) => {
+      const band = Math.exp(BAND_Z * volatility * Math.sqrt(blocks))
+      return { blocks, expected, lower: expected / band, upper: expected * band }
+    })
+  }
+  
+  // Snapshot for the UI; fee values in wei, statistics in gwei
+  getForecast(horizons = FORECAST_HORIZONS) {
+    if (!this.last) return null
+    
+    const projectsBaseFee = this.eip1559 && Number(this.last.baseFee) > 0 && this.ratio.count > 0
+    return {
+      lastBlock: this.last.lastBlock,
+      ewmaFast: this.fast.mean,
+      ewmaSlow: this.slow.mean,
+      trend: this.fast.mean - this.slow.mean,
+      volatility: this.returns.std,
+      gasUsedRatio: this.ratio.count > 0 ? this.ratio.mean : null,
+      percentiles: this.percentiles(),
+      target: projectsBaseFee ? 'baseFee' : 'gasPrice',
+      horizons: projectsBaseFee ? this.projectBaseFee(horizons) : this.projectGasPrice(horizons)
+    }
+  }
+}
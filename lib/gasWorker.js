@@ -0,0 +1,87 @@
+// Dedicated worker that owns the RPC connections, ABI decoding, fee math and
+// candle aggregation, so the UI thread only applies finished snapshots.
+//
+// Started by startGasWorker() (lib/workerClient.js). Protocol:
+//   UI -> worker  { type: 'start', source: 'stream' | 'direct', streamUrl, chainIds, flushMs }
+//                 { type: 'setChains', chainIds } | { type: 'stop' }
+//   worker -> UI  { type: 'ready' } | { type: 'error', message } | batch (lib/gasWorkerProtocol.js)
+
+import { Web3Service } from './web3.js'
+import { CandleAggregator } from './candles.js'
+import { toMillis } from './ringBuffer.js'
+import { UpdateScheduler } from './updateScheduler.js'
+import { encodeBatch } from './gasWorkerProtocol.js'
+
+const DEFAULT_FLUSH_MS = 50
+
+const service = new Web3Service()
+const aggregators = {}
+// Bucket time of the last candle sent per chain and interval; that candle
+// is resent on the next flush since it may still be open
+const sentCandleTimes = {}
+// Closed-candle rewrites already sent; a late point resends the interval
+const sentRewrites = {}
+
+function aggregatorFor(chainId) {
+  if (!aggregators[chainId]) {
+    aggregators[chainId] = new CandleAggregator()
+    sentCandleTimes[chainId] = {}
+    sentRewrites[chainId] = {}
+  }
+  return aggregators[chainId]
+}
+
+function postBatch({ gas, price, isConnected }) {
+  const candles = {}
+  
+  Object.entries(gas).forEach(([chainId, points]) => {
+    const aggregator = aggregatorFor(chainId)
+    points.forEach((point) => aggregator.add(toMillis(point.timestamp), point.gasPrice / 1e9))
+    
+    candles[chainId] = {}
+    aggregator.intervals.forEach((interval) => {
+      const rewrites = aggregator.getRewrites(interval)
+      const since = rewrites === (sentRewrites[chainId][interval] ?? 0)
+        ? sentCandleTimes[chainId][interval] ?? -Infinity
+        : -Infinity
+      sentRewrites[chainId][interval] = rewrites
+      const changed = aggregator.getCandlesSince(interval, since)
+      if (changed.length === 0) return
+      candles[chainId][interval] = changed
+      sentCandleTimes[chainId][interval] = changed[changed.length - 1].time
+    })
+  })
+  
+  const { message, transfer } = encodeBatch({ gas, candles, price, isConnected })
+  self.postMessage(message, transfer)
+}
+
+async function start({ source, streamUrl, chainIds, flushMs = DEFAULT_FLUSH_MS }) {
+  const scheduler = new UpdateScheduler(postBatch, { intervalMs: flushMs })
+  service.setCallbacks(scheduler.callbacks())
+  
+  try {
+    // Same order as the UI thread: shared server stream, then direct sockets
+    try {
+      if (source === 'direct') throw new Error('Server gas stream disabled')
+      await service.connectToStream(streamUrl, chainIds)
+    } catch (streamError) {
+      await service.initializeProviders(chainIds)
+    }
+    self.postMessage({ type: 'ready' })
+  } catch (error) {
+    self.postMessage({ type: 'error', message: error.message })
+  }
+}
+
+self.onmessage = ({ data }) => {
+  if (data.type === 'start') {
+    start(data)
+  } else if (data.type === 'setChains') {
+    // Direct sockets, or the server stream reopened for these chains
+    service.setActiveChains(data.chainIds)
+  } else if (data.type === 'stop') {
+    service.disconnect()
+    self.close()
+  }
+}
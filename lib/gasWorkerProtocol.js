@@ -0,0 +1,73 @@
+// Message encoding between the gas worker and the UI thread.
+//
+// History points and candles travel as flat Float64Arrays whose buffers are
+// transferred, not copied. The latest full gas object per chain (which may
+// carry chain-specific fields such as the Arbitrum L1/L2 split) is sent as is.
+// Missing values travel as NaN and come back as null, never as 0.
+
+import { CANDLE_COLUMNS } from './candles.js'
+
+export const POINT_FIELDS = ['timestamp', 'baseFee', 'priorityFee', 'gasPrice', 'lastBlock', 'gasUsedRatio']
+
+function pack(rows, fields) {
+  const data = new Float64Array(rows.length * fields.length)
+  rows.forEach((row, i) => {
+    fields.forEach((field, f) => {
+      data[i * fields.length + f] = row[field] == null ? NaN : Number(row[field])
+    })
+  })
+  return data
+}
+
+function unpack(data, fields) {
+  const rows = new Array(data.length / fields.length)
+  for (let i = 0; i < rows.length; i++) {
+    const row = {}
+    fields.forEach((field, f) => {
+      const value = data[i * fields.length + f]
+      row[field] = Number.isNaN(value) ? null : value
+    })
+    rows[i] = row
+  }
+  return rows
+}
+
+// Worker side: { gas: { chainId: points[] }, candles: { chainId: { interval: candles[] } }, price, isConnected }
+export function encodeBatch({ gas, candles, price, isConnected }) {
+  const message = { type: 'batch', gas: {}, latest: {}, candles: {}, price, isConnected }
+  const transfer = []
+  
+  Object.entries(gas).forEach(([chainId, points]) => {
+    message.gas[chainId] = pack(points, POINT_FIELDS)
+    message.latest[chainId] = points[points.length - 1]
+    transfer.push(message.gas[chainId].buffer)
+  })
+  Object.entries(candles).forEach(([chainId, intervals]) => {
+    message.candles[chainId] = {}
+    Object.entries(intervals).forEach(([interval, list]) => {
+      message.candles[chainId][interval] = pack(list, CANDLE_COLUMNS)
+      transfer.push(message.candles[chainId][interval].buffer)
+    })
+  })
+  return { message, transfer }
+}
+
+// UI side: back to the shape the store's applyBatch expects
+export function decodeBatch(message) {
+  const gas = {}
+  Object.entries(message.gas).forEach(([chainId, data]) => {
+    const points = unpack(data, POINT_FIELDS)
+    points[points.length - 1] = { ...message.latest[chainId], ...points[points.length - 1] }
+    gas[chainId] = points
+  })
+  
+  const candles = {}
+  Object.entries(message.candles).forEach(([chainId, intervals]) => {
+    candles[chainId] = {}
+    Object.entries(intervals).forEach(([interval, data]) => {
+      candles[chainId][interval] = unpack(data, CANDLE_COLUMNS)
+    })
+  })
+  
+  return { gas, candles, price: message.price, isConnected: message.isConnected }
+}
@@ -0,0 +1,286 @@
+import { Web3Service } from './web3.js'
+import { GasHistoryStore } from './timeseries.js'
+import { isMongoConfigured } from './mongo.js'
+import { CandleAggregator } from './candles.js'
+import { toMillis } from './ringBuffer.js'
+import { DEFAULT_VISIBLE_CHAIN_IDS } from './chains.js'
+import { StreamRecorder, StreamReplayer } from './recording.js'
+import { metrics } from './metrics.js'
+import { log } from './log.js'
+
+// Retry delay after the upstream connections fail to come up
+const RESTART_DELAY_MS = 10000
+
+// Where ingested data comes from:
+//   live   - upstream RPC sockets (default)
+//   record - live, plus every callback appended to GAS_RECORD_PATH
+//   replay - GAS_REPLAY_PATH fed through the same callbacks, no RPC at all;
+//            GAS_REPLAY_SPEED=1 real time (default), 0 as fast as possible,
+//            GAS_REPLAY_LOOP=1 to start over at the end
+const SOURCE_MODES = ['live', 'record', 'replay']
+const DEFAULT_RECORD_PATH = 'gas-recording.ndjson.gz'
+
+// Chains ingested server-side (GAS_CHAINS=ethereum,base,...); registry ids
+const INGEST_CHAIN_IDS = process.env.GAS_CHAINS
+  ? process.env.GAS_CHAINS.split(',').map((chainId) => chainId.trim()).filter(Boolean)
+  : DEFAULT_VISIBLE_CHAIN_IDS
+
+// Server-side owner of the upstream RPC connections. One Web3Service instance
+// feeds every connected dashboard, so upstream cost no longer scales with tabs.
+class GasIngestService {
+  constructor() {
+    this.web3 = new Web3Service()
+    this.snapshots = {}
+    this.candles = {}
+    this.ethPrice = 0
+    this.priceStats = null
+    this.isConnected = false
+    this.clients = new Set()
+    // Clients asking for each chain beyond INGEST_CHAIN_IDS
+    this.chainRefs = {}
+    this.startPromise = null
+    this.encoder = new TextEncoder()
+    this.recorder = null
+    this.replayer = null
+    this.priceUpdatedAt = 0
+    
+    this.sourceMode = process.env.GAS_SOURCE_MODE || 'live'
+    if (!SOURCE_MODES.includes(this.sourceMode)) {
+      throw new Error(`Unknown GAS_SOURCE_MODE: ${this.sourceMode}`)
+    }
+    
+    // Persist every point when a database is configured; replayed points
+    // are not new data and stay out of it
+    this.history = isMongoConfigured() && this.sourceMode !== 'replay' ? new GasHistoryStore() : null
+    
+    if (process.env.GAS_INGESTION_MODE) {
+      this.web3.setIngestionMode(process.env.GAS_INGESTION_MODE)
+    }
+    // setL1Sampling merges, so an unset variable keeps its default
+    const l1Sampling = {}
+    if (process.env.ARBITRUM_SAMPLE_EVERY_N_BLOCKS) {
+      l1Sampling.everyNBlocks = Number(process.env.ARBITRUM_SAMPLE_EVERY_N_BLOCKS)
+    }
+    if (process.env.ARBITRUM_L1_REFRESH_MS) {
+      l1Sampling.l1RefreshMs = Number(process.env.ARBITRUM_L1_REFRESH_MS)
+    }
+    this.web3.setL1Sampling(l1Sampling)
+    
+    const callbacks = {
+      onGasUpdate: (chainId, gasData) => {
+        this.snapshots[chainId] = gasData
+        if (metrics) this.observeGasUpdate(chainId, gasData)
+        this.getCandleAggregator(chainId).add(toMillis(gasData.timestamp), gasData.gasPrice / 1e9)
+        this.history?.recordGasPoint(chainId, gasData)
+        this.broadcast('gas', { chainId, gasData })
+      },
+      onPriceUpdate: (price, stats) => {
+        this.ethPrice = price
+        this.priceStats = stats
+        this.priceUpdatedAt = Date.now()
+        metrics?.priceUpdates.inc()
+        this.history?.recordPricePoint(price, stats)
+        this.broadcast('price', { price, stats })
+      },
+      onConnectionChange: (isConnected) => {
+        this.isConnected = isConnected
+        this.broadcast('status', { isConnected })
+      }
+    }
+    
+    if (this.sourceMode === 'record') {
+      this.recorder = new StreamRecorder(process.env.GAS_RECORD_PATH || DEFAULT_RECORD_PATH)
+      this.recorder.closeOnExit()
+      this.web3.setCallbacks(this.recorder.wrap(callbacks))
+    } else {
+      this.web3.setCallbacks(callbacks)
+    }
+    
+    if (metrics) this.registerMetrics()
+  }
+  
+  // Connect upstream once; concurrent callers share the same attempt
+  start() {
+    if (!this.startPromise) {
+      this.history?.start()
+      this.startPromise = this.startSource().catch((error) => {
+        log.error('Gas ingestion failed to start:', error)
+        setTimeout(() => {
+          this.startPromise = null
+        }, RESTART_DELAY_MS)
+        throw error
+      })
+    }
+    return this.startPromise
+  }
+  
+  startSource() {
+    if (this.sourceMode !== 'replay') {
+      return this.web3.initializeProviders(INGEST_CHAIN_IDS)
+    }
+    
+    const path = process.env.GAS_REPLAY_PATH
+    if (!path) return Promise.reject(new Error('GAS_REPLAY_PATH is required in replay mode'))
+    
+    this.replayer = new StreamReplayer(path, {
+      speed: Number(process.env.GAS_REPLAY_SPEED ?? 1),
+      loop: process.env.GAS_REPLAY_LOOP === '1'
+    })
+    log.info(`Replaying ${path}`)
+    return this.replayer.start(this.web3)
+  }
+  
+  observeGasUpdate(chainId, gasData) {
+    const now = Date.now()
+    metrics.storeUpdates.inc([chainId])
+    if (gasData.receivedAt) metrics.blockToStore.observe([chainId], (now - gasData.receivedAt) / 1000)
+    if (gasData.timestamp) metrics.blockAge.observe([chainId], (now - toMillis(gasData.timestamp)) / 1000)
+  }
+  
+  // Scrape-time views of state this service and its connections already keep
+  registerMetrics() {
+    const connectionCounter = (field) => () => Object.entries(this.web3.connections)
+      .map(([chainId, connection]) => ({ labels: [chainId], value: connection.metrics[field] }))
+    
+    metrics.collected('gas_connects_total', 'Upstream sockets opened', ['chain'], 'counter', connectionCounter('connects'))
+    metrics.collected('gas_reconnects_total', 'Reconnect attempts after a lost socket', ['chain'], 'counter', connectionCounter('reconnects'))
+    metrics.collected('gas_connection_failures_total', 'Sockets dropped as failed', ['chain'], 'counter', connectionCounter('failures'))
+    metrics.collected('gas_stale_heads_total', 'Sockets dropped for missing heads', ['chain'], 'counter', connectionCounter('staleHeads'))
+    metrics.collected('gas_hedged_requests_total', 'Reads raced on a standby socket', ['chain'], 'counter', connectionCounter('hedgedRequests'))
+    
+    metrics.collected('gas_price_age_seconds', 'Time since the last ETH/USD update', [], 'gauge', () => (
+      this.priceUpdatedAt ? [{ value: (Date.now() - this.priceUpdatedAt) / 1000 }] : []
+    ))
+    metrics.collected('gas_connected', 'Whether any upstream chain is live', [], 'gauge', () => [
+      { value: this.isConnected ? 1 : 0 }
+    ])
+    metrics.collected('gas_stream_clients', 'Connected SSE clients', [], 'gauge', () => [
+      { value: this.clients.size }
+    ])
+    
+    const cacheCounter = (field) => () => [{ value: this.web3.rpcCache.stats[field] }]
+    metrics.collected('gas_rpc_cache_hits_total', 'Reads served from the RPC cache', [], 'counter', cacheCounter('hits'))
+    metrics.collected('gas_rpc_cache_coalesced_total', 'Reads joined to an in-flight request', [], 'counter', cacheCounter('coalesced'))
+    metrics.collected('gas_rpc_cache_misses_total', 'Reads sent upstream', [], 'counter', cacheCounter('misses'))
+    metrics.collected('gas_rpc_cache_entries', 'Entries held by the RPC cache', [], 'gauge', () => [
+      { value: this.web3.rpcCache.entries.size }
+    ])
+  }
+  
+  // Candles built since this process started, in gwei
+  getCandleAggregator(chainId) {
+    if (!this.candles[chainId]) {
+      this.candles[chainId] = new CandleAggregator()
+    }
+    return this.candles[chainId]
+  }
+  
+  // Candles for [from, to] (ms): stored rollups, overlaid by the live aggregator.
+  // The first in-memory bucket may have started before this process did, so
+  // a stored candle wins for that one bucket.
+  async getCandles(chainId, interval, from, to) {
+    const fromSec = from / 1000
+    const toSec = to / 1000
+    const allLive = this.getCandleAggregator(chainId).getCandles(interval)
+    const firstLiveTime = allLive.length > 0 ? allLive[0].time : null
+    const live = allLive.filter((candle) => candle.time >= fromSec && candle.time <= toSec)
+    
+    const stored = this.history
+      ? await this.history.getCandles(chainId, interval, from, to)
+      : []
+    if (stored.length === 0) return live
+    
+    const byTime = new Map(stored.map((candle) => [candle.time, candle]))
+    live.forEach((candle) => {
+      if (candle.time !== firstLiveTime || !byTime.has(candle.time)) {
+        byTime.set(candle.time, candle)
+      }
+    })
+    return [...byTime.values()].sort((a, b) => a.time - b.time)
+  }
+  
+  // Current state, replayed to every new client before live events
+  getSnapshot() {
+    return {
+      chains: this.snapshots,
+      ethPrice: this.ethPrice,
+      priceStats: this.priceStats,
+      isConnected: this.isConnected
+    }
+  }
+  
+  // Per-chain ingestion counters (heads pushed vs. blocks fetched)
+  getStats() {
+    return {
+      clients: this.clients.size,
+      source: {
+        mode: this.sourceMode,
+        recordedEvents: this.recorder?.count ?? null,
+        replay: this.replayer?.stats ?? null
+      },
+      rpcCache: this.web3.rpcCache.getStats(),
+      chains: this.web3.getStats()
+    }
+  }
+  
+  // Register a client writer; returns an unsubscribe function. Chains the
+  // client asks for that aren't ingested yet are connected until the last
+  // client asking for them leaves (live sources only).
+  subscribe(write, chainIds = []) {
+    const extra = this.sourceMode === 'replay'
+      ? []
+      : [...new Set(chainIds)].filter((chainId) => !INGEST_CHAIN_IDS.includes(chainId))
+    const added = extra.filter((chainId) => !this.chainRefs[chainId])
+    extra.forEach((chainId) => {
+      this.chainRefs[chainId] = (this.chainRefs[chainId] || 0) + 1
+    })
+    if (added.length > 0) {
+      Promise.allSettled(this.web3.connectChains(added))
+    }
+    
+    this.clients.add(write)
+    write(this.encodeEvent('snapshot', this.getSnapshot()))
+    
+    let released = false
+    return () => {
+      this.clients.delete(write)
+      if (released) return
+      released = true
+      extra.forEach((chainId) => {
+        if (--this.chainRefs[chainId] > 0) return
+        delete this.chainRefs[chainId]
+        // The ETH/USD feed lives on Ethereum
+        if (chainId === 'ethereum') return
+        delete this.snapshots[chainId]
+        this.web3.closeChain(chainId)
+      })
+    }
+  }
+  
+  // Serialize once and hand the same bytes to every client
+  broadcast(event, data) {
+    if (this.clients.size === 0) return
+    const frame = this.encodeEvent(event, data)
+    this.clients.forEach((write) => {
+      try {
+        write(frame)
+      } catch (error) {
+        // Client went away between the abort signal and this write
+        this.clients.delete(write)
+      }
+    })
+  }
+  
+  encodeEvent(event, data) {
+    return this.encoder.encode(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`)
+  }
+}
+
+// Keep a single instance across hot reloads in development
+const globalForIngest = globalThis
+
+if (!globalForIngest.gasIngestService) {
+  globalForIngest.gasIngestService = new GasIngestService()
+}
+
+export default globalForIngest.gasIngestService
@@ -0,0 +1,174 @@
+// Block-to-pixel latency tracing for the live chart.
+//
+// Enable with NEXT_PUBLIC_LATENCY_TRACE=1 or localStorage.gasLatencyTrace = '1'
+// and reload. Each gas update carries wall-clock stamps from Web3Service
+// (receivedAt, pricedAt); the store adds committedAt and GasChart adds
+// renderedAt / paintedAt for the chains it draws. Finished traces feed a
+// rolling window per stage, shown by LatencyOverlay and exposed on
+// window.__gasLatency:
+//   __gasLatency.summary()  -> { samples, stages: [{ id, p50, p90, p99, ... }] }
+//   __gasLatency.export()   -> Chrome trace JSON (chrome://tracing, Perfetto)
+//   __gasLatency.reset()
+// When disabled, every trace call is a single boolean check.
+//
+// Stamps are Date.now() so they compare across the worker and the page.
+// Behind the server stream, receivedAt/pricedAt come from the server's clock
+// and the delivery stage includes any skew. Block timestamps are whole
+// seconds, so the network stage is only accurate to about a second.
+
+import { toMillis } from './ringBuffer.js'
+
+const WINDOW_SIZE = 500
+const MAX_TRACES = 2000
+
+export const LATENCY_STAGES = [
+  { id: 'network', label: 'Block → socket', from: 'blockTime', to: 'receivedAt' },
+  { id: 'rpc', label: 'Socket → priced', from: 'receivedAt', to: 'pricedAt' },
+  { id: 'delivery', label: 'Priced → store', from: 'pricedAt', to: 'committedAt' },
+  { id: 'render', label: 'Store → chart update', from: 'committedAt', to: 'renderedAt' },
+  { id: 'paint', label: 'Chart update → paint', from: 'renderedAt', to: 'paintedAt' },
+  { id: 'pipeline', label: 'Socket → pixel', from: 'receivedAt', to: 'paintedAt' },
+  { id: 'total', label: 'Block → pixel', from: 'blockTime', to: 'paintedAt' }
+]
+
+// Stages that follow one another; the totals overlap them
+const SEQUENTIAL_STAGE_IDS = ['network', 'rpc', 'delivery', 'render', 'paint']
+
+const enabled = (() => {
+  if (process.env.NEXT_PUBLIC_LATENCY_TRACE === '1') return true
+  try {
+    return typeof window !== 'undefined' && window.localStorage.getItem('gasLatencyTrace') === '1'
+  } catch (error) {
+    return false
+  }
+})()
+
+export const latencyTraceEnabled = enabled
+
+// Last `size` values in a ring; percentiles sort a copy on demand, which is
+// cheap at overlay refresh rates
+class RollingSamples {
+  constructor(size) {
+    this.values = new Float64Array(size)
+    this.count = 0
+    this.next = 0
+  }
+  
+  push(value) {
+    this.values[this.next] = value
+    this.next = (this.next + 1) % this.values.length
+    if (this.count < this.values.length) this.count++
+  }
+  
+  summary() {
+    if (this.count === 0) return { count: 0, p50: null, p90: null, p99: null, max: null }
+    const sorted = this.values.slice(0, this.count).sort()
+    const at = (p) => sorted[Math.min(this.count - 1, Math.floor((p / 100) * this.count))]
+    return { count: this.count, p50: at(50), p90: at(90), p99: at(99), max: sorted[this.count - 1] }
+  }
+  
+  clear() {
+    this.count = 0
+    this.next = 0
+  }
+}
+
+// Traces waiting for the chart, by chain; a newer commit replaces an older
+// one that was never drawn
+const pending = new Map()
+const windows = Object.fromEntries(LATENCY_STAGES.map(({ id }) => [id, new RollingSamples(WINDOW_SIZE)]))
+let traces = []
+
+// The store committed this point as the chain's current value
+export function traceCommit(chainId, point) {
+  if (!enabled || !point?.receivedAt || !point.pricedAt) return
+  pending.set(chainId, {
+    chainId,
+    block: point.lastBlock,
+    blockTime: toMillis(point.timestamp),
+    receivedAt: point.receivedAt,
+    pricedAt: point.pricedAt,
+    committedAt: Date.now(),
+    renderedAt: null,
+    paintedAt: null
+  })
+}
+
+function finish(record) {
+  if (pending.get(record.chainId) === record) pending.delete(record.chainId)
+  // Hidden tabs get no frames; their paint times say nothing about the pipeline
+  if (typeof document !== 'undefined' && document.hidden) return
+  
+  LATENCY_STAGES.forEach(({ id, from, to }) => {
+    windows[id].push(record[to] - record[from])
+  })
+  traces.push(record)
+  if (traces.length > MAX_TRACES * 1.5) traces = traces.slice(-MAX_TRACES)
+}
+
+// GasChart pushed new bars for these chains. lightweight-charts redraws on
+// an animation frame it queued during those updates, so a frame callback
+// queued now runs right after the bars reach the canvas.
+export function traceChartUpdate(chainIds) {
+  if (!enabled) return
+  const now = Date.now()
+  const records = chainIds
+    .map((chainId) => pending.get(chainId))
+    .filter((record) => record && !record.renderedAt)
+  if (records.length === 0) return
+  
+  records.forEach((record) => { record.renderedAt = now })
+  requestAnimationFrame(() => {
+    const paintedAt = Date.now()
+    records.forEach((record) => {
+      record.paintedAt = paintedAt
+      finish(record)
+    })
+  })
+}
+
+export function getLatencySummary() {
+  return {
+    samples: windows.total.count,
+    stages: LATENCY_STAGES.map(({ id, label }) => ({ id, label, ...windows[id].summary() }))
+  }
+}
+
+// Chrome trace event format: one row per chain, one slice per stage
+export function exportLatencyTrace() {
+  const traceEvents = []
+  const chainIds = [...new Set(traces.map((record) => record.chainId))]
+  chainIds.forEach((chainId, tid) => {
+    traceEvents.push({ name: 'thread_name', ph: 'M', pid: 1, tid, args: { name: chainId } })
+  })
+  
+  traces.slice(-MAX_TRACES).forEach((record) => {
+    const tid = chainIds.indexOf(record.chainId)
+    LATENCY_STAGES
+      .filter(({ id }) => SEQUENTIAL_STAGE_IDS.includes(id))
+      .forEach(({ label, from, to }) => {
+        traceEvents.push({
+          name: label,
+          cat: 'gas',
+          ph: 'X',
+          pid: 1,
+          tid,
+          ts: record[from] * 1000,
+          dur: Math.max(0, record[to] - record[from]) * 1000,
+          args: { block: record.block }
+        })
+      })
+  })
+  
+  return { traceEvents, displayTimeUnit: 'ms', summary: getLatencySummary() }
+}
+
+export function resetLatencyTrace() {
+  pending.clear()
+  Object.values(windows).forEach((samples) => samples.clear())
+  traces = []
+}
+
+if (enabled && typeof window !== 'undefined') {
+  window.__gasLatency = { summary: getLatencySummary, export: exportLatencyTrace, reset: resetLatencyTrace }
+}
@@ -0,0 +1,22 @@
+// Leveled console logging. GAS_LOG_LEVEL on the server, NEXT_PUBLIC_LOG_LEVEL
+// in the browser: debug | info | warn | error | silent (default info).
+// Disabled levels are bound to a no-op once at load, so a filtered call
+// costs one empty function call.
+
+const LEVELS = { debug: 10, info: 20, warn: 30, error: 40, silent: 50 }
+
+const configured = process.env.GAS_LOG_LEVEL || process.env.NEXT_PUBLIC_LOG_LEVEL || 'info'
+const threshold = LEVELS[configured] ?? LEVELS.info
+
+const noop = () => {}
+
+function method(level) {
+  return threshold <= LEVELS[level] ? console[level].bind(console) : noop
+}
+
+export const log = {
+  debug: method('debug'),
+  info: method('info'),
+  warn: method('warn'),
+  error: method('error')
+}
@@ -0,0 +1,180 @@
+// Prometheus metrics for the server-side ingest, served at /api/metrics.
+//
+// Off unless GAS_METRICS=1. When off, `metrics` is null and every call site
+// is guarded with `metrics?.` or `if (metrics)`, so the hot paths pay one
+// null check and never read the clock.
+//
+// Counters and histograms are updated as events happen. Values that already
+// live elsewhere (connection counters, cache stats, price age) are read by
+// collectors at scrape time instead of being mirrored on every update.
+
+const RPC_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+const LAG_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5]
+const AGE_BUCKETS = [0.5, 1, 2, 5, 10, 15, 30, 60, 120, 300]
+
+const now = typeof performance !== 'undefined' ? () => performance.now() : () => Date.now()
+
+function escapeLabel(value) {
+  return String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"')
+}
+
+function formatLabels(names, values, extra = '') {
+  const pairs = names.map((name, i) => `${name}="${escapeLabel(values[i])}"`)
+  if (extra) pairs.push(extra)
+  return pairs.length > 0 ? `{${pairs.join(',')}}` : ''
+}
+
+function formatValue(value) {
+  if (value === Infinity) return '+Inf'
+  return Number.isFinite(value) ? String(value) : 'NaN'
+}
+
+// Series are keyed by their label values, in labelNames order
+class Metric {
+  constructor(name, help, labelNames = []) {
+    this.name = name
+    this.help = help
+    this.labelNames = labelNames
+    this.series = new Map()
+  }
+  
+  seriesFor(labelValues, create) {
+    const key = labelValues.join('\u0000')
+    let series = this.series.get(key)
+    if (!series) {
+      series = create()
+      series.labelValues = labelValues
+      this.series.set(key, series)
+    }
+    return series
+  }
+  
+  header(type) {
+    return [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} ${type}`]
+  }
+}
+
+class Counter extends Metric {
+  inc(labelValues = [], amount = 1) {
+    this.seriesFor(labelValues, () => ({ value: 0 })).value += amount
+  }
+  
+  render() {
+    const lines = this.header('counter')
+    this.series.forEach(({ labelValues, value }) => {
+      lines.push(`${this.name}${formatLabels(this.labelNames, labelValues)} ${formatValue(value)}`)
+    })
+    return lines
+  }
+}
+
+class Histogram extends Metric {
+  constructor(name, help, labelNames, buckets) {
+    super(name, help, labelNames)
+    this.buckets = buckets
+  }
+  
+  observe(labelValues, value) {
+    const series = this.seriesFor(labelValues, () => ({
+      counts: new Float64Array(this.buckets.length),
+      sum: 0,
+      count: 0
+    }))
+    // Non-cumulative per bucket; cumulated when rendered
+    const bucket = this.buckets.findIndex((bound) => value <= bound)
+    if (bucket >= 0) series.counts[bucket]++
+    series.sum += value
+    series.count++
+  }
+  
+  render() {
+    const lines = this.header('histogram')
+    this.series.forEach(({ labelValues, counts, sum, count }) => {
+      let cumulative = 0
+      this.buckets.forEach((bound, i) => {
+        cumulative += counts[i]
+        lines.push(`${this.name}_bucket${formatLabels(this.labelNames, labelValues, `le="${bound}"`)} ${cumulative}`)
+      })
+      lines.push(`${this.name}_bucket${formatLabels(this.labelNames, labelValues, 'le="+Inf"')} ${count}`)
+      lines.push(`${this.name}_sum${formatLabels(this.labelNames, labelValues)} ${formatValue(sum)}`)
+      lines.push(`${this.name}_count${formatLabels(this.labelNames, labelValues)} ${count}`)
+    })
+    return lines
+  }
+}
+
+// Values read at scrape time: collect() returns [{ labels: [...], value }]
+class Collected extends Metric {
+  constructor(name, help, labelNames, type, collect) {
+    super(name, help, labelNames)
+    this.type = type
+    this.collect = collect
+  }
+  
+  render() {
+    const lines = this.header(this.type)
+    this.collect().forEach(({ labels = [], value }) => {
+      lines.push(`${this.name}${formatLabels(this.labelNames, labels)} ${formatValue(value)}`)
+    })
+    return lines
+  }
+}
+
+export class MetricsRegistry {
+  constructor() {
+    this.metrics = []
+    
+    this.rpcRequests = this.counter('gas_rpc_requests_total', 'Upstream JSON-RPC requests (cache misses)', ['chain', 'method', 'outcome'])
+    this.rpcDuration = this.histogram('gas_rpc_request_duration_seconds', 'Upstream JSON-RPC latency', ['chain', 'method'], RPC_BUCKETS)
+    this.blockToStore = this.histogram('gas_block_to_store_seconds', 'From head arrival to the ingest snapshot update', ['chain'], LAG_BUCKETS)
+    this.blockAge = this.histogram('gas_block_age_at_store_seconds', 'Block timestamp to ingest snapshot update', ['chain'], AGE_BUCKETS)
+    this.storeUpdates = this.counter('gas_store_updates_total', 'Gas snapshot updates', ['chain'])
+    this.priceUpdates = this.counter('gas_price_updates_total', 'ETH/USD price updates')
+  }
+  
+  counter(name, help, labelNames) {
+    return this.register(new Counter(name, help, labelNames))
+  }
+  
+  histogram(name, help, labelNames, buckets) {
+    return this.register(new Histogram(name, help, labelNames, buckets))
+  }
+  
+  // type is 'gauge' or 'counter' (for totals kept by someone else)
+  collected(name, help, labelNames, type, collect) {
+    return this.register(new Collected(name, help, labelNames, type, collect))
+  }
+  
+  register(metric) {
+    this.metrics = this.metrics.filter(({ name }) => name !== metric.name)
+    this.metrics.push(metric)
+    return metric
+  }
+  
+  // Time an upstream request without changing its result
+  observeRpc(chainId, method, request) {
+    const started = now()
+    const done = (outcome) => {
+      this.rpcDuration.observe([chainId, method], (now() - started) / 1000)
+      this.rpcRequests.inc([chainId, method, outcome])
+    }
+    request.then(() => done('ok'), () => done('error'))
+    return request
+  }
+  
+  // Prometheus text exposition format
+  render() {
+    return this.metrics.flatMap((metric) => metric.render()).join('\n') + '\n'
+  }
+}
+
+export const metricsEnabled = process.env.GAS_METRICS === '1'
+
+// One registry across hot reloads in development, like the ingest service
+const globalForMetrics = globalThis
+
+if (metricsEnabled && !globalForMetrics.gasMetrics) {
+  globalForMetrics.gasMetrics = new MetricsRegistry()
+}
+
+export const metrics = metricsEnabled ? globalForMetrics.gasMetrics : null
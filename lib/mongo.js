@@ -0,0 +1,34 @@
+import { MongoClient } from 'mongodb'
+
+const DEFAULT_DB_NAME = 'gas_view'
+// Fail fast when the server is down instead of the driver's 30s default
+const SERVER_SELECTION_TIMEOUT_MS = 3000
+
+// Reuse one client across hot reloads and route invocations
+const globalForMongo = globalThis
+
+export function isMongoConfigured() {
+  return Boolean(process.env.MONGO_URL)
+}
+
+export function getMongoClient() {
+  if (!isMongoConfigured()) {
+    throw new Error('MONGO_URL is not configured')
+  }
+  
+  if (!globalForMongo.mongoClientPromise) {
+    globalForMongo.mongoClientPromise = new MongoClient(process.env.MONGO_URL, {
+      serverSelectionTimeoutMS: SERVER_SELECTION_TIMEOUT_MS
+    }).connect().catch((error) => {
+      // Allow the next caller to retry instead of caching the failure
+      globalForMongo.mongoClientPromise = null
+      throw error
+    })
+  }
+  return globalForMongo.mongoClientPromise
+}
+
+export async function getDb() {
+  const client = await getMongoClient()
+  return client.db(process.env.DB_NAME || DEFAULT_DB_NAME)
+}
@@ -0,0 +1,171 @@
+import { ethers } from 'ethers'
+import { sqrtPriceX96ToUsdE6, usdE6ToNumber } from './fixed.js'
+import { log } from './log.js'
+
+// Uniswap V3 USDC/ETH Pool - 0.05% fee tier (token0 = USDC, token1 = WETH)
+export const UNISWAP_V3_POOL = '0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640'
+
+const UNISWAP_V3_POOL_ABI = [
+  'event Swap(address indexed sender, address indexed recipient, int256 amount0, int256 amount1, uint160 sqrtPriceX96, uint128 liquidity, int24 tick)'
+]
+
+const poolInterface = new ethers.Interface(UNISWAP_V3_POOL_ABI)
+const SWAP_TOPIC = poolInterface.getEvent('Swap').topicHash
+const SWAP_FILTER = { address: UNISWAP_V3_POOL, topics: [SWAP_TOPIC] }
+
+const USDC_DECIMALS = 6
+
+// Default rolling window for TWAP/VWAP
+const DEFAULT_WINDOW_MS = 5 * 60 * 1000
+// How far back to look for a swap when seeding the first price
+const DEFAULT_SEED_BLOCKS = 50
+
+// ETH/USD for display, from the exact micro-dollar price
+export function sqrtPriceX96ToEthUsd(sqrtPriceX96) {
+  return usdE6ToNumber(sqrtPriceX96ToUsdE6(sqrtPriceX96))
+}
+
+// Streaming ETH/USD price from Swap log subscriptions. Keeps the latest pool
+// price plus a rolling TWAP and USD-volume-weighted VWAP, all updated in O(1)
+// amortized time per swap. rpc(method, params) serves the seed reads; by
+// default they go straight to the attached provider.
+export class PriceEngine {
+  constructor({ windowMs = DEFAULT_WINDOW_MS, seedBlocks = DEFAULT_SEED_BLOCKS, onPrice, rpc } = {}) {
+    this.windowMs = windowMs
+    this.seedBlocks = seedBlocks
+    this.onPrice = onPrice
+    this.rpc = rpc || ((method, params) => this.provider.send(method, params))
+    this.provider = null
+    this.listener = null
+    
+    this.sqrtPriceX96 = null
+    this.priceE6 = 0n
+    this.price = 0
+    this.lastSwapTime = 0
+    this.lastBlock = 0
+    
+    // Time-weighted accumulator, same idea as the pool's own tickCumulative
+    this.priceCumulative = 0
+    // Window observations: { time, priceCumulative, notional, volume }
+    this.observations = []
+    this.head = 0
+    this.notionalSum = 0
+    this.volumeSum = 0
+  }
+  
+  // Subscribe to the pool's Swap topic on the given provider
+  async attach(provider) {
+    this.detach()
+    this.provider = provider
+    this.listener = (swapLog) => this.handleSwapLog(swapLog)
+    await provider.on(SWAP_FILTER, this.listener)
+    
+    if (!this.sqrtPriceX96) {
+      await this.seed()
+    }
+  }
+  
+  detach() {
+    if (this.provider && this.listener) {
+      this.provider.off(SWAP_FILTER, this.listener)
+    }
+    this.provider = null
+    this.listener = null
+  }
+  
+  // One bounded log query so there is a price before the next swap lands
+  async seed() {
+    try {
+      const currentBlock = Number(await this.rpc('eth_blockNumber', []))
+      const logs = await this.rpc('eth_getLogs', [{
+        ...SWAP_FILTER,
+        fromBlock: ethers.toQuantity(Math.max(0, currentBlock - this.seedBlocks)),
+        toBlock: ethers.toQuantity(currentBlock)
+      }])
+      
+      // Only the most recent swap matters for the spot price
+      if (logs.length > 0 && !this.sqrtPriceX96) {
+        this.handleSwapLog(logs[logs.length - 1])
+      }
+    } catch (error) {
+      log.error('Error seeding ETH price:', error)
+    }
+  }
+  
+  handleSwapLog(swapLog) {
+    try {
+      const { args } = poolInterface.parseLog(swapLog)
+      const volume = Math.abs(Number(args.amount0)) / Math.pow(10, USDC_DECIMALS)
+      this.recordSwap(args.sqrtPriceX96, volume, Date.now(), Number(swapLog.blockNumber))
+    } catch (error) {
+      log.error('Error decoding swap log:', error)
+    }
+  }
+  
+  recordSwap(sqrtPriceX96, volume, time, blockNumber) {
+    this.priceE6 = sqrtPriceX96ToUsdE6(sqrtPriceX96)
+    const price = usdE6ToNumber(this.priceE6)
+    
+    // Close the previous price's interval before switching to the new one
+    if (this.lastSwapTime) {
+      this.priceCumulative += this.price * (time - this.lastSwapTime)
+    }
+    
+    this.sqrtPriceX96 = sqrtPriceX96
+    this.price = price
+    this.lastSwapTime = time
+    this.lastBlock = blockNumber || this.lastBlock
+    
+    this.observations.push({
+      time,
+      priceCumulative: this.priceCumulative,
+      notional: price * volume,
+      volume
+    })
+    this.notionalSum += price * volume
+    this.volumeSum += volume
+    this.evict(time)
+    
+    this.onPrice?.(price, this.getStats(time))
+  }
+  
+  // Drop observations that fell out of the window
+  evict(now) {
+    const cutoff = now - this.windowMs
+    while (this.head < this.observations.length - 1 && this.observations[this.head].time < cutoff) {
+      const expired = this.observations[this.head]
+      this.notionalSum -= expired.notional
+      this.volumeSum -= expired.volume
+      this.head++
+    }
+    
+    // Compact occasionally so the array does not grow without bound
+    if (this.head > 1024 && this.head * 2 > this.observations.length) {
+      this.observations = this.observations.slice(this.head)
+      this.head = 0
+    }
+  }
+  
+  getTwap(now = Date.now()) {
+    const oldest = this.observations[this.head]
+    if (!oldest) return this.price
+    
+    const cumulativeNow = this.priceCumulative + this.price * (now - this.lastSwapTime)
+    const elapsed = now - oldest.time
+    return elapsed > 0 ? (cumulativeNow - oldest.priceCumulative) / elapsed : this.price
+  }
+  
+  getVwap() {
+    return this.volumeSum > 0 ? this.notionalSum / this.volumeSum : this.price
+  }
+  
+  getStats(now = Date.now()) {
+    return {
+      twap: this.getTwap(now),
+      vwap: this.getVwap(),
+      windowMs: this.windowMs,
+      swaps: this.observations.length - this.head,
+      lastBlock: this.lastBlock
+    }
+  }
+}
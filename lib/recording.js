@@ -0,0 +1,205 @@
+// Record and replay of the Web3Service callback stream (server only).
+//
+// A recording is NDJSON, gzipped when the path ends in .gz. Each line is one
+// callback with its offset in ms from the start of the recording:
+//   {"t":0,"k":"s","v":true}                          onConnectionChange
+//   {"t":412,"k":"g","c":"ethereum","d":{...gasData}}  onGasUpdate
+//   {"t":530,"k":"p","v":3456.78,"s":{...stats}}       onPriceUpdate
+//
+// Replays go through the same callbacks, so everything downstream (SSE fan
+// out, candles, the UI store) sees exactly what it saw live. Raw RPC traffic
+// (headers and logs) can be replayed one layer lower with chain_simulator.py.
+
+import fs from 'fs'
+import readline from 'readline'
+import zlib from 'zlib'
+import { log } from './log.js'
+
+// At max speed, yield to the event loop every this many events
+const MAX_SPEED_CHUNK = 500
+// Push buffered gzip output to disk this often, so a killed process loses
+// at most this much of the recording
+const RECORDER_FLUSH_MS = 1000
+
+export class StreamRecorder {
+  constructor(path) {
+    this.path = path
+    this.startedAt = Date.now()
+    this.count = 0
+    
+    const file = fs.createWriteStream(path)
+    if (path.endsWith('.gz')) {
+      this.stream = zlib.createGzip()
+      this.stream.pipe(file)
+      this.flushTimer = setInterval(() => this.stream.flush(), RECORDER_FLUSH_MS)
+      this.flushTimer.unref?.()
+    } else {
+      this.stream = file
+    }
+    this.closed = null
+  }
+  
+  write(record) {
+    record.t = Date.now() - this.startedAt
+    this.stream.write(JSON.stringify(record) + '\n')
+    this.count++
+  }
+  
+  // Callbacks that record every event before passing it on
+  wrap(callbacks) {
+    return {
+      onGasUpdate: (chainId, gasData) => {
+        this.write({ k: 'g', c: chainId, d: gasData })
+        callbacks.onGasUpdate?.(chainId, gasData)
+      },
+      onPriceUpdate: (price, stats) => {
+        this.write({ k: 'p', v: price, s: stats })
+        callbacks.onPriceUpdate?.(price, stats)
+      },
+      onConnectionChange: (isConnected) => {
+        this.write({ k: 's', v: isConnected })
+        callbacks.onConnectionChange?.(isConnected)
+      }
+    }
+  }
+  
+  // Finish the file (writes the gzip trailer); safe to call more than once
+  close() {
+    if (!this.closed) {
+      clearInterval(this.flushTimer)
+      this.closed = new Promise((resolve) => this.stream.end(resolve))
+    }
+    return this.closed
+  }
+  
+  // Close the file before the process exits on SIGINT/SIGTERM, then let the
+  // signal take its normal course
+  closeOnExit() {
+    const onSignal = (signal) => {
+      this.close().finally(() => process.kill(process.pid, signal))
+    }
+    process.once('SIGINT', onSignal)
+    process.once('SIGTERM', onSignal)
+  }
+}
+
+// Records of a recording, oldest first. A recording cut off by a crash (no
+// gzip trailer, half-written last line) yields everything before the cut.
+export async function* readRecording(path) {
+  let input = fs.createReadStream(path)
+  if (path.endsWith('.gz')) {
+    // Sync flush at the end of input instead of failing on a missing trailer
+    input = input.pipe(zlib.createGunzip({ finishFlush: zlib.constants.Z_SYNC_FLUSH }))
+  }
+  
+  const lines = readline.createInterface({ input, crlfDelay: Infinity })
+  for await (const line of lines) {
+    if (!line.trim()) continue
+    try {
+      yield JSON.parse(line)
+    } catch (error) {
+      log.warn(`Skipping truncated record in ${path}`)
+    }
+  }
+}
+
+// Feeds a recording into a Web3Service's callbacks.
+//
+// speed: 1 plays in real time, 10 ten times faster, 0 as fast as possible.
+// rebase: shift block timestamps so the recording plays as if it were now,
+//   with gaps divided by speed so they keep pace with the clock.
+// loop: start over at the end; block numbers and rebased timestamps keep
+//   increasing across loops, so candles stay ordered.
+export class StreamReplayer {
+  constructor(path, { speed = 1, rebase = true, loop = false } = {}) {
+    this.path = path
+    this.speed = speed
+    this.rebase = rebase
+    this.loop = loop
+    this.stopped = false
+    this.stats = { events: 0, loops: 0, startedAt: 0, finishedAt: 0 }
+  }
+  
+  wait(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms))
+  }
+  
+  // Resolves once the first event has been delivered (or the recording
+  // turns out to be empty); the rest plays in the background
+  start(service) {
+    this.stats.startedAt = Date.now()
+    return new Promise((resolve, reject) => {
+      this.done = this.play(service, resolve).then(resolve, (error) => {
+        log.error('Replay failed:', error)
+        reject(error)
+      })
+    })
+  }
+  
+  async play(service, onFirstEvent) {
+    // Per-chain block number shift, so looped blocks keep increasing
+    const blockOffsets = {}
+    // Last rebased timestamp (seconds) per chain, and overall
+    const lastTimestamps = {}
+    let lastTimestamp = Math.floor(Date.now() / 1000) - 1
+    const timeScale = this.speed > 0 ? 1 / this.speed : 1
+    
+    do {
+      const startedAt = Date.now()
+      const lastBlocks = {}
+      // Each loop continues one second after the last timestamp emitted
+      const loopBase = lastTimestamp + 1
+      let firstTimestamp = null
+      let sinceYield = 0
+      
+      for await (const record of readRecording(this.path)) {
+        if (this.stopped) return
+        
+        if (this.speed > 0) {
+          const delay = startedAt + record.t / this.speed - Date.now()
+          if (delay > 0) await this.wait(delay)
+        } else if (++sinceYield >= MAX_SPEED_CHUNK) {
+          sinceYield = 0
+          await new Promise((resolve) => setImmediate(resolve))
+        }
+        if (this.stopped) return
+        
+        if (record.k === 'g') {
+          const gasData = {
+            ...record.d,
+            lastBlock: record.d.lastBlock + (blockOffsets[record.c] || 0),
+            receivedAt: Date.now(),
+            pricedAt: Date.now()
+          }
+          if (this.rebase) {
+            // Block timestamps are in seconds
+            if (firstTimestamp === null) firstTimestamp = record.d.timestamp
+            const rebased = loopBase + Math.floor((record.d.timestamp - firstTimestamp) * timeScale)
+            gasData.timestamp = Math.max(rebased, lastTimestamps[record.c] || 0)
+            lastTimestamps[record.c] = gasData.timestamp
+            lastTimestamp = Math.max(lastTimestamp, gasData.timestamp)
+          }
+          lastBlocks[record.c] = Math.max(lastBlocks[record.c] || 0, gasData.lastBlock)
+          service.callbacks.onGasUpdate?.(record.c, gasData)
+        } else if (record.k === 'p') {
+          service.callbacks.onPriceUpdate?.(record.v, record.s)
+        } else if (record.k === 's') {
+          service.callbacks.onConnectionChange?.(record.v)
+        }
+        this.stats.events++
+        onFirstEvent()
+      }
+      
+      Object.entries(lastBlocks).forEach(([chainId, lastBlock]) => {
+        blockOffsets[chainId] = lastBlock
+      })
+      this.stats.loops++
+    } while (this.loop && !this.stopped)
+    
+    this.stats.finishedAt = Date.now()
+  }
+  
+  stop() {
+    this.stopped = true
+  }
+}
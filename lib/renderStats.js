@@ -0,0 +1,40 @@
+// Render-count instrumentation for finding components that re-render on
+// unrelated store updates.
+//
+// Enable with NEXT_PUBLIC_RENDER_STATS=1 or localStorage.gasRenderStats = '1'
+// and reload. Counts are exposed on window.__gasRenderStats:
+//   __gasRenderStats.counts()  -> { GasChart: 12, 'ChainCard:ethereum': 12, ... }
+//   __gasRenderStats.reset()
+// When disabled, countRender is a single boolean check.
+
+const counts = new Map()
+
+const enabled = (() => {
+  if (process.env.NEXT_PUBLIC_RENDER_STATS === '1') return true
+  try {
+    return typeof window !== 'undefined' && window.localStorage.getItem('gasRenderStats') === '1'
+  } catch (error) {
+    return false
+  }
+})()
+
+export const renderStatsEnabled = enabled
+
+// Call from a component body; React StrictMode double-invokes renders in
+// development, so absolute counts there are doubled
+export function countRender(name) {
+  if (!enabled) return
+  counts.set(name, (counts.get(name) || 0) + 1)
+}
+
+export function getRenderCounts() {
+  return Object.fromEntries(counts)
+}
+
+export function resetRenderCounts() {
+  counts.clear()
+}
+
+if (enabled && typeof window !== 'undefined') {
+  window.__gasRenderStats = { counts: getRenderCounts, reset: resetRenderCounts }
+}
@@ -0,0 +1,98 @@
+// Fixed-capacity gas history backed by Float64Array columns.
+//
+// Appends are O(1) and allocation-free: once full, the oldest point is
+// overwritten in place. Index 0 is always the oldest retained point.
+// `version` increments on every write so subscribers can detect changes
+// without comparing contents.
+
+export const DEFAULT_HISTORY_CAPACITY = 20000
+
+export class GasHistoryBuffer {
+  constructor(capacity = DEFAULT_HISTORY_CAPACITY) {
+    this.capacity = capacity
+    this.timestamp = new Float64Array(capacity) // ms since epoch
+    this.baseFee = new Float64Array(capacity)
+    this.priorityFee = new Float64Array(capacity)
+    this.gasPrice = new Float64Array(capacity)
+    this.start = 0
+    this.length = 0
+    this.version = 0
+  }
+  
+  push(timestamp, baseFee, priorityFee, gasPrice) {
+    let slot
+    if (this.length < this.capacity) {
+      slot = (this.start + this.length) % this.capacity
+      this.length++
+    } else {
+      // Full: overwrite the oldest point and advance the start
+      slot = this.start
+      this.start = (this.start + 1) % this.capacity
+    }
+    
+    this.timestamp[slot] = timestamp
+    this.baseFee[slot] = baseFee
+    this.priorityFee[slot] = priorityFee
+    this.gasPrice[slot] = gasPrice
+    this.version++
+    return slot
+  }
+  
+  // Physical slot of the i-th oldest point
+  slot(i) {
+    return (this.start + i) % this.capacity
+  }
+  
+  timestampAt(i) {
+    return this.timestamp[this.slot(i)]
+  }
+  
+  gasPriceAt(i) {
+    return this.gasPrice[this.slot(i)]
+  }
+  
+  // Point object for the i-th oldest entry (allocates; not for hot paths)
+  get(i) {
+    if (i < 0 || i >= this.length) return undefined
+    const slot = this.slot(i)
+    return {
+      timestamp: this.timestamp[slot],
+      baseFee: this.baseFee[slot],
+      priorityFee: this.priorityFee[slot],
+      gasPrice: this.gasPrice[slot]
+    }
+  }
+  
+  last() {
+    return this.get(this.length - 1)
+  }
+  
+  // Visit points oldest-first without allocating point objects
+  forEach(fn) {
+    for (let i = 0; i < this.length; i++) {
+      const slot = this.slot(i)
+      fn(this.timestamp[slot], this.baseFee[slot], this.priorityFee[slot], this.gasPrice[slot], i)
+    }
+  }
+  
+  toArray() {
+    const points = new Array(this.length)
+    for (let i = 0; i < this.length; i++) {
+      points[i] = this.get(i)
+    }
+    return points
+  }
+  
+  clear() {
+    this.start = 0
+    this.length = 0
+    this.version++
+  }
+}
+
+// Block timestamps arrive in seconds, local fallbacks in milliseconds
+export function toMillis(timestamp) {
+  if (timestamp == null) return Date.now()
+  const value = typeof timestamp === 'number' ? timestamp : Date.parse(timestamp)
+  return value < 1e12 ? value * 1000 : value
+}
@@ -0,0 +1,204 @@
+// Read-through cache for JSON-RPC reads, shared by every Web3Service in the
+// process (the browser service, or the server ingest behind the API routes).
+//
+// Entries are keyed by (chain, method, params); the block tag is part of the
+// params. Concurrent reads of the same key share one upstream request, and
+// failed requests are never cached.
+//
+// How long a result stays valid depends on what it is pinned to:
+// - a block hash (or 'earliest'): it cannot change, so it stays until evicted
+// - a block number more than reorgDepth blocks below the chain's head: the
+//   same, since a reorg that deep is not expected
+// - a block number near (or above) the head, or on a chain with no head
+//   yet: a reorg can swap the block under it, so it lives like 'latest'
+// - 'latest' (or no tag, or a head-only method like eth_gasPrice): until the
+//   chain's next head, or headTtlMs if heads stop arriving
+// Methods not listed below are passed through uncached.
+//
+// Eviction is least-recently-used over a Map (insertion order = recency), so
+// reads, writes and evictions are all O(1).
+
+const DEFAULT_MAX_ENTRIES = 2000
+const DEFAULT_HEAD_TTL_MS = 15000
+const DEFAULT_REORG_DEPTH = 12
+
+// Index of the block tag in each method's params
+const BLOCK_TAG_PARAM = {
+  eth_call: 1,
+  eth_estimateGas: 1,
+  eth_feeHistory: 1,
+  eth_getBalance: 1,
+  eth_getBlockByNumber: 0,
+  eth_getCode: 1,
+  eth_getStorageAt: 2,
+  eth_getTransactionCount: 1
+}
+
+// Results that only change with the head
+const HEAD_METHODS = new Set(['eth_blockNumber', 'eth_gasPrice', 'eth_maxPriorityFeePerGas'])
+
+// Results addressed by hash, which never change once they exist
+const PINNED_METHODS = new Set([
+  'eth_chainId',
+  'eth_getBlockByHash',
+  'eth_getTransactionByHash',
+  'eth_getTransactionReceipt'
+])
+
+const PINNED = 'pinned'
+const HEAD = 'head'
+// Pinned to a block number; PINNED once that block is deep enough
+const NUMBER = 'number'
+
+function isNumberTag(tag) {
+  return typeof tag === 'string' && tag.startsWith('0x')
+}
+
+// PINNED, NUMBER, HEAD, or null when the method should not be cached
+export function cacheScope(method, params = []) {
+  if (PINNED_METHODS.has(method)) return PINNED
+  if (HEAD_METHODS.has(method)) return HEAD
+  
+  if (method === 'eth_getLogs') {
+    const filter = params[0] || {}
+    if (filter.blockHash) return PINNED
+    return isNumberTag(filter.toBlock) && isNumberTag(filter.fromBlock) ? NUMBER : HEAD
+  }
+  
+  if (method in BLOCK_TAG_PARAM) {
+    const tag = params[BLOCK_TAG_PARAM[method]]
+    if (tag === 'earliest') return PINNED
+    return isNumberTag(tag) ? NUMBER : HEAD
+  }
+  return null
+}
+
+// Highest block number a NUMBER-scoped read depends on
+function pinnedBlockNumber(method, params) {
+  const tag = method === 'eth_getLogs' ? params[0].toBlock : params[BLOCK_TAG_PARAM[method]]
+  return parseInt(tag, 16)
+}
+
+export class RpcCache {
+  constructor({
+    maxEntries = DEFAULT_MAX_ENTRIES,
+    headTtlMs = DEFAULT_HEAD_TTL_MS,
+    reorgDepth = DEFAULT_REORG_DEPTH
+  } = {}) {
+    this.maxEntries = maxEntries
+    this.headTtlMs = headTtlMs
+    this.reorgDepth = reorgDepth
+    this.entries = new Map()
+    // Bumped on every new head; head-scoped entries from older heads are stale
+    this.heads = {}
+    this.stats = { hits: 0, misses: 0, coalesced: 0, evictions: 0, uncached: 0, errors: 0 }
+  }
+  
+  // A new head on chainId: every 'latest' read on it becomes stale. Entries
+  // are dropped lazily when next read or evicted.
+  noteHead(chainId, blockNumber) {
+    const head = this.heads[chainId]
+    if (head && blockNumber <= head.number) return
+    this.heads[chainId] = { number: blockNumber, generation: (head?.generation || 0) + 1 }
+  }
+  
+  generation(chainId) {
+    return this.heads[chainId]?.generation || 0
+  }
+  
+  // NUMBER reads become PINNED once their block is reorgDepth below the head
+  resolveScope(scope, chainId, method, params) {
+    if (scope !== NUMBER) return scope
+    const head = this.heads[chainId]
+    if (!head) return HEAD
+    return pinnedBlockNumber(method, params) <= head.number - this.reorgDepth ? PINNED : HEAD
+  }
+  
+  isFresh(entry, chainId) {
+    if (entry.scope === PINNED) return true
+    return entry.generation === this.generation(chainId) && Date.now() < entry.expiresAt
+  }
+  
+  // Result of fetch() for this read, from the cache when possible. fetch is
+  // called synchronously on a miss, so reads issued in the same tick still
+  // land in the same JSON-RPC batch.
+  read(chainId, method, params, fetch) {
+    const scope = this.resolveScope(cacheScope(method, params), chainId, method, params)
+    if (!scope) {
+      this.stats.uncached++
+      return fetch()
+    }
+    
+    const key = `${chainId}|${method}|${JSON.stringify(params)}`
+    const cached = this.entries.get(key)
+    if (cached && this.isFresh(cached, chainId)) {
+      // Move to the most recent end
+      this.entries.delete(key)
+      this.entries.set(key, cached)
+      if (cached.settled) {
+        this.stats.hits++
+      } else {
+        this.stats.coalesced++
+      }
+      return cached.promise
+    }
+    
+    this.stats.misses++
+    const entry = {
+      scope,
+      generation: this.generation(chainId),
+      expiresAt: Date.now() + this.headTtlMs,
+      settled: false,
+      promise: null
+    }
+    let pending
+    try {
+      pending = Promise.resolve(fetch())
+    } catch (error) {
+      pending = Promise.reject(error)
+    }
+    entry.promise = pending.then((result) => {
+      entry.settled = true
+      // A block or receipt that doesn't exist yet will exist later
+      if (result == null && scope === PINNED) this.drop(key, entry)
+      return result
+    }, (error) => {
+      this.stats.errors++
+      this.drop(key, entry)
+      throw error
+    })
+    
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+    if (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value)
+      this.stats.evictions++
+    }
+    return entry.promise
+  }
+  
+  drop(key, entry) {
+    if (this.entries.get(key) === entry) this.entries.delete(key)
+  }
+  
+  // Forget a chain, e.g. when its socket is closed
+  clearChain(chainId) {
+    const prefix = `${chainId}|`
+    for (const key of this.entries.keys()) {
+      if (key.startsWith(prefix)) this.entries.delete(key)
+    }
+    delete this.heads[chainId]
+  }
+  
+  getStats() {
+    const lookups = this.stats.hits + this.stats.coalesced + this.stats.misses
+    return {
+      ...this.stats,
+      entries: this.entries.size,
+      hitRate: lookups > 0 ? (this.stats.hits + this.stats.coalesced) / lookups : 0
+    }
+  }
+}
+
+// One cache per JS context: the browser tab, or the server process
+export const sharedRpcCache = new RpcCache()
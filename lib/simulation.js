@@ -0,0 +1,165 @@
+// Batch transaction-cost simulation across chains.
+//
+// A scenario matrix (chains x gas profiles x priority tiers x amounts) is
+// evaluated in one pass over flat Float64Arrays instead of one gasCostUSD
+// call per scenario. Float64 keeps ~15 significant digits, which is plenty
+// for ranking and display.
+//
+// Rollups (feeModel 'arbitrum' / 'opStack') add a per-transaction L1 data
+// cost. Chains report it for a plain transfer (l1GasCost, wei); it is scaled
+// by each profile's calldata size relative to a transfer.
+
+import { getChain } from './chains.js'
+import { FEE_TIERS } from './feeEstimator.js'
+
+const WEI_PER_ETH = 1e18
+const TRANSFER_CALLDATA_BYTES = 112
+
+// Typical gas limits and signed calldata sizes
+export const GAS_PROFILES = {
+  transfer: { label: 'ETH transfer', gasLimit: 21000, calldataBytes: 112 },
+  erc20Transfer: { label: 'ERC-20 transfer', gasLimit: 65000, calldataBytes: 180 },
+  swap: { label: 'DEX swap', gasLimit: 180000, calldataBytes: 420 },
+  nftMint: { label: 'NFT mint', gasLimit: 120000, calldataBytes: 200 },
+  deploy: { label: 'Contract deployment', gasLimit: 1500000, calldataBytes: 12000 }
+}
+
+export const DEFAULT_PROFILE_IDS = Object.keys(GAS_PROFILES)
+
+// Profile ids or { id, gasLimit, calldataBytes } objects -> profile objects
+function resolveProfiles(profiles) {
+  return profiles.map((profile) => {
+    if (typeof profile === 'string') {
+      if (!GAS_PROFILES[profile]) throw new Error(`Unknown gas profile: ${profile}`)
+      return { id: profile, ...GAS_PROFILES[profile] }
+    }
+    if (!(profile.gasLimit > 0)) throw new Error(`Invalid gas limit for profile ${profile.id}`)
+    return {
+      calldataBytes: TRANSFER_CALLDATA_BYTES,
+      label: profile.id,
+      ...profile
+    }
+  })
+}
+
+// Evaluate every scenario in one pass.
+//
+// chains:   [{ id, baseFee, priorityFee, priorityFees?, l1GasCost? }] (wei)
+// usdPrice: ETH price in USD; registry chains whose gas token has no USD
+//           feed are left out
+// amounts:  transfer values in ETH, added to each total
+//
+// Returns the axes plus two flat arrays:
+//   gasCostUSD[(c * P + p) * T + t]
+//   totalCostUSD[((c * P + p) * T + t) * A + a]
+export function simulateScenarios({
+  chains,
+  usdPrice,
+  profiles = DEFAULT_PROFILE_IDS,
+  tiers = FEE_TIERS,
+  amounts = [0]
+}) {
+  const started = typeof performance !== 'undefined' ? performance.now() : Date.now()
+  chains = chains.filter((chain) => getChain(chain.id)?.priceFeed !== null)
+  const resolved = resolveProfiles(profiles)
+  const C = chains.length
+  const P = resolved.length
+  const T = tiers.length
+  const A = amounts.length
+  
+  // Inputs as columns
+  const perGasWei = new Float64Array(C * T)
+  const l1Wei = new Float64Array(C)
+  const gasLimits = Float64Array.from(resolved, (profile) => profile.gasLimit)
+  const l1Scales = Float64Array.from(resolved, (profile) => profile.calldataBytes / TRANSFER_CALLDATA_BYTES)
+  const amountUSD = Float64Array.from(amounts, (amount) => amount * usdPrice)
+  
+  chains.forEach((chain, c) => {
+    const baseFee = Number(chain.baseFee || 0)
+    tiers.forEach((tier, t) => {
+      perGasWei[c * T + t] = baseFee + Number(chain.priorityFees?.[tier] ?? chain.priorityFee ?? 0)
+    })
+    l1Wei[c] = Number(chain.l1GasCost || 0)
+  })
+  
+  const usdPerWei = usdPrice / WEI_PER_ETH
+  const gasCostUSD = new Float64Array(C * P * T)
+  const totalCostUSD = new Float64Array(C * P * T * A)
+  
+  for (let c = 0; c < C; c++) {
+    const l1 = l1Wei[c]
+    for (let p = 0; p < P; p++) {
+      const gasLimit = gasLimits[p]
+      const l1Cost = l1 * l1Scales[p]
+      for (let t = 0; t < T; t++) {
+        const row = (c * P + p) * T + t
+        const gasUSD = (perGasWei[c * T + t] * gasLimit + l1Cost) * usdPerWei
+        gasCostUSD[row] = gasUSD
+        
+        const offset = row * A
+        for (let a = 0; a < A; a++) {
+          totalCostUSD[offset + a] = gasUSD + amountUSD[a]
+        }
+      }
+    }
+  }
+  
+  const finished = typeof performance !== 'undefined' ? performance.now() : Date.now()
+  return {
+    chainIds: chains.map((chain) => chain.id),
+    profiles: resolved,
+    tiers,
+    amounts,
+    usdPrice,
+    gasCostUSD,
+    totalCostUSD,
+    scenarioCount: C * P * T * A,
+    elapsedMs: finished - started
+  }
+}
+
+// Cheapest-first chain ranking for every (profile, tier) pair. The transfer
+// amount adds the same value on every chain, so it never changes the order;
+// totals are reported for the first amount.
+export function rankScenarios(result) {
+  const { chainIds, profiles, tiers, amounts, gasCostUSD, totalCostUSD } = result
+  const P = profiles.length
+  const T = tiers.length
+  const A = amounts.length
+  const order = chainIds.map((_, c) => c)
+  const table = []
+  
+  profiles.forEach((profile, p) => {
+    tiers.forEach((tier, t) => {
+      const rowOf = (c) => (c * P + p) * T + t
+      const ranking = [...order]
+        .sort((a, b) => gasCostUSD[rowOf(a)] - gasCostUSD[rowOf(b)])
+        .map((c) => ({
+          chainId: chainIds[c],
+          gasCostUSD: gasCostUSD[rowOf(c)],
+          totalCostUSD: A > 0 ? totalCostUSD[rowOf(c) * A] : gasCostUSD[rowOf(c)]
+        }))
+      
+      table.push({
+        profile: profile.id,
+        label: profile.label,
+        gasLimit: profile.gasLimit,
+        tier,
+        cheapest: ranking[0]?.chainId ?? null,
+        ranking
+      })
+    })
+  })
+  return table
+}
+
+// How often each chain is cheapest across the table, most wins first
+export function cheapestChainCounts(table) {
+  const wins = {}
+  table.forEach(({ cheapest }) => {
+    if (cheapest) wins[cheapest] = (wins[cheapest] || 0) + 1
+  })
+  return Object.entries(wins)
+    .map(([chainId, count]) => ({ chainId, count }))
+    .sort((a, b) => b.count - a.count)
+}
@@ -0,0 +1,85 @@
+// Last-known dashboard state in localStorage, so a reload paints real
+// numbers before any RPC connection or server stream is up.
+
+const STORAGE_KEY = 'gasView.snapshot'
+const SNAPSHOT_VERSION = 1
+
+// Older snapshots are too stale to show as current prices
+const MAX_AGE_MS = 24 * 60 * 60 * 1000
+const DEFAULT_SAVE_INTERVAL_MS = 5000
+
+const CHAIN_FIELDS = ['baseFee', 'priorityFee', 'gasPrice', 'lastBlock', 'timestamp']
+
+function storage() {
+  try {
+    return typeof window === 'undefined' ? null : window.localStorage
+  } catch (error) {
+    // Storage disabled (private mode, sandboxed iframe)
+    return null
+  }
+}
+
+export function loadSnapshot() {
+  try {
+    const raw = storage()?.getItem(STORAGE_KEY)
+    if (!raw) return null
+    
+    const snapshot = JSON.parse(raw)
+    if (snapshot.version !== SNAPSHOT_VERSION) return null
+    if (Date.now() - snapshot.savedAt > MAX_AGE_MS) return null
+    return snapshot
+  } catch (error) {
+    return null
+  }
+}
+
+// Current fields of every chain that has seen a block, plus page state
+export function toSnapshot(state, extra = {}) {
+  const chains = {}
+  Object.entries(state.chains).forEach(([chainId, chain]) => {
+    if (!chain.lastBlock) return
+    chains[chainId] = {}
+    CHAIN_FIELDS.forEach((field) => { chains[chainId][field] = chain[field] })
+  })
+  
+  return {
+    version: SNAPSHOT_VERSION,
+    savedAt: Date.now(),
+    chains,
+    usdPrice: state.usdPrice,
+    priceStats: state.priceStats,
+    visibleChainIds: state.visibleChainIds,
+    ...extra
+  }
+}
+
+export function saveSnapshot(state, extra) {
+  try {
+    storage()?.setItem(STORAGE_KEY, JSON.stringify(toSnapshot(state, extra)))
+  } catch (error) {
+    // Quota exceeded or storage disabled; the cache is best-effort
+  }
+}
+
+// Save the store at most once per intervalMs while it changes, and once more
+// when the page is hidden. getExtra() adds page-local state. Returns a
+// function that stops persisting.
+export function persistSnapshots(store, { getExtra = () => ({}), intervalMs = DEFAULT_SAVE_INTERVAL_MS } = {}) {
+  let timer = null
+  
+  const save = () => {
+    timer = null
+    saveSnapshot(store.getState(), getExtra())
+  }
+  
+  const unsubscribe = store.subscribe(() => {
+    if (!timer) timer = setTimeout(save, intervalMs)
+  })
+  window.addEventListener('pagehide', save)
+  
+  return () => {
+    unsubscribe()
+    clearTimeout(timer)
+    window.removeEventListener('pagehide', save)
+  }
+}
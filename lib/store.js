@@ -1,60 +1,95 @@
 import { create } from 'zustand'
+import { useShallow } from 'zustand/react/shallow'
+import { gasCostUSD } from './fixed.js'
+import { GasHistoryBuffer, toMillis } from './ringBuffer.js'
+import { CandleAggregator } from './candles.js'
+import { DEFAULT_VISIBLE_CHAIN_IDS, gasTokenUsdPrice, getChain } from './chains.js'
+import { simulateScenarios } from './simulation.js'
+import { GasForecaster } from './forecast.js'
+import { traceCommit } from './latencyTrace.js'
+
+// Store slice for a registry chain. Slices (and their history buffers) are
+// created on first use, so chains that are never shown cost nothing.
+export function createChainState(chainId) {
+  const { name, symbol, color, decimals, eip1559 } = getChain(chainId)
+  return {
+    name,
+    symbol,
+    baseFee: 0,
+    priorityFee: 0,
+    gasPrice: 0,
+    lastBlock: 0,
+    history: new GasHistoryBuffer(),
+    historyVersion: 0,
+    candles: new CandleAggregator(), // gwei OHLC at 1m/5m/15m/1h
+    forecaster: new GasForecaster({ eip1559 }), // streaming stats, O(1) per block
+    forecast: null,
+    color,
+    decimals
+  }
+}
+
+// Tip for the chosen tier; chains without fee history use their single
+// priorityFee
+export const tierPriorityFee = (chain, feeTier) => chain.priorityFees?.[feeTier] ?? chain.priorityFee
+
+// USD cost of a transfer on a chain at the tier's tip, plus a rollup's L1
+// data fee; null when the chain's gas token has no USD feed
+export function transferCostUSD(chainId, chain, feeTier, ethPrice) {
+  const usdPrice = gasTokenUsdPrice(chainId, ethPrice)
+  if (usdPrice === null) return null
+  return gasCostUSD(chain.baseFee, tierPriorityFee(chain, feeTier), usdPrice, { l1GasCost: chain.l1GasCost || 0 })
+}
+
+const chainSlice = (state, chainId) => state.chains[chainId] || (getChain(chainId) ? createChainState(chainId) : null)
 
 export const useGasStore = create((set, get) => ({
   // State
   mode: 'live', // 'live' | 'simulation'
   usdPrice: 0,
+  priceStats: null, // { twap, vwap, windowMs } from the streaming price engine
   simulationAmount: 0.1,
+  feeTier: 'standard', // 'slow' | 'standard' | 'fast', priced in the simulator
   isConnected: false,
   lastUpdateTime: null,
   
-  // Chain data
-  chains: {
-    ethereum: {
-      name: 'Ethereum',
-      symbol: 'ETH',
-      baseFee: 0,
-      priorityFee: 0,
-      gasPrice: 0,
-      lastBlock: 0,
-      history: [],
-      rpcUrl: 'wss://ethereum-rpc.publicnode.com',
-      color: '#627EEA',
-      decimals: 18
-    },
-    polygon: {
-      name: 'Polygon',
-      symbol: 'MATIC',
-      baseFee: 0,
-      priorityFee: 0,
-      gasPrice: 0,
-      lastBlock: 0,
-      history: [],
-      rpcUrl: 'wss://polygon-bor-rpc.publicnode.com',
-      color: '#8247E5',
-      decimals: 18
-    },
-    arbitrum: {
-      name: 'Arbitrum',
-      symbol: 'ARB',
-      baseFee: 0,
-      priorityFee: 0,
-      gasPrice: 0,
-      lastBlock: 0,
-      history: [],
-      rpcUrl: 'wss://arbitrum-one-rpc.publicnode.com',
-      color: '#28A0F0',
-      decimals: 18
-    }
-  },
+  // Chain data, keyed by registry id
+  chains: Object.fromEntries(DEFAULT_VISIBLE_CHAIN_IDS.map((chainId) => [chainId, createChainState(chainId)])),
+  visibleChainIds: DEFAULT_VISIBLE_CHAIN_IDS,
   
   // Actions
   setMode: (mode) => set({ mode }),
   
-  setUsdPrice: (price) => set({ usdPrice: price }),
+  setUsdPrice: (price, priceStats) => set((state) => ({
+    usdPrice: price,
+    priceStats: priceStats || state.priceStats
+  })),
   
   setSimulationAmount: (amount) => set({ simulationAmount: amount }),
   
+  setFeeTier: (feeTier) => set({ feeTier }),
+  
+  // Chains shown on the dashboard, in display order. Hidden chains keep
+  // their slice so history survives toggling them back on.
+  setVisibleChains: (chainIds) => set((state) => {
+    const visibleChainIds = chainIds.filter((chainId) => getChain(chainId))
+    const chains = { ...state.chains }
+    visibleChainIds.forEach((chainId) => {
+      if (!chains[chainId]) chains[chainId] = createChainState(chainId)
+    })
+    return { chains, visibleChainIds }
+  }),
+  
+  showChain: (chainId) => {
+    const { visibleChainIds, setVisibleChains } = get()
+    if (!visibleChainIds.includes(chainId)) setVisibleChains([...visibleChainIds, chainId])
+  },
+  
+  hideChain: (chainId) => {
+    const { visibleChainIds, setVisibleChains } = get()
+    setVisibleChains(visibleChainIds.filter((id) => id !== chainId))
+  },
+  
   updateChainData: (chainId, data) => set((state) => ({
     chains: {
       ...state.chains,
@@ -66,36 +101,36 @@ export const useGasStore = create((set, get) => ({
     lastUpdateTime: new Date().toISOString()
   })),
   
+  // History buffers are appended in place; the new historyVersion is what
+  // tells subscribers the chain changed
   addGasHistory: (chainId, gasPoint) => set((state) => {
-    const chain = state.chains[chainId]
-    const newHistory = [...chain.history, gasPoint]
-    
-    // Keep only last 60 points (15 minutes of 15-second intervals)
-    const trimmedHistory = newHistory.slice(-60)
+    const chain = chainSlice(state, chainId)
+    if (!chain) return {}
+    const timestamp = toMillis(gasPoint.timestamp)
+    chain.history.push(timestamp, gasPoint.baseFee, gasPoint.priorityFee, gasPoint.gasPrice)
+    chain.candles.add(timestamp, gasPoint.gasPrice / 1e9)
+    chain.forecaster.push(gasPoint)
     
     return {
       chains: {
         ...state.chains,
         [chainId]: {
           ...chain,
-          history: trimmedHistory
+          forecast: chain.forecaster.getForecast(),
+          historyVersion: chain.history.version
         }
       }
     }
   }),
-
+  
   // Add gas data and history point simultaneously
   updateChainDataWithHistory: (chainId, data) => set((state) => {
-    const chain = state.chains[chainId]
-    const gasPoint = {
-      timestamp: data.timestamp || Date.now(),
-      baseFee: data.baseFee,
-      priorityFee: data.priorityFee,
-      gasPrice: data.gasPrice
-    }
-    
-    const newHistory = [...chain.history, gasPoint]
-    const trimmedHistory = newHistory.slice(-60) // Keep last 60 points
+    const chain = chainSlice(state, chainId)
+    if (!chain) return {}
+    const timestamp = toMillis(data.timestamp)
+    chain.history.push(timestamp, data.baseFee, data.priorityFee, data.gasPrice)
+    chain.candles.add(timestamp, data.gasPrice / 1e9)
+    chain.forecaster.push(data)
     
     return {
       chains: {
@@ -103,79 +138,140 @@ export const useGasStore = create((set, get) => ({
         [chainId]: {
           ...chain,
           ...data,
-          history: trimmedHistory
+          forecast: chain.forecaster.getForecast(),
+          historyVersion: chain.history.version
         }
       },
       lastUpdateTime: new Date().toISOString()
     }
   }),
-
-  // Convert history to OHLC candlestick data
-  getOHLCData: (chainId, intervalMinutes = 15) => {
-    const state = get()
-    const chain = state.chains[chainId]
-    if (!chain.history.length) return []
+  
+  // Apply a coalesced batch from UpdateScheduler as a single state change:
+  // every gas point goes into history, the last one per chain becomes current.
+  // Batches from the gas worker carry finished candles, which replace ours
+  // instead of re-aggregating the points here.
+  applyBatch: ({ gas, candles = {}, price, isConnected }) => set((state) => {
+    const update = {}
     
-    const intervalMs = intervalMinutes * 60 * 1000
-    const now = Date.now()
+    const chainIds = Object.keys(gas)
+    if (chainIds.length > 0) {
+      const chains = { ...state.chains }
+      chainIds.forEach((chainId) => {
+        const chain = chainSlice(state, chainId)
+        const points = gas[chainId]
+        if (!chain || points.length === 0) return
+        
+        const workerCandles = candles[chainId]
+        points.forEach((point) => {
+          const timestamp = toMillis(point.timestamp)
+          chain.history.push(timestamp, point.baseFee, point.priorityFee, point.gasPrice)
+          if (!workerCandles) chain.candles.add(timestamp, point.gasPrice / 1e9)
+          chain.forecaster.push(point)
+        })
+        if (workerCandles) {
+          Object.entries(workerCandles).forEach(([interval, list]) => {
+            list.forEach((candle) => chain.candles.upsert(Number(interval), candle))
+          })
+        }
+        chains[chainId] = {
+          ...chain,
+          ...points[points.length - 1],
+          // Statistics take every point; the forecast is read once per batch
+          forecast: chain.forecaster.getForecast(),
+          historyVersion: chain.history.version
+        }
+        traceCommit(chainId, points[points.length - 1])
+      })
+      update.chains = chains
+      update.lastUpdateTime = new Date().toISOString()
+    }
     
-    // Group history points by interval
-    const historyByInterval = {}
+    if (price) {
+      update.usdPrice = price.price
+      update.priceStats = price.priceStats || state.priceStats
+    }
+    if (isConnected !== null && isConnected !== undefined) {
+      update.isConnected = isConnected
+    }
+    return update
+  }),
+  
+  // Paint last-known values (localStorage or a server snapshot) before live
+  // data arrives. A chain is only overwritten by a newer block, so a late
+  // snapshot never rolls back live data; nothing goes into history.
+  restoreSnapshot: ({ chains: snapshotChains = {}, usdPrice, priceStats, visibleChainIds }) => set((state) => {
+    const update = {}
+    const chains = { ...state.chains }
     
-    chain.history.forEach(point => {
-      const timestamp = typeof point.timestamp === 'number' ? point.timestamp : Date.parse(point.timestamp)
-      const intervalStart = Math.floor(timestamp / intervalMs) * intervalMs
-      
-      if (!historyByInterval[intervalStart]) {
-        historyByInterval[intervalStart] = []
-      }
-      historyByInterval[intervalStart].push({
-        ...point,
-        gasPriceGwei: point.gasPrice / 1e9
+    if (visibleChainIds?.length) {
+      update.visibleChainIds = visibleChainIds.filter((chainId) => getChain(chainId))
+      update.visibleChainIds.forEach((chainId) => {
+        if (!chains[chainId]) chains[chainId] = createChainState(chainId)
       })
+    }
+    
+    Object.entries(snapshotChains).forEach(([chainId, data]) => {
+      const chain = chains[chainId] || (getChain(chainId) ? createChainState(chainId) : null)
+      if (!chain || !data || data.lastBlock <= chain.lastBlock) return
+      chains[chainId] = { ...chain, ...data }
     })
+    update.chains = chains
     
-    // Convert to OHLC format
-    const ohlcData = []
-    Object.entries(historyByInterval).forEach(([intervalStart, dataPoints]) => {
-      if (dataPoints.length > 0) {
-        const prices = dataPoints.map(p => p.gasPriceGwei)
-        const sortedPrices = [...prices].sort((a, b) => a - b)
-        
-        ohlcData.push({
-          time: parseInt(intervalStart) / 1000, // Convert to seconds for lightweight-charts
-          open: prices[0],
-          high: Math.max(...prices),
-          low: Math.min(...prices),
-          close: prices[prices.length - 1],
-          volume: dataPoints.length
-        })
-      }
+    if (usdPrice && !state.usdPrice) {
+      update.usdPrice = usdPrice
+      update.priceStats = priceStats || state.priceStats
+    }
+    return update
+  }),
+  
+  // Merge persisted points that are older than anything already buffered
+  hydrateHistory: (chainId, points) => set((state) => {
+    const chain = chainSlice(state, chainId)
+    if (!chain || !points.length) return {}
+    
+    const live = chain.history.toArray()
+    const firstLive = live.length > 0 ? live[0].timestamp : Infinity
+    const history = new GasHistoryBuffer(chain.history.capacity)
+    const candles = new CandleAggregator()
+    // Stored points warm up a forecaster that hasn't seen live data yet
+    const warmForecaster = !chain.forecaster.last
+    
+    const append = (point) => {
+      const timestamp = toMillis(point.timestamp)
+      history.push(timestamp, point.baseFee, point.priorityFee, point.gasPrice)
+      candles.add(timestamp, point.gasPrice / 1e9)
+      if (warmForecaster) chain.forecaster.push(point)
+    }
+    points.forEach((point) => {
+      if (toMillis(point.timestamp) < firstLive) append(point)
     })
+    live.forEach(append)
     
-    // If we don't have enough OHLC data, generate some based on current prices
-    if (ohlcData.length < 10) {
-      const currentPrice = chain.gasPrice / 1e9
-      const baseTime = Math.floor(now / 1000) - (24 * 60 * 60) // 24 hours ago
-      
-      for (let i = 0; i < 24; i++) {
-        const time = baseTime + (i * 60 * 60) // Every hour
-        const variation = (Math.random() - 0.5) * currentPrice * 0.3 // ±30% variation
-        const price = Math.max(0.1, currentPrice + variation)
-        const volatility = currentPrice * 0.1 // 10% volatility
-        
-        ohlcData.push({
-          time,
-          open: Math.max(0.1, price + (Math.random() - 0.5) * volatility),
-          high: Math.max(0.1, price + Math.random() * volatility),
-          low: Math.max(0.1, price - Math.random() * volatility),
-          close: Math.max(0.1, price + (Math.random() - 0.5) * volatility),
-          volume: Math.floor(Math.random() * 100) + 10
-        })
+    // Keep the version monotonic across the buffer swap
+    history.version += chain.history.version
+    
+    return {
+      chains: {
+        ...state.chains,
+        [chainId]: {
+          ...chain,
+          history,
+          candles,
+          forecast: chain.forecaster.getForecast(),
+          historyVersion: history.version
+        }
       }
     }
-    
-    return ohlcData.sort((a, b) => a.time - b.time)
+  }),
+  
+  // OHLC candlestick data, maintained incrementally as points arrive
+  getOHLCData: (chainId, intervalMinutes = 15) => {
+    return get().chains[chainId].candles.getCandles(intervalMinutes)
+  },
+  
+  // The open candle only, for O(1) chart updates
+  getLatestCandle: (chainId, intervalMinutes = 15) => {
+    return get().chains[chainId].candles.getLatest(intervalMinutes)
   },
   
   setConnectionStatus: (isConnected) => set({ isConnected }),
@@ -183,17 +279,86 @@ export const useGasStore = create((set, get) => ({
   // Computed getters
   getGasCostUSD: (chainId) => {
     const state = get()
-    const chain = state.chains[chainId]
-    const gasLimit = 21000 // Standard ETH transfer
-    const gasCostWei = (chain.baseFee + chain.priorityFee) * gasLimit
-    const gasCostEth = gasCostWei / Math.pow(10, 18)
-    return gasCostEth * state.usdPrice
+    return transferCostUSD(chainId, state.chains[chainId], state.feeTier, state.usdPrice)
+  },
+  
+  // Whole scenario matrix for the visible chains in one vectorized pass;
+  // options as for simulateScenarios (profiles, tiers, amounts)
+  simulate: (options = {}) => {
+    const state = get()
+    // Chains without a block yet would rank as free
+    const chains = state.visibleChainIds
+      .filter((chainId) => state.chains[chainId]?.lastBlock > 0)
+      .map((chainId) => ({ id: chainId, ...state.chains[chainId] }))
+    return simulateScenarios({
+      chains,
+      usdPrice: state.usdPrice,
+      amounts: [state.simulationAmount],
+      ...options
+    })
   },
   
   getTransactionCostUSD: (chainId) => {
     const state = get()
     const gasCost = state.getGasCostUSD(chainId)
+    if (gasCost === null) return null
     const transactionValue = state.simulationAmount * state.usdPrice
     return gasCost + transactionValue
   }
-}))
\ No newline at end of file
+}))
+
+// Selector hooks. Each chain lives in its own slice object that is only
+// replaced when that chain updates, so components that select one slice
+// re-render for that chain's blocks and nothing else.
+
+// Visible chain ids in display order; stable across updates
+export const useChainIds = () => useGasStore((state) => state.visibleChainIds)
+
+export const useChain = (chainId) => useGasStore((state) => state.chains[chainId])
+
+// Several top-level fields at once, compared shallowly
+export const useGasFields = (...keys) => useGasStore(useShallow((state) => {
+  const fields = {}
+  keys.forEach((key) => { fields[key] = state[key] })
+  return fields
+}))
+
+// Actions never change identity, so this never causes a re-render
+export const useGasActions = () => useGasStore(useShallow((state) => ({
+  setMode: state.setMode,
+  setUsdPrice: state.setUsdPrice,
+  setSimulationAmount: state.setSimulationAmount,
+  setFeeTier: state.setFeeTier,
+  updateChainData: state.updateChainData,
+  updateChainDataWithHistory: state.updateChainDataWithHistory,
+  applyBatch: state.applyBatch,
+  setVisibleChains: state.setVisibleChains,
+  showChain: state.showChain,
+  hideChain: state.hideChain,
+  hydrateHistory: state.hydrateHistory,
+  restoreSnapshot: state.restoreSnapshot,
+  setConnectionStatus: state.setConnectionStatus,
+  getOHLCData: state.getOHLCData,
+  simulate: state.simulate,
+  getLatestCandle: state.getLatestCandle
+})))
+
+// Chain with the lowest gas cost in USD; a string, so it only re-renders
+// subscribers when the winner changes
+export const useCheapestChainId = () => useGasStore((state) => {
+  let cheapest = null
+  let lowestCost = Infinity
+  
+  state.visibleChainIds.forEach((chainId) => {
+    const chain = state.chains[chainId]
+    // Chains without a block yet would rank as free, as in simulate()
+    if (!(chain?.lastBlock > 0)) return
+    // null: costs in another gas token don't compare
+    const cost = transferCostUSD(chainId, chain, state.feeTier, state.usdPrice)
+    if (cost !== null && cost < lowestCost) {
+      lowestCost = cost
+      cheapest = chainId
+    }
+  })
+  return cheapest
+})
@@ -0,0 +1,279 @@
+import { getDb } from './mongo.js'
+import { toMillis } from './ringBuffer.js'
+import { log } from './log.js'
+
+// Raw points live in MongoDB time-series collections; downsampled candles in
+// a regular collection keyed by (chain, interval, time).
+const GAS_POINTS = 'gas_points'
+const PRICE_POINTS = 'price_points'
+const GAS_CANDLES = 'gas_candles'
+
+// Retention: raw points expire after a week, candles keep coarser data longer
+const RAW_RETENTION_SECONDS = 7 * 24 * 60 * 60
+export const CANDLE_RETENTION_DAYS = {
+  1: 30,
+  5: 90,
+  15: 180,
+  60: null // kept indefinitely
+}
+export const CANDLE_INTERVALS = Object.keys(CANDLE_RETENTION_DAYS).map(Number)
+
+const FLUSH_INTERVAL_MS = 1000
+const MAX_BATCH_SIZE = 500
+// Points held while the database is unreachable; the oldest go first
+const MAX_PENDING_POINTS = 50000
+// After a failed flush, wait this long (doubling per failure) before the next
+const FLUSH_RETRY_BASE_MS = 2000
+const FLUSH_RETRY_MAX_MS = 60000
+const ROLLUP_INTERVAL_MS = 5 * 60 * 1000
+
+// MongoDB error code for creating a collection that already exists
+const NAMESPACE_EXISTS = 48
+
+// Buffered persistence for gas and price points plus candle rollups.
+// Writes are batched into unordered bulk inserts; reads are single indexed
+// range queries.
+export class GasHistoryStore {
+  constructor() {
+    this.pendingGas = []
+    this.pendingPrices = []
+    this.readyPromise = null
+    this.flushTimer = null
+    this.rollupTimer = null
+    this.lastRollupAt = null
+    this.flushing = null
+    this.flushFailures = 0
+    this.retryFlushAt = 0
+  }
+  
+  // Create collections and indexes once
+  ready() {
+    if (!this.readyPromise) {
+      this.readyPromise = this.ensureCollections().catch((error) => {
+        this.readyPromise = null
+        throw error
+      })
+    }
+    return this.readyPromise
+  }
+  
+  async ensureCollections() {
+    const db = await getDb()
+    
+    await createTimeSeries(db, GAS_POINTS, 'chain')
+    await createTimeSeries(db, PRICE_POINTS, 'pair')
+    
+    await db.collection(GAS_POINTS).createIndex({ chain: 1, ts: 1 })
+    await db.collection(PRICE_POINTS).createIndex({ pair: 1, ts: 1 })
+    await db.collection(GAS_CANDLES).createIndex({ chain: 1, interval: 1, time: 1 }, { unique: true })
+    await db.collection(GAS_CANDLES).createIndex({ expireAt: 1 }, { expireAfterSeconds: 0 })
+    
+    return db
+  }
+  
+  // Start background flushing and rollups
+  start() {
+    if (this.flushTimer) return
+    this.flushTimer = setInterval(() => {
+      this.flush().catch((error) => log.error('Error flushing gas history:', error))
+    }, FLUSH_INTERVAL_MS)
+    this.rollupTimer = setInterval(() => {
+      this.rollup().catch((error) => log.error('Error rolling up gas candles:', error))
+    }, ROLLUP_INTERVAL_MS)
+  }
+  
+  stop() {
+    clearInterval(this.flushTimer)
+    clearInterval(this.rollupTimer)
+    this.flushTimer = null
+    this.rollupTimer = null
+  }
+  
+  recordGasPoint(chainId, gasData) {
+    this.pendingGas.push({
+      ts: new Date(toMillis(gasData.timestamp)),
+      chain: chainId,
+      block: gasData.lastBlock,
+      baseFee: gasData.baseFee,
+      priorityFee: gasData.priorityFee,
+      gasPrice: gasData.gasPrice
+    })
+    if (this.pendingGas.length >= MAX_BATCH_SIZE) {
+      this.flush().catch((error) => log.error('Error flushing gas history:', error))
+    }
+  }
+  
+  recordPricePoint(price, stats) {
+    this.pendingPrices.push({
+      ts: new Date(),
+      pair: 'ETH/USD',
+      price,
+      twap: stats?.twap ?? null,
+      vwap: stats?.vwap ?? null
+    })
+  }
+  
+  // Write everything buffered so far as unordered bulk inserts. One flush
+  // runs at a time; calls while it is in flight, or while backing off after
+  // a failure, do nothing. A failed batch goes back in front of the points
+  // recorded meanwhile; a partially applied batch may then store a few
+  // points twice, which readers tolerate.
+  flush() {
+    if (this.flushing || Date.now() < this.retryFlushAt) return Promise.resolve()
+    if (this.pendingGas.length === 0 && this.pendingPrices.length === 0) return Promise.resolve()
+    
+    this.flushing = this.writePending().then(() => {
+      this.flushFailures = 0
+      this.retryFlushAt = 0
+    }, (error) => {
+      this.flushFailures++
+      this.retryFlushAt = Date.now() + Math.min(FLUSH_RETRY_MAX_MS, FLUSH_RETRY_BASE_MS * 2 ** (this.flushFailures - 1))
+      throw error
+    }).finally(() => {
+      this.flushing = null
+    })
+    return this.flushing
+  }
+  
+  // Take the buffers and insert them, requeueing on failure
+  async writePending() {
+    const gasPoints = this.pendingGas
+    const pricePoints = this.pendingPrices
+    this.pendingGas = []
+    this.pendingPrices = []
+    
+    try {
+      const db = await this.ready()
+      await Promise.all([
+        gasPoints.length && db.collection(GAS_POINTS).insertMany(gasPoints, { ordered: false }),
+        pricePoints.length && db.collection(PRICE_POINTS).insertMany(pricePoints, { ordered: false })
+      ])
+    } catch (error) {
+      this.pendingGas = requeue(gasPoints, this.pendingGas)
+      this.pendingPrices = requeue(pricePoints, this.pendingPrices)
+      throw error
+    }
+  }
+  
+  // Downsample recent raw points into candles for every retained interval
+  async rollup(now = Date.now()) {
+    const db = await this.ready()
+    const widest = Math.max(...CANDLE_INTERVALS) * 60 * 1000
+    
+    // Recompute from the start of the widest bucket still open at the last run
+    const since = this.lastRollupAt ?? now - RAW_RETENTION_SECONDS * 1000
+    const from = new Date(Math.floor((since - widest) / widest) * widest)
+    
+    for (const interval of CANDLE_INTERVALS) {
+      await this.rollupInterval(db, interval, from)
+    }
+    this.lastRollupAt = now
+  }
+  
+  async rollupInterval(db, interval, from) {
+    const retentionDays = CANDLE_RETENTION_DAYS[interval]
+    
+    await db.collection(GAS_POINTS).aggregate([
+      { $match: { ts: { $gte: from } } },
+      { $sort: { ts: 1 } },
+      {
+        $group: {
+          _id: {
+            chain: '$chain',
+            time: { $dateTrunc: { date: '$ts', unit: 'minute', binSize: interval } }
+          },
+          open: { $first: '$gasPrice' },
+          high: { $max: '$gasPrice' },
+          low: { $min: '$gasPrice' },
+          close: { $last: '$gasPrice' },
+          volume: { $sum: 1 }
+        }
+      },
+      {
+        $project: {
+          _id: 0,
+          chain: '$_id.chain',
+          interval: { $literal: interval },
+          time: '$_id.time',
+          open: 1,
+          high: 1,
+          low: 1,
+          close: 1,
+          volume: 1,
+          expireAt: retentionDays
+            ? { $dateAdd: { startDate: '$_id.time', unit: 'day', amount: retentionDays } }
+            : null
+        }
+      },
+      {
+        $merge: {
+          into: GAS_CANDLES,
+          on: ['chain', 'interval', 'time'],
+          whenMatched: 'replace',
+          whenNotMatched: 'insert'
+        }
+      }
+    ]).toArray()
+  }
+  
+  // Raw points for one chain in [from, to], oldest first. When the range
+  // holds more than limit points, the newest ones are returned so the chart
+  // stays contiguous up to now.
+  async getGasHistory(chainId, from, to, limit = 20000) {
+    const db = await this.ready()
+    const points = await db.collection(GAS_POINTS)
+      .find(
+        { chain: chainId, ts: { $gte: new Date(from), $lte: new Date(to) } },
+        { projection: { _id: 0, ts: 1, block: 1, baseFee: 1, priorityFee: 1, gasPrice: 1 } }
+      )
+      .sort({ ts: -1 })
+      .limit(limit)
+      .toArray()
+    
+    return points.reverse().map((point) => ({
+      timestamp: point.ts.getTime(),
+      lastBlock: point.block,
+      baseFee: point.baseFee,
+      priorityFee: point.priorityFee,
+      gasPrice: point.gasPrice
+    }))
+  }
+  
+  // Rolled-up candles for one chain and interval in [from, to], in gwei
+  async getCandles(chainId, interval, from, to) {
+    const db = await this.ready()
+    const candles = await db.collection(GAS_CANDLES)
+      .find(
+        { chain: chainId, interval, time: { $gte: new Date(from), $lte: new Date(to) } },
+        { projection: { _id: 0, time: 1, open: 1, high: 1, low: 1, close: 1, volume: 1 } }
+      )
+      .sort({ time: 1 })
+      .toArray()
+    
+    return candles.map((candle) => ({
+      time: candle.time.getTime() / 1000,
+      open: candle.open / 1e9,
+      high: candle.high / 1e9,
+      low: candle.low / 1e9,
+      close: candle.close / 1e9,
+      volume: candle.volume
+    }))
+  }
+}
+
+// Failed points ahead of newer ones, capped at MAX_PENDING_POINTS
+function requeue(failed, newer) {
+  const points = failed.concat(newer)
+  return points.length > MAX_PENDING_POINTS ? points.slice(-MAX_PENDING_POINTS) : points
+}
+
+async function createTimeSeries(db, name, metaField) {
+  try {
+    await db.createCollection(name, {
+      timeseries: { timeField: 'ts', metaField, granularity: 'seconds' },
+      expireAfterSeconds: RAW_RETENTION_SECONDS
+    })
+  } catch (error) {
+    if (error.code !== NAMESPACE_EXISTS) throw error
+  }
+}
@@ -0,0 +1,85 @@
+// Coalesces bursty Web3Service callbacks into one store transaction.
+//
+// Chains deliver blocks on their own schedules (Arbitrum ~4/s, Polygon
+// ~0.5/s, Ethereum every 12s) and every price swap is its own callback.
+// Applying each one immediately means one React commit per event. The
+// scheduler buffers them and flushes once per animation frame (or every
+// `intervalMs` when set), so a burst across chains costs a single render.
+//
+// Every gas point is kept for history and candles; only the latest price
+// and connection status survive a flush.
+
+// Flush at least this often when animation frames are paused (hidden tab)
+const MAX_FRAME_WAIT_MS = 1000
+
+export class UpdateScheduler {
+  // applyBatch receives { gas: { [chainId]: points[] }, price, isConnected }
+  constructor(applyBatch, { intervalMs = 0 } = {}) {
+    this.applyBatch = applyBatch
+    this.intervalMs = intervalMs
+    this.pending = null
+    this.frame = null
+    this.timer = null
+    this.stats = { events: 0, flushes: 0 }
+  }
+  
+  batch() {
+    if (!this.pending) {
+      this.pending = { gas: {}, price: null, isConnected: null }
+      this.schedule()
+    }
+    this.stats.events++
+    return this.pending
+  }
+  
+  pushGas(chainId, gasData) {
+    const gas = this.batch().gas
+    if (!gas[chainId]) gas[chainId] = []
+    gas[chainId].push(gasData)
+  }
+  
+  pushPrice(price, priceStats) {
+    this.batch().price = { price, priceStats }
+  }
+  
+  pushConnection(isConnected) {
+    this.batch().isConnected = isConnected
+  }
+  
+  schedule() {
+    const flush = () => this.flush()
+    const canUseFrames = this.intervalMs === 0 && typeof requestAnimationFrame === 'function'
+    
+    if (canUseFrames) {
+      this.frame = requestAnimationFrame(flush)
+    }
+    this.timer = setTimeout(flush, canUseFrames ? MAX_FRAME_WAIT_MS : this.intervalMs)
+  }
+  
+  flush() {
+    if (this.frame !== null) cancelAnimationFrame(this.frame)
+    clearTimeout(this.timer)
+    this.frame = null
+    this.timer = null
+    
+    const batch = this.pending
+    this.pending = null
+    if (!batch) return
+    
+    this.stats.flushes++
+    this.applyBatch(batch)
+  }
+  
+  // Web3Service callbacks that feed this scheduler
+  callbacks() {
+    return {
+      onGasUpdate: (chainId, gasData) => this.pushGas(chainId, gasData),
+      onPriceUpdate: (price, priceStats) => this.pushPrice(price, priceStats),
+      onConnectionChange: (isConnected) => this.pushConnection(isConnected)
+    }
+  }
+  
+  dispose() {
+    this.flush()
+  }
+}
@@ -1,5 +1,6 @@
 import { clsx } from "clsx"
 import { twMerge } from "tailwind-merge"
+import { getChain } from "./chains.js"
 
 export function cn(...inputs) {
   return twMerge(clsx(inputs))
@@ -46,13 +47,7 @@ export function debounce(func, wait) {
 }
 
 export function generateMockGasData(chainId) {
-  const baseGasMap = {
-    ethereum: 15, // 15 gwei average
-    polygon: 30,  // 30 gwei average  
-    arbitrum: 0.1 // 0.1 gwei average
-  }
-  
-  const baseGas = baseGasMap[chainId] || 15
+  const baseGas = getChain(chainId)?.mockBaseFeeGwei ?? 15
   const variation = 0.7 + Math.random() * 0.6 // ±30% variation
   const baseFee = Math.floor(baseGas * variation * 1e9)
   const priorityFee = Math.floor(2 * 1e9) // 2 gwei
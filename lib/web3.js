@@ -1,11 +1,12 @@
 import { ethers } from 'ethers'
-
-// Uniswap V3 USDC/ETH Pool - 0.05% fee tier
-const UNISWAP_V3_POOL = '0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640'
-
-const UNISWAP_V3_POOL_ABI = [
-  'event Swap(address indexed sender, address indexed recipient, int256 amount0, int256 amount1, uint160 sqrtPriceX96, uint128 liquidity, int24 tick)'
-]
+import { PriceEngine } from './price.js'
+import { arbitrumGasCostWei, STANDARD_TRANSFER_GAS } from './fixed.js'
+import { ConnectionManager } from './connection.js'
+import { DEFAULT_VISIBLE_CHAIN_IDS, getChain, staleHeadMs } from './chains.js'
+import { FEE_PERCENTILES, PriorityFeeEstimator } from './feeEstimator.js'
+import { sharedRpcCache } from './rpcCache.js'
+import { metrics } from './metrics.js'
+import { log } from './log.js'
 
 // Arbitrum specific constants
 const ARBITRUM_NODE_INTERFACE = '0x00000000000000000000000000000000000000C8'
@@ -14,11 +15,101 @@ const ARBITRUM_NODE_INTERFACE_ABI = [
   'function gasEstimateL1Component(address to, bool contractCreation, bytes calldata data) external payable returns (uint256 gasEstimateForL1, uint256 baseFee, uint256 l1BaseFeeEstimate)'
 ]
 
-class Web3Service {
+const ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+// Shared ABI coder for the node interface, and the calldata for the standard
+// transfer estimate, which never changes between blocks
+const arbitrumNodeInterface = new ethers.Interface(ARBITRUM_NODE_INTERFACE_ABI)
+const ARBITRUM_TRANSFER_ESTIMATE_DATA = arbitrumNodeInterface.encodeFunctionData(
+  'gasEstimateComponents',
+  [ZERO_ADDRESS, false, '0x']
+)
+
+// OP Stack GasPriceOracle predeploy; getL1FeeUpperBound prices the L1 data
+// for a transaction of the given unsigned size (a plain transfer is ~112 bytes)
+const OP_GAS_PRICE_ORACLE = '0x420000000000000000000000000000000000000F'
+const opGasPriceOracle = new ethers.Interface([
+  'function getL1FeeUpperBound(uint256 unsignedTxSize) view returns (uint256)'
+])
+const OP_TRANSFER_L1_FEE_DATA = opGasPriceOracle.encodeFunctionData('getL1FeeUpperBound', [112])
+
+// Rollup L1 data costs (Arbitrum and OP Stack) are sampled rather than read
+// on every block. The L1 fee only moves when a new L1 block is posted (~12s)
+// while L2 blocks arrive every 0.25-2s. everyNBlocks and l1RefreshMs each
+// force a fresh sample when exceeded; set both to 0 to sample every block.
+const DEFAULT_L1_SAMPLING = {
+  everyNBlocks: 0,
+  l1RefreshMs: 12000
+}
+
+// Tip used until a chain's fee history has loaded
+const DEFAULT_PRIORITY_FEE = 2000000000 // 2 gwei
+
+// How long the priority chain connects alone before the others start
+const PRIORITY_HEAD_START_MS = 1000
+
+// Block ingestion modes: 'newHeads' reads fees from the pushed header,
+// 'block' listens for block numbers and fetches each block
+const INGESTION_MODES = ['newHeads', 'block']
+
+// eth_subscribe('newHeads') subscription that hands each pushed header to a
+// callback. Registered with the socket provider the same way ethers registers
+// its own subscribers, so messages for our filter id are routed here.
+class NewHeadsSubscriber {
+  constructor(provider, onHead) {
+    this.provider = provider
+    this.onHead = onHead
+    this.filterId = null
+  }
+  
+  async start() {
+    this.filterId = await this.provider.send('eth_subscribe', ['newHeads'])
+    this.provider._register(this.filterId, this)
+  }
+  
+  _handleMessage(header) {
+    this.onHead(header)
+  }
+  
+  stop() {
+    if (this.filterId && !this.provider.destroyed) {
+      this.provider.send('eth_unsubscribe', [this.filterId]).catch(() => {})
+    }
+    this.filterId = null
+    this.onHead = () => {}
+  }
+}
+
+// Normalize a hex-encoded newHeads header into the fields we read from blocks
+function parseHeader(header) {
+  return {
+    number: Number(header.number),
+    timestamp: Number(header.timestamp),
+    baseFeePerGas: header.baseFeePerGas != null ? BigInt(header.baseFeePerGas) : null,
+    gasUsed: header.gasUsed != null ? BigInt(header.gasUsed) : null,
+    gasLimit: header.gasLimit != null ? BigInt(header.gasLimit) : null
+  }
+}
+
+export class Web3Service {
   constructor() {
     this.providers = {}
+    this.connections = {}
     this.isConnected = false
     this.ethPrice = 0
+    this.priceStats = null
+    this.priceEngine = null
+    this.stream = null
+    this.streamUrl = null
+    this.ingestionMode = 'newHeads'
+    this.headSubscribers = {}
+    this.stats = {}
+    this.batchProviders = {}
+    this.l1Sampling = { ...DEFAULT_L1_SAMPLING }
+    this.l1Samples = {}
+    this.feeEstimators = {}
+    this.feeRefreshes = {}
+    this.rpcCache = sharedRpcCache
     this.callbacks = {
       onGasUpdate: null,
       onPriceUpdate: null,
@@ -26,273 +117,663 @@ class Web3Service {
     }
   }
   
-  // Initialize providers for all chains
-  async initializeProviders() {
-    const chains = {
-      ethereum: 'wss://ethereum-rpc.publicnode.com',
-      polygon: 'wss://polygon-bor-rpc.publicnode.com', 
-      arbitrum: 'wss://arbitrum-one-rpc.publicnode.com'
-    }
+  // Connect chains in priority order: the first one (the chain on screen)
+  // gets a head start and the rest follow in the background. Resolves as
+  // soon as any chain is live instead of waiting for the slowest endpoint.
+  async initializeProviders(chainIds = DEFAULT_VISIBLE_CHAIN_IDS) {
+    const [priority, ...rest] = [...new Set([...chainIds, 'ethereum'])]
+    const first = this.connectChains([priority])
     
-    const connectionPromises = []
+    const background = Promise.race([
+      Promise.all(first),
+      new Promise((resolve) => setTimeout(resolve, PRIORITY_HEAD_START_MS))
+    ]).then(() => this.connectChains(rest))
     
-    for (const [chainId, rpcUrl] of Object.entries(chains)) {
-      // Create a promise that resolves when the connection is established or times out
-      const connectionPromise = new Promise((resolve, reject) => {
-        const timeout = setTimeout(() => {
-          reject(new Error(`Timeout connecting to ${chainId}`))
-        }, 3000) // 3 second timeout per chain
-        
-        try {
-          const provider = new ethers.WebSocketProvider(rpcUrl)
-          
-          // Set up error handling
-          provider.on('error', (error) => {
-            clearTimeout(timeout)
-            console.error(`${chainId} provider error:`, error)
-            reject(error)
-          })
-          
-          // Test connection by getting network info
-          provider.getNetwork().then(() => {
-            clearTimeout(timeout)
-            this.providers[chainId] = provider
-            
-            // Listen for new blocks
-            provider.on('block', (blockNumber) => {
-              this.handleNewBlock(chainId, blockNumber)
-            })
-            
-            provider.on('error', (error) => {
-              console.error(`${chainId} provider error:`, error)
-              this.reconnectProvider(chainId)
-            })
-            
-            resolve(chainId)
-          }).catch((error) => {
-            clearTimeout(timeout)
-            reject(error)
-          })
-          
-        } catch (error) {
-          clearTimeout(timeout)
-          reject(error)
-        }
-      })
-      
-      connectionPromises.push(connectionPromise)
-    }
+    // Attempts resolve with null when their chain failed; only successes count
+    const connected = (attempt) => attempt.then((provider) => provider ?? Promise.reject(new Error('not connected')))
     
     try {
-      // Wait for all connections with a shorter timeout
+      // The priority chain, or failing that whichever background chain
+      // connects first; all failing falls through to the check below
       await Promise.race([
-        Promise.allSettled(connectionPromises),
+        Promise.any([
+          ...first.map(connected),
+          background.then((attempts) => Promise.any(attempts.map(connected)))
+        ]).catch(() => null),
         new Promise((_, reject) => setTimeout(() => reject(new Error('Overall timeout')), 4000))
       ])
       
       // Check if at least one connection succeeded
       const connectedChains = Object.keys(this.providers).length
       if (connectedChains > 0) {
-        this.isConnected = true
-        this.callbacks.onConnectionChange?.(true)
-        console.log(`Connected to ${connectedChains} chains`)
-        
-        // Start ETH price tracking
-        this.startEthPriceTracking()
+        log.info(`Connected to ${connectedChains} chains`)
       } else {
         throw new Error('No blockchain connections established')
       }
-      
+    
     } catch (error) {
-      console.error('Failed to initialize providers:', error)
+      log.error('Failed to initialize providers:', error)
       this.isConnected = false
       this.callbacks.onConnectionChange?.(false)
       throw error
     }
   }
   
-  // Handle new block for gas price extraction
-  async handleNewBlock(chainId, blockNumber) {
-    try {
-      const provider = this.providers[chainId]
-      const block = await provider.getBlock(blockNumber, false)
+  // Hold sockets only for these chains: new ones are connected, the rest are
+  // closed. Ethereum stays connected because the ETH/USD feed lives on it.
+  // Behind the server stream, the stream is reopened for the new chains and
+  // the server connects any it doesn't ingest yet; if it can't be reopened,
+  // the chains are connected directly, as on a first load without a stream.
+  setActiveChains(chainIds) {
+    const active = new Set(chainIds.filter((chainId) => getChain(chainId)))
+    active.add('ethereum')
+    
+    if (this.stream) {
+      this.stream.close()
+      this.stream = null
+      return [this.connectToStream(this.streamUrl, [...active]).catch((error) => {
+        log.warn('Could not reopen gas stream, connecting directly:', error.message)
+        return Promise.all(this.connectChains([...active]))
+      })]
+    }
+    
+    Object.keys(this.connections).forEach((chainId) => {
+      if (!active.has(chainId)) this.closeChain(chainId)
+    })
+    return this.connectChains([...active])
+  }
+  
+  // Start connecting chains that have no connection yet. Returns the attempts;
+  // a chain whose endpoints all fail keeps retrying in the background.
+  connectChains(chainIds) {
+    return chainIds
+      .filter((chainId) => getChain(chainId) && !this.connections[chainId])
+      .map((chainId) => {
+        const connection = this.getConnection(chainId)
+        return connection.start().catch((error) => {
+          log.warn(`${chainId} initial connect failed:`, error.message)
+          connection.scheduleReconnect()
+          return null
+        })
+      })
+  }
+  
+  closeChain(chainId) {
+    this.headSubscribers[chainId]?.stop()
+    delete this.headSubscribers[chainId]
+    this.connections[chainId]?.stop()
+    delete this.connections[chainId]
+    delete this.providers[chainId]
+    this.batchProviders[chainId]?.destroy()
+    delete this.batchProviders[chainId]
+    delete this.l1Samples[chainId]
+    delete this.feeEstimators[chainId]
+    this.rpcCache.clearChain(chainId)
+  }
+  
+  // Connection manager for a chain; every (re)connected socket is wired up
+  // here, so subscriptions follow the manager across endpoint failovers
+  getConnection(chainId) {
+    if (!this.connections[chainId]) {
+      const chain = getChain(chainId)
+      if (!chain) throw new Error(`Unknown chain: ${chainId}`)
       
-      if (block) {
-        const gasData = await this.getEnhancedGasData(chainId, block)
-        this.callbacks.onGasUpdate?.(chainId, gasData)
+      const connection = new ConnectionManager(chainId, chain.rpcUrls, {
+        staleHeadMs: staleHeadMs(chainId),
+        onConnect: (provider) => {
+          this.providers[chainId] = provider
+          this.subscribeToBlocks(chainId, provider)
+          
+          // Swap subscriptions live on the Ethereum socket
+          if (chainId === 'ethereum') {
+            this.startEthPriceTracking()
+          }
+          
+          // Live as soon as any chain is, whichever order they connect in
+          if (!this.isConnected) {
+            this.isConnected = true
+            this.callbacks.onConnectionChange?.(true)
+          }
+        },
+        onDisconnect: () => {
+          this.headSubscribers[chainId]?.stop()
+          delete this.headSubscribers[chainId]
+          delete this.providers[chainId]
+        }
+      })
+      this.connections[chainId] = connection
+    }
+    return this.connections[chainId]
+  }
+  
+  // Choose the block ingestion mode for every chain
+  setIngestionMode(mode) {
+    if (!INGESTION_MODES.includes(mode)) {
+      throw new Error(`Unknown ingestion mode: ${mode}`)
+    }
+    this.ingestionMode = mode
+  }
+  
+  // Per-chain counters for comparing ingestion modes
+  getChainStats(chainId) {
+    if (!this.stats[chainId]) {
+      this.stats[chainId] = {
+        mode: this.ingestionMode,
+        headsReceived: 0,
+        blocksReceived: 0,
+        getBlockCalls: 0,
+        gasEstimateCalls: 0,
+        gasEstimateSkips: 0,
+        batchRequests: 0,
+        feeHistoryCalls: 0,
+        subscribeFallbacks: 0
       }
+    }
+    return this.stats[chainId]
+  }
+  
+  getStats() {
+    Object.entries(this.connections).forEach(([chainId, connection]) => {
+      this.getChainStats(chainId).connection = connection.getMetrics()
+    })
+    return this.stats
+  }
+  
+  // JSON-RPC read through the shared cache. Every upstream read goes through
+  // here so callers asking for the same thing at the same height share one
+  // round trip. send defaults to the chain's socket.
+  rpc(chainId, method, params, send) {
+    return this.rpcCache.read(chainId, method, params, () => {
+      let request
+      if (send) {
+        request = send(method, params)
+      } else {
+        const provider = this.providers[chainId]
+        if (!provider) throw new Error(`${chainId} provider not available`)
+        request = provider.send(method, params)
+      }
+      return metrics ? metrics.observeRpc(chainId, method, request) : request
+    })
+  }
+  
+  // Subscribe to new heads, falling back to block numbers + getBlock
+  subscribeToBlocks(chainId, provider) {
+    const stats = this.getChainStats(chainId)
+    this.headSubscribers[chainId]?.stop()
+    delete this.headSubscribers[chainId]
+    
+    const listenForBlockNumbers = () => {
+      stats.mode = 'block'
+      provider.on('block', (blockNumber) => {
+        stats.blocksReceived++
+        this.connections[chainId]?.noteHead()
+        this.rpcCache.noteHead(chainId, blockNumber)
+        this.handleNewBlock(chainId, blockNumber, Date.now())
+      })
+    }
+    
+    if (this.ingestionMode !== 'newHeads') {
+      listenForBlockNumbers()
+      return
+    }
+    
+    const subscriber = new NewHeadsSubscriber(provider, (header) => {
+      stats.headsReceived++
+      this.connections[chainId]?.noteHead()
+      this.handleNewHead(chainId, header, Date.now())
+    })
+    this.headSubscribers[chainId] = subscriber
+    stats.mode = 'newHeads'
+    
+    subscriber.start().catch((error) => {
+      log.warn(`${chainId} newHeads subscription failed, fetching blocks instead:`, error)
+      stats.subscribeFallbacks++
+      delete this.headSubscribers[chainId]
+      listenForBlockNumbers()
+    })
+  }
+  
+  // Price a block and hand it to the callbacks, stamped (ms) with when its
+  // head arrived and when pricing finished so consumers can measure their
+  // lag behind each stage
+  async publishBlock(chainId, block, receivedAt) {
+    const gasData = await this.getEnhancedGasData(chainId, block)
+    gasData.receivedAt = receivedAt
+    gasData.pricedAt = Date.now()
+    this.callbacks.onGasUpdate?.(chainId, gasData)
+  }
+  
+  // Handle a pushed header without refetching the block
+  async handleNewHead(chainId, header, receivedAt) {
+    try {
+      const block = parseHeader(header)
+      this.rpcCache.noteHead(chainId, block.number)
+      await this.publishBlock(chainId, block, receivedAt)
     } catch (error) {
-      console.error(`Error handling block for ${chainId}:`, error)
+      log.error(`Error handling header for ${chainId}:`, error)
     }
   }
   
-  // Calculate ETH/USD price from Uniswap V3
-  async getEthPriceFromUniswap() {
+  // Handle new block for gas price extraction
+  async handleNewBlock(chainId, blockNumber, receivedAt) {
     try {
-      const provider = this.providers.ethereum
-      if (!provider) throw new Error('Ethereum provider not available')
-      
-      const contract = new ethers.Contract(UNISWAP_V3_POOL, UNISWAP_V3_POOL_ABI, provider)
-      
-      // Get recent swap events
-      const currentBlock = await provider.getBlockNumber()
-      const fromBlock = currentBlock - 10 // Last 10 blocks
+      const chain = getChain(chainId)
+      if (chain.feeModel === 'arbitrum' && chain.httpRpcUrl && this.shouldSampleL1(chainId, blockNumber)) {
+        // Block and gas breakdown go upstream together in one batch
+        const block = await this.fetchArbitrumBlockWithSample(chainId, blockNumber)
+        await this.publishBlock(chainId, block, receivedAt)
+        return
+      }
       
-      const swapEvents = await contract.queryFilter('Swap', fromBlock, currentBlock)
+      this.getChainStats(chainId).getBlockCalls++
+      const connection = this.getConnection(chainId)
+      const rawBlock = await this.rpc(chainId, 'eth_getBlockByNumber', [ethers.toQuantity(blockNumber), false],
+        (method, params) => connection.hedge((provider) => provider.send(method, params)))
       
-      if (swapEvents.length > 0) {
-        const latestSwap = swapEvents[swapEvents.length - 1]
-        const sqrtPriceX96 = latestSwap.args.sqrtPriceX96
-        
-        // Calculate price from sqrtPriceX96
-        // price = (sqrtPriceX96 ** 2 * 10 ** 12) / (2 ** 192)
-        const price = (Number(sqrtPriceX96) ** 2 * Math.pow(10, 12)) / Math.pow(2, 192)
-        
-        // Since this is USDC/ETH pool, we need to invert for ETH/USD
-        const ethPrice = 1 / price
-        
-        this.ethPrice = ethPrice
-        this.callbacks.onPriceUpdate?.(ethPrice)
-        
-        return ethPrice
+      if (rawBlock) {
+        await this.publishBlock(chainId, parseHeader(rawBlock), receivedAt)
       }
-      
-      return this.ethPrice || 3000 // Fallback price
     } catch (error) {
-      console.error('Error fetching ETH price:', error)
-      return this.ethPrice || 3000 // Fallback price
+      log.error(`Error handling block for ${chainId}:`, error)
     }
   }
-
+  
+  // HTTP provider used for batched reads; socket providers cannot batch
+  getBatchProvider(chainId) {
+    if (!this.batchProviders[chainId]) {
+      const { httpRpcUrl } = getChain(chainId)
+      if (!httpRpcUrl) throw new Error(`No HTTP endpoint configured for ${chainId}`)
+      this.batchProviders[chainId] = new ethers.JsonRpcProvider(httpRpcUrl, undefined, {
+        staticNetwork: true,
+        batchMaxCount: 10,
+        batchStallTime: 5
+      })
+    }
+    return this.batchProviders[chainId]
+  }
+  
+  // Update the rollup L1 cost sampling policy ({ everyNBlocks, l1RefreshMs })
+  setL1Sampling(policy) {
+    this.l1Sampling = { ...this.l1Sampling, ...policy }
+  }
+  
+  // Whether this block should pay for a fresh L1 cost call
+  shouldSampleL1(chainId, blockNumber) {
+    const sample = this.l1Samples[chainId]
+    if (!sample) return true
+    
+    const { everyNBlocks, l1RefreshMs } = this.l1Sampling
+    if (!everyNBlocks && !l1RefreshMs) return true
+    if (everyNBlocks > 0 && blockNumber - sample.blockNumber >= everyNBlocks) return true
+    if (l1RefreshMs > 0 && Date.now() - sample.fetchedAt >= l1RefreshMs) return true
+    return false
+  }
+  
+  storeL1Sample(chainId, blockNumber, components) {
+    this.l1Samples[chainId] = {
+      blockNumber,
+      fetchedAt: Date.now(),
+      components
+    }
+  }
+  
+  decodeArbitrumGasEstimate(result) {
+    const gasEstimate = arbitrumNodeInterface.decodeFunctionResult('gasEstimateComponents', result)
+    return {
+      l2GasEstimate: gasEstimate.gasEstimate,
+      l1GasEstimate: gasEstimate.gasEstimateForL1,
+      baseFee: gasEstimate.baseFee,
+      l1BaseFeeEstimate: gasEstimate.l1BaseFeeEstimate
+    }
+  }
+  
+  // Fetch an Arbitrum block and its gas breakdown in a single JSON-RPC batch
+  async fetchArbitrumBlockWithSample(chainId, blockNumber) {
+    const provider = this.getBatchProvider(chainId)
+    const stats = this.getChainStats(chainId)
+    const blockTag = ethers.toQuantity(blockNumber)
+    
+    stats.batchRequests++
+    stats.getBlockCalls++
+    stats.gasEstimateCalls++
+    
+    // Both sends are queued in the same tick, so they share one HTTP request
+    const send = (method, params) => provider.send(method, params)
+    const [rawBlock, result] = await Promise.all([
+      this.rpc(chainId, 'eth_getBlockByNumber', [blockTag, false], send),
+      this.rpc(chainId, 'eth_call', [{ to: ARBITRUM_NODE_INTERFACE, data: ARBITRUM_TRANSFER_ESTIMATE_DATA }, blockTag], send)
+    ])
+    
+    this.storeL1Sample(chainId, blockNumber, this.decodeArbitrumGasEstimate(result))
+    return parseHeader(rawBlock)
+  }
+  
+  // Latest sampled breakdown, refreshed only when the sampling policy says so
+  async getArbitrumComponents(chainId, blockNumber) {
+    const stats = this.getChainStats(chainId)
+    
+    if (!this.shouldSampleL1(chainId, blockNumber)) {
+      stats.gasEstimateSkips++
+      return this.l1Samples[chainId].components
+    }
+    
+    stats.gasEstimateCalls++
+    const components = await this.getArbitrumGasCost(ZERO_ADDRESS, '0x', blockNumber, chainId)
+    if (!components.isFallback) {
+      this.storeL1Sample(chainId, blockNumber, components)
+    }
+    return components
+  }
+  
+  // OP Stack L1 data fee for a plain transfer, in wei; sampled like Arbitrum
+  async getOpStackL1Fee(chainId, blockNumber) {
+    const stats = this.getChainStats(chainId)
+    
+    if (!this.shouldSampleL1(chainId, blockNumber)) {
+      stats.gasEstimateSkips++
+      return this.l1Samples[chainId].components
+    }
+    
+    stats.gasEstimateCalls++
+    const result = await this.rpc(chainId, 'eth_call', [
+      { to: OP_GAS_PRICE_ORACLE, data: OP_TRANSFER_L1_FEE_DATA },
+      ethers.toQuantity(blockNumber)
+    ])
+    const l1Fee = BigInt(result)
+    this.storeL1Sample(chainId, blockNumber, l1Fee)
+    return l1Fee
+  }
+  
   // Calculate Arbitrum-specific gas costs (L1 + L2)
-  async getArbitrumGasCost(to = '0x0000000000000000000000000000000000000000', data = '0x') {
+  async getArbitrumGasCost(to = ZERO_ADDRESS, data = '0x', blockTag = 'latest', chainId = 'arbitrum') {
     try {
-      const provider = this.providers.arbitrum
-      if (!provider) throw new Error('Arbitrum provider not available')
+      if (!this.providers[chainId]) throw new Error(`${chainId} provider not available`)
       
-      // Create contract instance for node interface
-      const nodeInterface = new ethers.Contract(
-        ARBITRUM_NODE_INTERFACE,
-        ARBITRUM_NODE_INTERFACE_ABI,
-        provider
-      )
+      // Reuse the shared interface; the default transfer calldata is precomputed
+      const callData = (to === ZERO_ADDRESS && data === '0x')
+        ? ARBITRUM_TRANSFER_ESTIMATE_DATA
+        : arbitrumNodeInterface.encodeFunctionData('gasEstimateComponents', [to, false, data])
       
-      // Estimate gas components for a standard transfer
-      const gasEstimate = await nodeInterface.gasEstimateComponents(
-        to,
-        false, // not contract creation
-        data
-      )
+      const provider = getChain(chainId).httpRpcUrl ? this.getBatchProvider(chainId) : this.providers[chainId]
+      const result = await this.rpc(chainId, 'eth_call', [
+        { to: ARBITRUM_NODE_INTERFACE, data: callData },
+        typeof blockTag === 'number' ? ethers.toQuantity(blockTag) : blockTag
+      ], (method, params) => provider.send(method, params))
       
-      return {
-        l2GasEstimate: gasEstimate.gasEstimate,
-        l1GasEstimate: gasEstimate.gasEstimateForL1,
-        baseFee: gasEstimate.baseFee,
-        l1BaseFeeEstimate: gasEstimate.l1BaseFeeEstimate
-      }
+      return this.decodeArbitrumGasEstimate(result)
     } catch (error) {
-      console.error('Error calculating Arbitrum gas cost:', error)
+      log.error('Error calculating Arbitrum gas cost:', error)
       // Fallback to standard estimation
       return {
         l2GasEstimate: 21000n,
         l1GasEstimate: 1000n,
         baseFee: 100000000n, // 0.1 gwei
-        l1BaseFeeEstimate: 15000000000n // 15 gwei
+        l1BaseFeeEstimate: 15000000000n, // 15 gwei
+        isFallback: true
       }
     }
   }
-
-  // Enhanced gas calculation for Arbitrum
+  
+  getFeeEstimator(chainId) {
+    if (!this.feeEstimators[chainId]) {
+      this.feeEstimators[chainId] = new PriorityFeeEstimator()
+    }
+    return this.feeEstimators[chainId]
+  }
+  
+  // Pull the rewards of blocks the estimator hasn't seen, up to blockNumber.
+  // One request per chain at a time; a head that arrives meanwhile is
+  // covered by the next request's range.
+  refreshPriorityFees(chainId, blockNumber) {
+    if (this.feeRefreshes[chainId]) return this.feeRefreshes[chainId]
+    
+    const estimator = this.getFeeEstimator(chainId)
+    const blockCount = estimator.blocksToFetch(blockNumber)
+    if (blockCount === 0 || !this.providers[chainId]) return Promise.resolve()
+    
+    this.getChainStats(chainId).feeHistoryCalls++
+    const refresh = this.rpc(chainId, 'eth_feeHistory', [
+      ethers.toQuantity(blockCount),
+      ethers.toQuantity(blockNumber),
+      FEE_PERCENTILES
+    ]).then((history) => {
+      estimator.applyFeeHistory(history)
+    }).catch((error) => {
+      log.warn(`Error fetching ${chainId} fee history:`, error.message)
+    }).finally(() => {
+      delete this.feeRefreshes[chainId]
+    })
+    this.feeRefreshes[chainId] = refresh
+    return refresh
+  }
+  
+  // Slow/standard/fast tips for a chain. Only the first block waits for the
+  // RPC; after that the cached tiers are returned while the newest block's
+  // rewards load in the background.
+  async getPriorityFees(chainId, blockNumber) {
+    const refresh = this.refreshPriorityFees(chainId, blockNumber)
+    if (this.getFeeEstimator(chainId).count === 0) await refresh
+    return this.getFeeEstimator(chainId).getTiers()
+  }
+  
+  // Gas data for a block, plus how full the block was (drives the base fee
+  // forecast)
   async getEnhancedGasData(chainId, block) {
-    if (chainId === 'arbitrum') {
+    const gasData = await this.priceBlock(chainId, block)
+    gasData.gasUsedRatio = block.gasLimit ? Number(block.gasUsed) / Number(block.gasLimit) : null
+    return gasData
+  }
+  
+  // Gas data for a block, priced according to the chain's fee model
+  async priceBlock(chainId, block) {
+    const { feeModel } = getChain(chainId)
+    const priorityFees = feeModel === 'legacy' ? null : await this.getPriorityFees(chainId, block.number)
+    
+    if (feeModel === 'arbitrum') {
       try {
-        // Get Arbitrum-specific gas breakdown
-        const arbitrumGas = await this.getArbitrumGasCost()
+        // Get Arbitrum-specific gas breakdown (sampled, see DEFAULT_L1_SAMPLING)
+        const arbitrumGas = await this.getArbitrumComponents(chainId, block.number)
+        
+        // The block's own base fee is fresher than a reused sample
+        const l2BaseFee = block.baseFeePerGas ?? arbitrumGas.baseFee
         
-        // Calculate total gas cost (L1 + L2)
-        const l2Cost = Number(arbitrumGas.l2GasEstimate) * Number(arbitrumGas.baseFee)
-        const l1Cost = Number(arbitrumGas.l1GasEstimate) * Number(arbitrumGas.l1BaseFeeEstimate)
-        const totalGasCost = l2Cost + l1Cost
+        // Calculate total gas cost (L1 + L2), exactly in wei
+        const { l1Cost, l2Cost, total } = arbitrumGasCostWei({
+          l2GasEstimate: arbitrumGas.l2GasEstimate,
+          l1GasEstimate: arbitrumGas.l1GasEstimate,
+          l2BaseFee,
+          l1BaseFee: arbitrumGas.l1BaseFeeEstimate
+        })
         
         // Convert to per-gas price for compatibility
-        const effectiveGasPrice = totalGasCost / 21000 // Standard transfer gas limit
+        const effectiveGasPrice = total / STANDARD_TRANSFER_GAS
         
         return {
-          baseFee: Number(arbitrumGas.baseFee),
-          priorityFee: 2000000000, // 2 gwei default
-          gasPrice: effectiveGasPrice,
+          baseFee: Number(l2BaseFee),
+          priorityFee: priorityFees?.standard ?? DEFAULT_PRIORITY_FEE,
+          priorityFees,
+          gasPrice: Number(effectiveGasPrice),
           lastBlock: block.number,
           timestamp: block.timestamp,
           // Arbitrum-specific data
-          l1GasCost: l1Cost,
-          l2GasCost: l2Cost,
+          l1GasCost: Number(l1Cost),
+          l2GasCost: Number(l2Cost),
           l1BaseFee: Number(arbitrumGas.l1BaseFeeEstimate),
-          l2BaseFee: Number(arbitrumGas.baseFee)
+          l2BaseFee: Number(l2BaseFee)
         }
       } catch (error) {
-        console.error('Error getting Arbitrum gas data:', error)
+        log.error(`Error getting ${chainId} gas data:`, error)
         // Fall back to standard calculation
+        const priorityFee = priorityFees?.standard ?? DEFAULT_PRIORITY_FEE
         return {
           baseFee: Number(block.baseFeePerGas || 100000000), // 0.1 gwei fallback
-          priorityFee: 2000000000, // 2 gwei default
-          gasPrice: Number(block.baseFeePerGas || 100000000) + 2000000000,
+          priorityFee,
+          priorityFees,
+          gasPrice: Number(block.baseFeePerGas || 100000000) + priorityFee,
           lastBlock: block.number,
           timestamp: block.timestamp
         }
       }
-    } else {
-      // Standard gas calculation for Ethereum and Polygon
+    }
+    
+    if (feeModel === 'opStack') {
+      const l2BaseFee = BigInt(block.baseFeePerGas || 0)
+      const priorityFee = BigInt(priorityFees?.standard ?? 1000000) // 0.001 gwei, typical OP Stack tip
+      const l2Cost = (l2BaseFee + priorityFee) * STANDARD_TRANSFER_GAS
+      
+      let l1Cost = 0n
+      try {
+        l1Cost = await this.getOpStackL1Fee(chainId, block.number)
+      } catch (error) {
+        log.error(`Error getting ${chainId} L1 fee:`, error)
+      }
+      
       return {
-        baseFee: Number(block.baseFeePerGas || 0),
-        priorityFee: 2000000000, // 2 gwei default
-        gasPrice: Number(block.baseFeePerGas || 0) + 2000000000,
+        baseFee: Number(l2BaseFee),
+        priorityFee: Number(priorityFee),
+        priorityFees,
+        gasPrice: Number((l2Cost + l1Cost) / STANDARD_TRANSFER_GAS),
+        lastBlock: block.number,
+        timestamp: block.timestamp,
+        l1GasCost: Number(l1Cost),
+        l2GasCost: Number(l2Cost),
+        l2BaseFee: Number(l2BaseFee)
+      }
+    }
+    
+    if (feeModel === 'legacy') {
+      // No meaningful base fee: the node's gas price is the whole price
+      const baseFee = Number(block.baseFeePerGas || 0)
+      let gasPrice = baseFee
+      try {
+        gasPrice = Number(await this.rpc(chainId, 'eth_gasPrice', []))
+      } catch (error) {
+        log.error(`Error getting ${chainId} gas price:`, error)
+      }
+      
+      return {
+        baseFee,
+        priorityFee: Math.max(0, gasPrice - baseFee),
+        gasPrice,
         lastBlock: block.number,
         timestamp: block.timestamp
       }
     }
+    
+    // Standard EIP-1559 calculation
+    const priorityFee = priorityFees?.standard ?? DEFAULT_PRIORITY_FEE
+    return {
+      baseFee: Number(block.baseFeePerGas || 0),
+      priorityFee,
+      priorityFees,
+      gasPrice: Number(block.baseFeePerGas || 0) + priorityFee,
+      lastBlock: block.number,
+      timestamp: block.timestamp
+    }
   }
   
-  // Start ETH price tracking
+  // Start ETH price tracking from streamed Uniswap V3 Swap logs
   startEthPriceTracking() {
-    // Update price immediately
-    this.getEthPriceFromUniswap()
+    if (!this.priceEngine) {
+      this.priceEngine = new PriceEngine({
+        rpc: (method, params) => this.rpc('ethereum', method, params),
+        onPrice: (price, stats) => {
+          this.ethPrice = price
+          this.priceStats = stats
+          this.callbacks.onPriceUpdate?.(price, stats)
+        }
+      })
+    }
+    
+    const provider = this.providers.ethereum
+    if (!provider) {
+      log.error('Error tracking ETH price: Ethereum provider not available')
+      return
+    }
     
-    // Update every 30 seconds
-    setInterval(() => {
-      this.getEthPriceFromUniswap()
-    }, 30000)
+    this.priceEngine.attach(provider).catch((error) => {
+      log.error('Error subscribing to Uniswap swaps:', error)
+    })
   }
   
-  // Reconnect provider on error
-  async reconnectProvider(chainId) {
-    try {
-      const rpcUrls = {
-        ethereum: 'wss://ethereum-rpc.publicnode.com',
-        polygon: 'wss://polygon-bor-rpc.publicnode.com',
-        arbitrum: 'wss://arbitrum-one-rpc.publicnode.com'
-      }
+  // Drop the chain's socket and reconnect with backoff, trying other endpoints
+  reconnectProvider(chainId) {
+    this.connections[chainId]?.fail(new Error('reconnect requested'))
+  }
+  
+  // Subscribe to the server-side ingestion stream instead of opening RPC sockets.
+  // chainIds asks the server to ingest those chains too; by default it sends
+  // the ones it ingests anyway. Resolves with the initial snapshot once the
+  // server has replayed its state.
+  connectToStream(url = '/api/gas/stream', chainIds = null, timeoutMs = 5000) {
+    this.streamUrl = url
+    const streamUrl = chainIds?.length
+      ? `${url}${url.includes('?') ? '&' : '?'}chains=${chainIds.join(',')}`
+      : url
+    
+    return new Promise((resolve, reject) => {
+      const source = new EventSource(streamUrl)
       
-      if (this.providers[chainId]) {
-        this.providers[chainId].removeAllListeners()
-        this.providers[chainId] = null
-      }
+      const timeout = setTimeout(() => {
+        source.close()
+        reject(new Error('Timeout connecting to gas stream'))
+      }, timeoutMs)
       
-      const provider = new ethers.WebSocketProvider(rpcUrls[chainId])
-      this.providers[chainId] = provider
+      source.addEventListener('snapshot', (event) => {
+        clearTimeout(timeout)
+        const snapshot = JSON.parse(event.data)
+        
+        // Replayed state, not fresh blocks: drop the stage stamps so old
+        // points don't read as latency
+        Object.entries(snapshot.chains).forEach(([chainId, gasData]) => {
+          this.callbacks.onGasUpdate?.(chainId, { ...gasData, receivedAt: null, pricedAt: null })
+        })
+        if (snapshot.ethPrice) {
+          this.ethPrice = snapshot.ethPrice
+          this.priceStats = snapshot.priceStats
+          this.callbacks.onPriceUpdate?.(snapshot.ethPrice, snapshot.priceStats)
+        }
+        
+        this.isConnected = snapshot.isConnected
+        this.callbacks.onConnectionChange?.(snapshot.isConnected)
+        
+        if (!this.stream) {
+          this.stream = source
+          resolve(snapshot)
+        }
+      })
       
-      provider.on('block', (blockNumber) => {
-        this.handleNewBlock(chainId, blockNumber)
+      source.addEventListener('gas', (event) => {
+        const { chainId, gasData } = JSON.parse(event.data)
+        this.callbacks.onGasUpdate?.(chainId, gasData)
       })
       
-      provider.on('error', (error) => {
-        console.error(`${chainId} provider error:`, error)
-        setTimeout(() => this.reconnectProvider(chainId), 5000)
+      source.addEventListener('price', (event) => {
+        const { price, stats } = JSON.parse(event.data)
+        this.ethPrice = price
+        this.priceStats = stats
+        this.callbacks.onPriceUpdate?.(price, stats)
       })
       
-    } catch (error) {
-      console.error(`Failed to reconnect ${chainId}:`, error)
-      setTimeout(() => this.reconnectProvider(chainId), 5000)
-    }
+      source.addEventListener('status', (event) => {
+        const { isConnected } = JSON.parse(event.data)
+        this.isConnected = isConnected
+        this.callbacks.onConnectionChange?.(isConnected)
+      })
+      
+      source.onerror = () => {
+        if (!this.stream) {
+          // Never got a snapshot, let the caller fall back to direct providers
+          clearTimeout(timeout)
+          source.close()
+          reject(new Error('Gas stream unavailable'))
+        } else {
+          // EventSource reconnects on its own; the server replays a snapshot when it does
+          this.isConnected = false
+          this.callbacks.onConnectionChange?.(false)
+        }
+      }
+    })
   }
   
   // Set callbacks
@@ -302,11 +783,20 @@ class Web3Service {
   
   // Cleanup
   disconnect() {
-    Object.values(this.providers).forEach(provider => {
-      if (provider) {
-        provider.removeAllListeners()
-      }
-    })
+    this.priceEngine?.detach()
+    if (this.stream) {
+      this.stream.close()
+      this.stream = null
+    }
+    Object.values(this.headSubscribers).forEach(subscriber => subscriber.stop())
+    this.headSubscribers = {}
+    Object.values(this.batchProviders).forEach(provider => provider.destroy())
+    this.batchProviders = {}
+    this.l1Samples = {}
+    this.feeEstimators = {}
+    this.feeRefreshes = {}
+    Object.values(this.connections).forEach(connection => connection.stop())
+    this.connections = {}
     this.providers = {}
     this.isConnected = false
   }
@@ -0,0 +1,54 @@
+// UI-thread side of the gas worker (lib/gasWorker.js).
+//
+// Enabled with NEXT_PUBLIC_GAS_WORKER=1. The worker runs Web3Service and the
+// candle aggregation; each batch it posts is decoded and handed to the
+// store's applyBatch in one update.
+
+import { decodeBatch } from './gasWorkerProtocol.js'
+
+export const gasWorkerEnabled = process.env.NEXT_PUBLIC_GAS_WORKER === '1'
+
+// Resolves with a handle once the worker's upstream is connected; rejects
+// (and terminates the worker) if it fails or takes longer than timeoutMs
+export function startGasWorker(applyBatch, { source = 'stream', chainIds, flushMs, timeoutMs = 8000 } = {}) {
+  const worker = new Worker(new URL('./gasWorker.js', import.meta.url), { type: 'module' })
+  
+  return new Promise((resolve, reject) => {
+    const fail = (error) => {
+      clearTimeout(timeout)
+      worker.terminate()
+      reject(error)
+    }
+    const timeout = setTimeout(() => fail(new Error('Gas worker start timeout')), timeoutMs)
+    
+    worker.onmessage = ({ data }) => {
+      if (data.type === 'batch') {
+        applyBatch(decodeBatch(data))
+      } else if (data.type === 'ready') {
+        clearTimeout(timeout)
+        resolve({
+          // Chains to show, whether connected directly or via the stream
+          setChains: (nextChainIds) => {
+            worker.postMessage({ type: 'setChains', chainIds: nextChainIds })
+          },
+          // Close the worker's sockets, then the worker itself
+          stop: () => {
+            worker.postMessage({ type: 'stop' })
+            worker.terminate()
+          }
+        })
+      } else if (data.type === 'error') {
+        fail(new Error(data.message))
+      }
+    }
+    worker.onerror = (event) => fail(new Error(event.message || 'Gas worker failed'))
+    
+    worker.postMessage({
+      type: 'start',
+      source,
+      streamUrl: new URL('/api/gas/stream', window.location.origin).href,
+      chainIds,
+      flushMs
+    })
+  })
+}